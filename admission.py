@@ -0,0 +1,212 @@
+"""
+Session admission control for the bot server.
+
+Each server process tracks its live sessions, event-loop lag and CPU use.
+When any is over budget, /connect turns new callers away (or redirects them),
+and /ws callers wait in a short, bounded queue for a slot instead of starting
+a pipeline that would slow every call on the process.
+
+Lag and CPU are smoothed over a few monitor ticks, so a single slow tick
+does not shed load. Loop lag catches a saturated event loop; CPU use counts
+every thread of the process (VAD batching, tool pools, ONNX) and is measured
+against all the cores the process may run on.
+"""
+import asyncio
+import os
+import time
+from typing import Callable, Optional
+
+from loguru import logger
+
+from metrics import Counter, Gauge
+
+# Live sessions per process
+MAX_SESSIONS = int(os.getenv("ADMISSION_MAX_SESSIONS", "100"))
+
+# Smoothed event-loop lag above which no session is admitted, in seconds
+MAX_LOOP_LAG = float(os.getenv("ADMISSION_MAX_LOOP_LAG", "0.2"))
+
+# Smoothed CPU use of this process, all threads together, as a fraction of
+# the cores it may run on (0.9 with 4 usable cores = 3.6 cores busy)
+MAX_CPU = float(os.getenv("ADMISSION_MAX_CPU", "0.9"))
+
+# /ws callers allowed to wait for a slot, and for how long, in seconds
+QUEUE_SIZE = int(os.getenv("ADMISSION_QUEUE_SIZE", "10"))
+QUEUE_TIMEOUT = float(os.getenv("ADMISSION_QUEUE_TIMEOUT", "5"))
+
+# Seconds a rejected caller is asked to wait before retrying
+RETRY_AFTER = int(os.getenv("ADMISSION_RETRY_AFTER", "5"))
+
+# ws_url handed out by /connect instead of a rejection (e.g. another node)
+FALLBACK_WS_URL = os.getenv("ADMISSION_FALLBACK_WS_URL", "")
+
+
+def usable_cores() -> int:
+    """Number of cores this process may run on (its CPU affinity, where supported)."""
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0)) or 1
+    return os.cpu_count() or 1
+
+
+class AdmissionRejected(Exception):
+    """A caller was not admitted; `reason` says why."""
+
+    def __init__(self, reason: str):
+        super().__init__(reason)
+        self.reason = reason
+
+
+class AdmissionController:
+    """Admits sessions while the process has headroom, queueing a few briefly."""
+
+    def __init__(
+        self,
+        max_sessions: int = MAX_SESSIONS,
+        max_loop_lag: float = MAX_LOOP_LAG,
+        max_cpu: float = MAX_CPU,
+        queue_size: int = QUEUE_SIZE,
+        queue_timeout: float = QUEUE_TIMEOUT,
+        interval: float = 0.1,
+        on_update: Optional[Callable[["AdmissionController"], None]] = None,
+        cores: Optional[int] = None,
+    ):
+        """
+        Args:
+            max_sessions: Live sessions before callers wait (0 disables the cap)
+            max_loop_lag: Smoothed loop lag before callers wait (0 disables)
+            max_cpu: Smoothed CPU use, as a fraction of `cores`, before callers
+                wait (0 disables)
+            queue_size: Callers allowed to wait at once
+            queue_timeout: Longest wait for a slot, in seconds
+            interval: Seconds between lag and CPU samples
+            on_update: Called after every sample (e.g. to publish load)
+            cores: Cores CPU use is measured against (default: usable_cores())
+        """
+        self.max_sessions = max_sessions
+        self.max_loop_lag = max_loop_lag
+        self.max_cpu = max_cpu
+        self.queue_size = queue_size
+        self.queue_timeout = queue_timeout
+        self.interval = interval
+        self.on_update = on_update
+        self.cores = cores or usable_cores()
+        self.live_sessions = 0
+        self.waiting = 0
+        self.loop_lag = 0.0
+        self.cpu = 0.0
+        self._changed: Optional[asyncio.Condition] = None
+        self._monitor_task: Optional[asyncio.Task] = None
+
+    def overload_reason(self) -> Optional[str]:
+        """Why the process is too busy for new sessions, ignoring the session cap."""
+        if self.max_loop_lag and self.loop_lag > self.max_loop_lag:
+            return "loop_lag"
+        if self.max_cpu and self.cpu > self.max_cpu:
+            return "cpu"
+        return None
+
+    def over_budget(self) -> Optional[str]:
+        """Why a new session cannot start now, or None if it can."""
+        if self.max_sessions and self.live_sessions >= self.max_sessions:
+            return "sessions"
+        return self.overload_reason()
+
+    async def acquire(self):
+        """
+        Take a session slot, waiting in the queue if none is free.
+
+        Raises:
+            AdmissionRejected: The queue is full or the wait timed out
+        """
+        changed = self._condition()
+        # Newcomers queue behind callers already waiting
+        if not self.waiting and self.over_budget() is None:
+            self.live_sessions += 1
+            return
+        if self.waiting >= self.queue_size:
+            self._reject("queue_full")
+
+        self.waiting += 1
+        try:
+            async with changed:
+                await asyncio.wait_for(
+                    changed.wait_for(lambda: self.over_budget() is None),
+                    timeout=self.queue_timeout,
+                )
+                self.live_sessions += 1
+        except asyncio.TimeoutError:
+            self._reject("queue_timeout")
+        finally:
+            self.waiting -= 1
+
+    async def release(self):
+        """Give back a session slot and wake a waiting caller."""
+        self.live_sessions -= 1
+        await self._notify()
+
+    def reject(self, reason: str):
+        """Count a caller turned away elsewhere (e.g. at /connect)."""
+        REJECTED.inc(reason=reason)
+
+    def _reject(self, reason: str):
+        self.reject(reason)
+        logger.warning(f"Session rejected: {reason}")
+        raise AdmissionRejected(reason)
+
+    def _condition(self) -> asyncio.Condition:
+        if self._changed is None:
+            self._changed = asyncio.Condition()
+        return self._changed
+
+    async def _notify(self):
+        changed = self._condition()
+        async with changed:
+            changed.notify_all()
+
+    def start(self):
+        """Start sampling loop lag and CPU on the running loop."""
+        if self._monitor_task is None or self._monitor_task.done():
+            self._monitor_task = asyncio.create_task(self._monitor())
+
+    async def stop(self):
+        if self._monitor_task is not None:
+            self._monitor_task.cancel()
+            try:
+                await self._monitor_task
+            except asyncio.CancelledError:
+                pass
+            self._monitor_task = None
+
+    async def _monitor(self):
+        loop = asyncio.get_running_loop()
+        last_wall, last_cpu = time.monotonic(), time.process_time()
+        while True:
+            started = loop.time()
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, loop.time() - started - self.interval)
+            self.loop_lag = 0.7 * self.loop_lag + 0.3 * lag
+
+            wall, cpu = time.monotonic(), time.process_time()
+            if wall > last_wall:
+                usage = (cpu - last_cpu) / (wall - last_wall) / self.cores
+                self.cpu = 0.9 * self.cpu + 0.1 * usage
+            last_wall, last_cpu = wall, cpu
+
+            if self.on_update is not None:
+                self.on_update(self)
+            if self.waiting:
+                await self._notify()
+
+
+# Process-wide controller used by server.py
+admission = AdmissionController()
+
+Gauge("admission_live_sessions", "Sessions admitted and running.", lambda: admission.live_sessions)
+Gauge("admission_waiting", "Callers waiting for a session slot.", lambda: admission.waiting)
+Gauge("event_loop_lag_seconds", "Smoothed event-loop lag.", lambda: admission.loop_lag)
+Gauge("process_cpu_ratio", "Smoothed CPU use, as a fraction of the usable cores.", lambda: admission.cpu)
+REJECTED = Counter(
+    "admission_rejected_total",
+    "Callers turned away, by reason.",
+    labelnames=("reason",),
+)
@@ -0,0 +1,159 @@
+"""
+Copy-free input audio path for the FastAPI websocket transport.
+
+Each 20 ms of caller audio used to be copied several times: protobuf parsing
+copied the payload into a new bytes object, and VAD chunking copied it again
+on every concatenation and slice. Here:
+
+- ZeroCopyProtobufFrameSerializer slices the audio payload out of the
+  received websocket message as a memoryview instead of parsing it into a
+  new protobuf object
+- AudioChunker gathers audio into one reused buffer per stream and hands out
+  fixed-size windows (e.g. VAD windows) as views into it
+
+Downstream consumers (VAD, STT websocket send) accept any bytes-like object.
+"""
+from typing import Iterator, Optional, Tuple
+
+from pipecat.frames.frames import Frame, InputAudioRawFrame
+from pipecat.serializers.protobuf import ProtobufFrameSerializer
+
+# Wire-format tags of pipecat's frames.proto: Frame.audio is field 2, and in
+# AudioRawFrame id=1, name=2, audio=3, sample_rate=4, num_channels=5, pts=6
+_AUDIO_FRAME_TAG = 0x12
+_VARINT, _LENGTH_DELIMITED = 0, 2
+
+
+def _read_varint(data: memoryview, pos: int) -> Tuple[int, int]:
+    result = shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        result |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return result, pos
+        shift += 7
+
+
+class ZeroCopyProtobufFrameSerializer(ProtobufFrameSerializer):
+    """
+    ProtobufFrameSerializer whose input audio frames reference the received
+    message instead of a copy. Anything but a plain audio frame is parsed by
+    the base class.
+    """
+
+    async def deserialize(self, data: str | bytes) -> Frame | None:
+        if isinstance(data, bytes) and data[:1] == b"\x12":
+            frame = self._deserialize_audio(memoryview(data))
+            if frame is not None:
+                return frame
+        return await super().deserialize(data)
+
+    def _deserialize_audio(self, data: memoryview) -> Optional[InputAudioRawFrame]:
+        """Decode an AudioRawFrame message, or None to fall back to protobuf."""
+        try:
+            length, pos = _read_varint(data, 1)
+            end = pos + length
+            if end != len(data):
+                return None
+            fields = {}
+            audio = data[0:0]
+            while pos < end:
+                key, pos = _read_varint(data, pos)
+                number, wire_type = key >> 3, key & 0x7
+                if wire_type == _VARINT:
+                    fields[number], pos = _read_varint(data, pos)
+                elif wire_type == _LENGTH_DELIMITED:
+                    size, pos = _read_varint(data, pos)
+                    if number == 3:
+                        audio = data[pos:pos + size]
+                    elif number == 2:
+                        fields[2] = str(data[pos:pos + size], "utf-8")
+                    else:
+                        return None
+                    pos += size
+                else:
+                    return None
+            if pos != end:
+                return None
+        except IndexError:
+            return None  # Truncated message; let protobuf report it
+
+        frame = InputAudioRawFrame(
+            audio=audio,
+            sample_rate=fields.get(4, 0),
+            num_channels=fields.get(5, 0),
+        )
+        # Same special fields as the base class
+        if fields.get(1):
+            frame.id = fields[1]
+        if fields.get(2):
+            frame.name = fields[2]
+        if fields.get(6):
+            frame.pts = fields[6]
+        return frame
+
+
+class AudioChunker:
+    """
+    Splits a stream of audio into fixed-size windows using one reused buffer.
+
+    Windows are memoryviews into the buffer and are only valid until the next
+    push().
+    """
+
+    def __init__(self, window_bytes: int, capacity: int = 16384):
+        """
+        Args:
+            window_bytes: Size of each window
+            capacity: Initial buffer size; grows if a push does not fit
+        """
+        self.window_bytes = window_bytes
+        self._buffer = bytearray(max(capacity, 2 * window_bytes))
+        self._view = memoryview(self._buffer)
+        self._filled = 0
+
+    @property
+    def pending(self) -> int:
+        """Bytes waiting for a full window."""
+        return self._filled
+
+    def resize(self, window_bytes: int):
+        """Change the window size, dropping any partial window."""
+        self.window_bytes = window_bytes
+        self._filled = 0
+        if len(self._buffer) < 2 * window_bytes:
+            self._grow(2 * window_bytes)
+
+    def push(self, data) -> Iterator[memoryview]:
+        """
+        Add audio and yield every full window.
+
+        Args:
+            data: Audio bytes (any bytes-like object)
+        """
+        size = len(data)
+        if self._filled + size > len(self._buffer):
+            self._grow(self._filled + size)
+        self._view[self._filled:self._filled + size] = data
+        self._filled += size
+
+        start = 0
+        while self._filled - start >= self.window_bytes:
+            yield self._view[start:start + self.window_bytes]
+            start += self.window_bytes
+        if start:
+            # Move the partial window to the front for the next push
+            remainder = self._filled - start
+            self._view[:remainder] = self._view[start:self._filled]
+            self._filled = remainder
+
+    def clear(self):
+        self._filled = 0
+
+    def _grow(self, size: int):
+        self._view.release()
+        buffer = bytearray(max(size, 2 * len(self._buffer)))
+        buffer[:self._filled] = self._buffer[:self._filled]
+        self._buffer = buffer
+        self._view = memoryview(buffer)
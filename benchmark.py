@@ -0,0 +1,433 @@
+#!/usr/bin/env python3
+"""
+Load generator and latency benchmark for the fast_api bot.
+
+Starts server.py with FAKE_SERVICES=true (see fake_services.py), so no
+network access or API keys are needed. It then drives N concurrent synthetic
+clients through /connect and /ws. Each client streams PCM in protobuf frames
+in real time, like a microphone: an utterance, then silence while the bot
+answers. That repeats for the configured number of turns.
+
+Reported:
+- turn latency: end of the user's speech to the end of the bot's reply audio
+- time to first audio (TTFA): end of the user's speech to the first reply audio
+- sessions per core: clients divided by the CPU cores the server kept busy
+- RSS per session: server memory growth under load divided by clients
+
+Pipecat splits reply text into sentences with NLTK, so its punkt_tab data
+must be installed once beforehand (python -m nltk.downloader punkt_tab).
+
+Results are saved as JSON. Pass --baseline with an earlier result to print
+the change of each figure.
+
+Usage:
+    python benchmark.py --clients 20 --turns 3 --output results.json
+    python benchmark.py --clients 20 --baseline results.json
+    python benchmark.py --audio question.wav --stt-latency 0.3 --jitter 0.5
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+import wave
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+import aiohttp
+import numpy as np
+from pipecat.frames.protobufs import frames_pb2
+
+# Audio sent per websocket message, in seconds (a typical mic buffer)
+FRAME_SECONDS = 0.02
+
+# Figures compared against a --baseline run
+COMPARED = [
+    ("turn_latency_ms", "p50"),
+    ("turn_latency_ms", "p95"),
+    ("turn_latency_ms", "p99"),
+    ("time_to_first_audio_ms", "p50"),
+    ("time_to_first_audio_ms", "p95"),
+    ("time_to_first_audio_ms", "p99"),
+    ("sessions_per_core", None),
+    ("rss_per_session_mb", None),
+]
+
+
+def load_utterance(path: Optional[str], sample_rate: int = 16000) -> Tuple[bytes, int]:
+    """
+    Load a recorded utterance, or synthesize a speech-like one.
+
+    Args:
+        path: 16-bit mono WAV file, or None
+        sample_rate: Sample rate of the synthesized utterance
+
+    Returns:
+        Tuple of PCM bytes and their sample rate
+    """
+    if path:
+        with wave.open(path, "rb") as wav:
+            if wav.getsampwidth() != 2 or wav.getnchannels() != 1:
+                raise ValueError(f"{path}: expected 16-bit mono PCM")
+            return wav.readframes(wav.getnframes()), wav.getframerate()
+
+    # 1.5 s of a voiced sawtooth around 140 Hz, modulated at a syllable rate
+    t = np.arange(int(sample_rate * 1.5)) / sample_rate
+    voice = 2 * ((140 * t) % 1.0) - 1
+    envelope = 0.55 + 0.45 * np.sin(2 * np.pi * 4 * t)
+    return (voice * envelope * 8000).astype(np.int16).tobytes(), sample_rate
+
+
+def audio_message(pcm: bytes, sample_rate: int) -> bytes:
+    """Serialize PCM as a ProtobufFrameSerializer audio frame."""
+    frame = frames_pb2.Frame(
+        audio=frames_pb2.AudioRawFrame(audio=pcm, sample_rate=sample_rate, num_channels=1)
+    )
+    return frame.SerializeToString()
+
+
+def percentile(values: List[float], q: float) -> float:
+    """Linearly interpolated percentile (q in 0-100)."""
+    return float(np.percentile(values, q)) if values else 0.0
+
+
+def summarize(values: List[float]) -> Dict[str, float]:
+    """p50/p95/p99, mean and max of latencies given in seconds, in ms."""
+    ms = [v * 1000 for v in values]
+    return {
+        "count": len(ms),
+        "p50": round(percentile(ms, 50), 1),
+        "p95": round(percentile(ms, 95), 1),
+        "p99": round(percentile(ms, 99), 1),
+        "mean": round(float(np.mean(ms)), 1) if ms else 0.0,
+        "max": round(max(ms), 1) if ms else 0.0,
+    }
+
+
+@dataclass
+class ClientResult:
+    """Latencies measured by one synthetic client."""
+    turn_latencies: List[float] = field(default_factory=list)
+    first_audio: List[float] = field(default_factory=list)
+    failed_turns: int = 0
+    error: Optional[str] = None
+
+
+class SyntheticClient:
+    """One caller: streams audio in real time and times the bot's replies."""
+
+    def __init__(self, base_url: str, pcm: bytes, sample_rate: int, args: argparse.Namespace):
+        self.base_url = base_url
+        self.pcm = pcm
+        self.sample_rate = sample_rate
+        self.args = args
+        self.bytes_per_frame = int(sample_rate * FRAME_SECONDS) * 2
+        self.silence = b"\x00" * self.bytes_per_frame
+        self.speech: List[bytes] = []  # Frames of the utterance currently being sent
+        self.speech_ended = asyncio.Event()
+        self.audio_times: List[float] = []
+        self.result = ClientResult()
+
+    async def run(self, session: aiohttp.ClientSession):
+        try:
+            async with session.post(f"{self.base_url}/connect") as response:
+                body = await response.json()
+                if response.status != 200:
+                    # Shed by admission control
+                    self.result.error = f"Rejected at /connect: {body.get('reason')}"
+                    return self.result
+                ws_url = body["ws_url"]
+            async with session.ws_connect(ws_url, max_msg_size=0) as ws:
+                sender = asyncio.create_task(self._send_audio(ws))
+                receiver = asyncio.create_task(self._receive(ws))
+                try:
+                    for _ in range(self.args.turns):
+                        await self._turn()
+                finally:
+                    sender.cancel()
+                    receiver.cancel()
+                    await asyncio.gather(sender, receiver, return_exceptions=True)
+        except Exception as e:
+            self.result.error = f"{type(e).__name__}: {e}"
+        return self.result
+
+    async def _send_audio(self, ws):
+        """Send one frame every FRAME_SECONDS, on a fixed schedule."""
+        loop = asyncio.get_running_loop()
+        next_at = loop.time()
+        while True:
+            if self.speech:
+                pcm = self.speech.pop(0)
+                if not self.speech:
+                    self.speech_ended.set()
+            else:
+                pcm = self.silence
+            await ws.send_bytes(audio_message(pcm, self.sample_rate))
+            next_at += FRAME_SECONDS
+            await asyncio.sleep(max(0.0, next_at - loop.time()))
+
+    async def _receive(self, ws):
+        async for message in ws:
+            if message.type != aiohttp.WSMsgType.BINARY:
+                continue
+            frame = frames_pb2.Frame.FromString(message.data)
+            if frame.WhichOneof("frame") == "audio":
+                self.audio_times.append(time.perf_counter())
+
+    async def _turn(self):
+        await asyncio.sleep(self.args.think_time)
+        self.speech_ended.clear()
+        self.speech = [
+            self.pcm[i : i + self.bytes_per_frame]
+            for i in range(0, len(self.pcm), self.bytes_per_frame)
+        ]
+        await self.speech_ended.wait()
+        spoken_at = time.perf_counter()
+
+        deadline = spoken_at + self.args.turn_timeout
+        while time.perf_counter() < deadline:
+            await asyncio.sleep(0.05)
+            replies = [t for t in self.audio_times if t > spoken_at]
+            if replies and time.perf_counter() - replies[-1] >= self.args.idle:
+                self.result.first_audio.append(replies[0] - spoken_at)
+                self.result.turn_latencies.append(replies[-1] - spoken_at)
+                return
+        self.result.failed_turns += 1
+
+
+class ProcessSampler:
+    """Samples RSS and CPU time of a process and its children from /proc."""
+
+    def __init__(self, pid: int):
+        self.pid = pid
+        self.peak_rss = 0
+        self._task: Optional[asyncio.Task] = None
+
+    def _tree(self) -> List[int]:
+        pids = [self.pid]
+        for entry in os.listdir("/proc"):
+            if entry.isdigit():
+                try:
+                    with open(f"/proc/{entry}/stat") as f:
+                        if int(f.read().rsplit(")", 1)[1].split()[1]) == self.pid:
+                            pids.append(int(entry))
+                except (OSError, IndexError, ValueError):
+                    pass
+        return pids
+
+    def rss_bytes(self) -> int:
+        total = 0
+        for pid in self._tree():
+            try:
+                with open(f"/proc/{pid}/status") as f:
+                    for line in f:
+                        if line.startswith("VmRSS:"):
+                            total += int(line.split()[1]) * 1024
+            except OSError:
+                pass
+        return total
+
+    def cpu_seconds(self) -> float:
+        ticks = 0
+        for pid in self._tree():
+            try:
+                with open(f"/proc/{pid}/stat") as f:
+                    fields = f.read().rsplit(")", 1)[1].split()
+                ticks += int(fields[11]) + int(fields[12])  # utime + stime
+            except (OSError, IndexError, ValueError):
+                pass
+        return ticks / os.sysconf("SC_CLK_TCK")
+
+    async def _sample(self, interval: float):
+        while True:
+            self.peak_rss = max(self.peak_rss, self.rss_bytes())
+            await asyncio.sleep(interval)
+
+    def start(self, interval: float = 0.5):
+        self._task = asyncio.create_task(self._sample(interval))
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+        self.peak_rss = max(self.peak_rss, self.rss_bytes())
+
+
+def start_server(args: argparse.Namespace) -> subprocess.Popen:
+    """Run server.py on fake services with the configured latencies."""
+    env = dict(
+        os.environ,
+        FAKE_SERVICES="true",
+        WEBSOCKET_SERVER="fast_api",
+        WARM_UP_ON_STARTUP="true",
+        PORT=str(args.port),
+        PUBLIC_HOST="127.0.0.1",
+        SERVER_WORKERS=str(args.workers),
+        FAKE_STT_LATENCY=str(args.stt_latency),
+        FAKE_LLM_LATENCY=str(args.llm_latency),
+        FAKE_TTS_LATENCY=str(args.tts_latency),
+        FAKE_ADK_LATENCY=str(args.adk_latency),
+        FAKE_JITTER=str(args.jitter),
+        WHISKER_MODE=args.whisker,
+    )
+    log = open(args.server_log, "w") if args.server_log else subprocess.DEVNULL
+    return subprocess.Popen(
+        [sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)), "server.py")],
+        env=env,
+        stdout=log,
+        stderr=subprocess.STDOUT,
+    )
+
+
+async def wait_until_ready(urls: List[str], timeout: float = 120.0):
+    """Poll each server's /metrics until it answers (warm-up included)."""
+    deadline = time.monotonic() + timeout
+    async with aiohttp.ClientSession() as session:
+        for url in urls:
+            while True:
+                try:
+                    async with session.get(f"{url}/metrics") as response:
+                        if response.status == 200:
+                            break
+                except aiohttp.ClientError:
+                    pass
+                if time.monotonic() >= deadline:
+                    raise TimeoutError(f"Server at {url} not ready after {timeout:g}s")
+                await asyncio.sleep(0.5)
+
+
+async def run_benchmark(args: argparse.Namespace) -> dict:
+    """Run the configured load and return the results."""
+    pcm, sample_rate = load_utterance(args.audio)
+    server = None
+    pid = args.pid
+    if args.url:
+        base_url = args.url.rstrip("/")
+    else:
+        server = start_server(args)
+        pid = server.pid
+        base_url = f"http://127.0.0.1:{args.port}"
+
+    try:
+        urls = [base_url]
+        if not args.url and args.workers > 1:
+            # Workers serve /ws on the ports after the supervisor's
+            urls += [f"http://127.0.0.1:{args.port + 1 + i}" for i in range(args.workers)]
+        await wait_until_ready(urls)
+
+        sampler = ProcessSampler(pid) if pid else None
+        baseline_rss = sampler.rss_bytes() if sampler else 0
+        cpu_before = sampler.cpu_seconds() if sampler else 0.0
+        if sampler:
+            sampler.start()
+
+        started = time.perf_counter()
+        async with aiohttp.ClientSession() as session:
+
+            async def run_client(index: int) -> ClientResult:
+                await asyncio.sleep(args.ramp * index / max(1, args.clients))
+                return await SyntheticClient(base_url, pcm, sample_rate, args).run(session)
+
+            results = await asyncio.gather(*[run_client(i) for i in range(args.clients)])
+        wall = time.perf_counter() - started
+
+        if sampler:
+            await sampler.stop()
+            cpu_seconds = sampler.cpu_seconds() - cpu_before
+    finally:
+        if server:
+            server.terminate()
+            try:
+                server.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                server.kill()
+
+    turn_latencies = [t for r in results for t in r.turn_latencies]
+    first_audio = [t for r in results for t in r.first_audio]
+    errors = [r.error for r in results if r.error]
+    report = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "config": {k: v for k, v in vars(args).items() if k not in ("output", "baseline")},
+        "cpu_count": os.cpu_count(),
+        "wall_seconds": round(wall, 2),
+        "turns_completed": len(turn_latencies),
+        "turns_failed": sum(r.failed_turns for r in results),
+        "client_errors": errors,
+        "turn_latency_ms": summarize(turn_latencies),
+        "time_to_first_audio_ms": summarize(first_audio),
+    }
+    if sampler:
+        report["server_cpu_seconds"] = round(cpu_seconds, 2)
+        report["cores_busy"] = round(cpu_seconds / wall, 3)
+        report["sessions_per_core"] = (
+            round(args.clients / (cpu_seconds / wall), 1) if cpu_seconds > 0 else None
+        )
+        report["baseline_rss_mb"] = round(baseline_rss / 2**20, 1)
+        report["peak_rss_mb"] = round(sampler.peak_rss / 2**20, 1)
+        report["rss_per_session_mb"] = round(
+            (sampler.peak_rss - baseline_rss) / 2**20 / max(1, args.clients), 2
+        )
+    return report
+
+
+def compare(report: dict, baseline: dict):
+    """Print each compared figure next to the baseline's."""
+    print(f"\n{'figure':<32}{'baseline':>12}{'current':>12}{'change':>10}")
+    for name, key in COMPARED:
+        old = baseline.get(name)
+        new = report.get(name)
+        if key:
+            old = old.get(key) if old else None
+            new = new.get(key) if new else None
+        label = f"{name}.{key}" if key else name
+        if old is None or new is None:
+            print(f"{label:<32}{str(old):>12}{str(new):>12}{'':>10}")
+            continue
+        change = f"{(new - old) / old * 100:+.1f}%" if old else ""
+        print(f"{label:<32}{old:>12}{new:>12}{change:>10}")
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--clients", type=int, default=10, help="Concurrent synthetic clients")
+    parser.add_argument("--turns", type=int, default=3, help="Turns per client")
+    parser.add_argument("--ramp", type=float, default=2.0, help="Seconds over which clients connect")
+    parser.add_argument("--think-time", type=float, default=0.5, help="Silence before each utterance")
+    parser.add_argument("--idle", type=float, default=2.0, help="Reply silence that ends a turn")
+    parser.add_argument("--turn-timeout", type=float, default=30.0, help="Give up on a turn after this")
+    parser.add_argument("--audio", help="16-bit mono WAV to send (default: synthetic speech)")
+    parser.add_argument("--workers", type=int, default=1, help="SERVER_WORKERS for the server")
+    parser.add_argument("--port", type=int, default=7960, help="Port for the server started here")
+    parser.add_argument("--url", help="Benchmark a running server instead (its services are used)")
+    parser.add_argument("--pid", type=int, help="PID of the --url server, for CPU and RSS figures")
+    parser.add_argument("--server-log", help="Write the server's output to this file")
+    parser.add_argument("--stt-latency", type=float, default=0.15)
+    parser.add_argument("--llm-latency", type=float, default=0.35)
+    parser.add_argument("--tts-latency", type=float, default=0.2)
+    parser.add_argument("--adk-latency", type=float, default=0.4)
+    parser.add_argument("--jitter", type=float, default=0.25, help="Latency jitter, as a fraction")
+    parser.add_argument("--whisker", default="off", help="WHISKER_MODE for the server")
+    parser.add_argument("--output", default="benchmark_results.json", help="Where to save results")
+    parser.add_argument("--baseline", help="Earlier results JSON to compare against")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    report = asyncio.run(run_benchmark(args))
+
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(json.dumps({k: v for k, v in report.items() if k != "config"}, indent=2))
+    print(f"\nSaved results to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            compare(report, json.load(f))
+    return 0 if report["turns_completed"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,89 +1,209 @@
 import os
-import string
-import sys
-import datetime
 import asyncio
-from pipecat.frames.frames import TTSSpeakFrame
+import dataclasses
+import random
+import threading
+import time
+import uuid
+from contextlib import aclosing
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, AsyncIterator, Dict, Optional, Tuple
+from pipecat.frames.frames import FunctionCallResultProperties, TTSSpeakFrame
 from pipecat.services.llm_service import FunctionCallParams
 from pipecat.adapters.schemas.function_schema import FunctionSchema
 from pipecat.adapters.schemas.tools_schema import ToolsSchema
 from pipecat.services.openai.llm import OpenAILLMService
 from dotenv import load_dotenv
 from loguru import logger
-from pipecat.audio.vad.silero import SileroVADAnalyzer
 from pipecat.frames.frames import LLMRunFrame
 from pipecat.pipeline.pipeline import Pipeline
 from pipecat.pipeline.runner import PipelineRunner
 from pipecat.pipeline.task import PipelineParams, PipelineTask
 from pipecat.processors.aggregators.openai_llm_context import OpenAILLMContext
 from pipecat.processors.frameworks.rtvi import RTVIConfig, RTVIObserver, RTVIProcessor
-from pipecat.serializers.protobuf import ProtobufFrameSerializer
-from pipecat.services.google.llm import GoogleLLMService
-from pipecat.services.google.tts import GoogleTTSService
 from pipecat.services.deepgram.stt import DeepgramSTTService
+from pipecat.utils.string import match_endofsentence
 from pipecat.transports.websocket.fastapi import (
     FastAPIWebsocketParams,
     FastAPIWebsocketTransport,
 )
-from pipecat.adapters.services.gemini_adapter import GeminiLLMAdapter
 from pipecat.services.deepgram.tts import DeepgramTTSService
-from demo.agent import root_agent
-from google.adk.runners import InMemoryRunner
-from google.genai import types
-from google.adk.agents.llm_agent import Agent
+from pipecat.services.stt_service import STTService
+from pipecat.services.tts_service import TTSService
 from pipecat_whisker import WhiskerObserver
-from streaming_bridge import register_task, unregister_task
+from metrics import (
+    ADK_FIRST_EVENT,
+    PRODUCED_AT,
+    TOOL_CALLS,
+    TOOL_DURATION,
+    SpeechLatencyObserver,
+    TimedObserver,
+)
+from streaming_bridge import (
+    SpeechQueue,
+    clear_speech_queue,
+    get_speech_queue,
+    register_task,
+    unregister_owner,
+    unregister_task,
+)
+from runner_pool import runner_pool
+from result_cache import LRUResultCache, ToolResultCache
+from service_pool import ServicePool
+from tool_scheduler import ToolScheduler
+from shared_vad import SharedSileroVADAnalyzer, preload_vad_model
+from log_config import setup_logging
+from context_window import ContextWindow
+from audio_buffers import ZeroCopyProtobufFrameSerializer
+from tts_cache import (
+    TTS_CACHE_PREWARM_FILE,
+    TTS_CACHE_PREWARM_SAMPLE_RATE,
+    CachedTTSMixin,
+    prewarm_blocking,
+    read_phrases,
+)
+from speculation import SPECULATION_ENABLED, SpeculationTrigger, SpeculativeCompletionsMixin, Speculator
+
+if TYPE_CHECKING:
+    from google.adk.agents.llm_agent import Agent
 
 
 class AgentRunner:
     @staticmethod
     async def run_streaming(
         query: str,
-        root_agent: Agent,
-        task_id: str
+        root_agent: "Agent",
+        task_id: str,
+        connection_id: Optional[str] = None,
+    ) -> AsyncIterator[str]:
+        """
+        Run ADK agent with task_id in session state, yielding text as it arrives.
+
+        Args:
+            query: User's question
+            root_agent: ADK agent to run
+            task_id: Unique task ID for this invocation
+            connection_id: Websocket connection owning the pooled session.
+                Without one, a throwaway session is used for this call only.
+
+        Yields:
+            Text chunks in arrival order; joined they form the final result
+        """
+        # ADK is imported on first use to keep it out of server startup
+        from google.adk.agents.run_config import RunConfig, StreamingMode
+        from google.genai import types
+
+        dispatched_at = time.perf_counter()
+        session_key = connection_id or task_id
+        session = await runner_pool.acquire(root_agent, APP_NAME, session_key)
+
+        logger.info("Running ADK agent", adk_session_id=session.session_id)
+
+        try:
+            # One run at a time per session; task_id is refreshed every turn
+            # (primitive - survives deepcopy)
+            async with session.lock:
+                # With SSE, ADK emits partial events followed by one aggregated
+                # event repeating their text; only the partials are yielded.
+                streamed_partials = False
+                first_event = True
+                # aclosing: on cancellation (tool deadline) the ADK run and any
+                # tool it is awaiting are closed right away, not at GC time
+                async with aclosing(session.runner.run_async(
+                    user_id=session.user_id,
+                    session_id=session.session_id,
+                    new_message=types.Content(role='user', parts=[types.Part(text=query)]),
+                    state_delta={'task_id': task_id},
+                    run_config=RunConfig(streaming_mode=StreamingMode.SSE),
+                )) as events:
+                    async for event in events:
+                        if first_event:
+                            ADK_FIRST_EVENT.observe(time.perf_counter() - dispatched_at)
+                            first_event = False
+                        if not event.partial and streamed_partials:
+                            streamed_partials = False
+                            continue
+                        if event.content and event.content.parts:
+                            text = "".join(p.text for p in event.content.parts if p.text)
+                            if text:
+                                logger.debug(f"[{event.author}]: {text}")
+                                streamed_partials = bool(event.partial)
+                                yield text
+        finally:
+            if connection_id is None:
+                await runner_pool.release(session_key)
+
+    @staticmethod
+    async def run(
+        query: str,
+        root_agent: "Agent",
+        task_id: str,
+        connection_id: Optional[str] = None,
     ) -> str:
         """
-        Run ADK agent with task_id in session state.
+        Run ADK agent to completion.
 
         Args:
             query: User's question
             root_agent: ADK agent to run
             task_id: Unique task ID for this invocation
+            connection_id: Websocket connection owning the pooled session
 
         Returns:
             Final accumulated result text
         """
-        runner = InMemoryRunner(agent=root_agent, app_name="my_app")
+        result_parts = []
+        async with aclosing(
+            AgentRunner.run_streaming(query, root_agent, task_id, connection_id)
+        ) as chunks:
+            async for text in chunks:
+                result_parts.append(text)
+        return "".join(result_parts)
 
-        # Create session with task_id in state (primitive - survives deepcopy)
-        session = await runner.session_service.create_session(
-            app_name="my_app",
-            user_id="test_user",
-            state={'task_id': task_id}  # Pass task ID
-        )
-
-        logger.info(f"Session {session.id[:8]} using task {task_id[:8]}")
 
-        result_text = ""
-        async for event in runner.run_async(
-            user_id=session.user_id,
-            session_id=session.id,
-            new_message=types.Content(role='user', parts=[types.Part(text=query)])
-        ):
-            if event.content and event.content.parts:
-                text = "".join(p.text for p in event.content.parts if p.text)
-                if text:
-                    logger.debug(f"[{event.author}]: {text}")
-                    result_text += text
+async def speak_sentences(chunks: AsyncIterator[str], speech_queue: SpeechQueue) -> str:
+    """
+    Queue TTS for each complete sentence as chunks arrive.
 
-        return result_text
+    Args:
+        chunks: Text chunks, e.g. from AgentRunner.run_streaming
+        speech_queue: The task's bounded, paced speech queue (see
+            get_speech_queue), so its overflow policy and clear() apply
+
+    Returns:
+        All chunks joined, for the LLM context
+    """
+    result_parts = []
+    pending = ""  # Only ever holds the current unfinished sentence
+    pending_since = 0.0  # When the event starting the pending sentence arrived
+
+    async def speak(text: str):
+        frame = TTSSpeakFrame(text=text)
+        frame.metadata[PRODUCED_AT] = pending_since
+        await speech_queue.queue_frames([frame])
+
+    async with aclosing(chunks):
+        async for text in chunks:
+            result_parts.append(text)
+            if not pending:
+                pending_since = time.perf_counter()
+            pending += text
+            end = match_endofsentence(pending)
+            while end:
+                await speak(pending[:end].strip())
+                pending = pending[end:]
+                pending_since = time.perf_counter()
+                end = match_endofsentence(pending)
+
+    if pending.strip():
+        await speak(pending.strip())
+    return "".join(result_parts)
 
 
 
 load_dotenv(override=True)
 
-logger.remove(0)
-logger.add(sys.stderr, level="DEBUG")
+setup_logging()
 # Define a function using the standard schema
 weather_function = FunctionSchema(
     name="get_current_weather",
@@ -105,6 +225,110 @@ weather_function = FunctionSchema(
 
 
 
+APP_NAME = "my_app"
+
+# Speak google_adk output sentence by sentence as it streams, instead of
+# handing the whole result to the LLM to speak at the end
+STREAM_ADK_RESULTS = os.getenv("ADK_STREAM_RESULTS", "false").lower() == "true"
+
+# Build the offline stand-ins from fake_services (for benchmark.py)
+FAKE_SERVICES = os.getenv("FAKE_SERVICES", "false").lower() == "true"
+
+# When to attach the Whisker debugger: "off", "always", "sampled" (a share of
+# sessions plus flagged ones) or "flagged" (only sessions flagged at /connect)
+WHISKER_MODE = os.getenv("WHISKER_MODE", "always")
+
+# Percentage of sessions observed in "sampled" mode
+WHISKER_SAMPLE_PERCENT = float(os.getenv("WHISKER_SAMPLE_PERCENT", "5"))
+
+# Port the Whisker debugger listens on (multi-worker mode adds the worker index)
+WHISKER_PORT = int(os.getenv("WHISKER_PORT", "9090"))
+
+# Connection holding this process's Whisker port; other sessions go unobserved
+_whisker_owner: Optional[str] = None
+
+# Upper bound on any tool call, in seconds
+TOOL_TIMEOUT = float(os.getenv("TOOL_TIMEOUT", "60"))
+
+# Per-tool deadlines, in seconds (capped by TOOL_TIMEOUT)
+TOOL_TIMEOUTS = {
+    "google_adk": float(os.getenv("ADK_TOOL_TIMEOUT", "30")),
+    "get_current_weather": float(os.getenv("WEATHER_TOOL_TIMEOUT", "10")),
+}
+
+
+# Shared across connections: identical calls within a tool's TTL reuse one
+# result, and concurrent identical calls share one execution (0 disables)
+def is_error_result(result) -> bool:
+    """Whether a tool reported an error (tools return "Error: ..." strings)."""
+    return isinstance(result, str) and result.startswith(("Error", "Unknown function"))
+
+
+tool_cache = ToolResultCache(
+    LRUResultCache(max_entries=int(os.getenv("TOOL_CACHE_MAX_ENTRIES", "1024"))),
+    # google_adk is never cached: its answer depends on the caller's ADK session
+    # and it speaks as it runs, which a replay to another caller would not
+    ttls={
+        "get_current_weather": float(os.getenv("WEATHER_CACHE_TTL", "300")),
+    },
+    # Errors and timeouts are not worth replaying to other callers
+    is_cacheable=lambda result: not is_error_result(result),
+)
+
+
+def get_tool_timeout(function_name: str) -> float:
+    """Get the deadline for one call of a tool, in seconds."""
+    return min(TOOL_TIMEOUTS.get(function_name, TOOL_TIMEOUT), TOOL_TIMEOUT)
+
+
+def should_attach_whisker(flagged: bool = False) -> bool:
+    """
+    Decide whether a new session gets the Whisker debugging observer, which
+    sees every frame and is costly at production load.
+
+    Args:
+        flagged: The session was flagged for debugging at /connect
+    """
+    if WHISKER_MODE == "always":
+        return True
+    if WHISKER_MODE in ("sampled", "flagged") and flagged:
+        return True
+    return WHISKER_MODE == "sampled" and random.random() * 100 < WHISKER_SAMPLE_PERCENT
+
+
+def claim_whisker(connection_id: str, flagged: bool = False) -> bool:
+    """
+    Decide whether a session gets the Whisker observer and, if so, reserve
+    the process's Whisker port for it until release_whisker().
+
+    Args:
+        connection_id: ID of the new connection
+        flagged: The session was flagged for debugging at /connect
+    """
+    global _whisker_owner
+    if _whisker_owner is not None or not should_attach_whisker(flagged):
+        return False
+    _whisker_owner = connection_id
+    return True
+
+
+def release_whisker(connection_id: str):
+    """Free the Whisker port if this connection holds it."""
+    global _whisker_owner
+    if _whisker_owner == connection_id:
+        _whisker_owner = None
+
+
+def tool_timeout_result(function_name: str, timeout: float) -> dict:
+    """Structured result telling the LLM a tool call ran out of time."""
+    return {
+        "status": "timeout",
+        "tool": function_name,
+        "timeout_seconds": timeout,
+        "message": f"{function_name} did not finish within {timeout:g} seconds.",
+    }
+
+
 SYSTEM_INSTRUCTION = f"""
 "You are Gemini Chatbot, a friendly, helpful robot.
 
@@ -115,7 +339,12 @@ Your job is to take the user's query and use the google_adk function to respond
 """
 
 
-async def google_adk(params: FunctionCallParams, query: str, task: PipelineTask):
+async def google_adk(
+    params: FunctionCallParams,
+    query: str,
+    task: PipelineTask,
+    connection_id: Optional[str] = None,
+):
     '''
     Use this tool to get the secret code with real-time TTS streaming.
     Simplified - tool calls task.queue_frames() directly (no queue complexity).
@@ -124,28 +353,64 @@ async def google_adk(params: FunctionCallParams, query: str, task: PipelineTask)
         params: Pipecat function call parameters
         query: The user's query
         task: Pipecat pipeline task for frame queueing
+        connection_id: Websocket connection ID, reuses its ADK session across turns
     '''
+    from demo.agent import get_root_agent
+
     logger.info(f"google_adk called with query: '{query}'")
+    root_agent = get_root_agent()
 
     # Step 1: Register task and get ID
-    task_id = register_task(task)
-    logger.info(f"Registered task {task_id[:8]}")
-
-    # Step 2: Run ADK agent (tool will call task directly)
-    try:
-        result = await AgentRunner.run_streaming(query, root_agent, task_id)
-        logger.info(f"ADK returned: {result[:50]}...")
-
-        # Return result to LLM
-        await params.result_callback(result)
-
-    except Exception as e:
-        logger.error(f"Task {task_id[:8]} error: {e}")
-        await params.result_callback(f"Error: {str(e)}")
-    finally:
-        # Cleanup: Always remove task from registry
-        unregister_task(task_id)
-        logger.info(f"Unregistered task {task_id[:8]}")
+    task_id = register_task(task, owner=connection_id)
+
+    # Step 2: Run ADK agent (tool will call task directly); logs carry the task ID
+    with logger.contextualize(task_id=task_id):
+        try:
+            if STREAM_ADK_RESULTS:
+                result = await speak_sentences(
+                    AgentRunner.run_streaming(query, root_agent, task_id, connection_id),
+                    get_speech_queue(task_id),
+                )
+                logger.info(f"ADK streamed: {result[:50]}...")
+
+                # Already spoken - record in context without another LLM turn
+                await params.result_callback(
+                    result, properties=FunctionCallResultProperties(run_llm=False)
+                )
+            else:
+                result = await AgentRunner.run(query, root_agent, task_id, connection_id)
+                logger.info(f"ADK returned: {result[:50]}...")
+
+                # Return result to LLM
+                await params.result_callback(result)
+
+        except asyncio.CancelledError:
+            # Deadline hit or pipeline cancelled: drop speech the tool still had queued
+            clear_speech_queue(task_id)
+            raise
+        except Exception as e:
+            logger.error(f"ADK error: {e}")
+            await params.result_callback(f"Error: {str(e)}")
+        finally:
+            # Cleanup: Always remove task from registry
+            unregister_task(task_id)
+            logger.info("Unregistered task")
+
+
+def warm_up():
+    """
+    Load what the first connection would otherwise pay for: the VAD model,
+    prebuilt services, the ADK SDK and the root agent.
+    """
+    from demo.agent import get_root_agent
+
+    preload_vad_model()
+    service_pool.fill()
+    get_root_agent()
+    if TTS_CACHE_PREWARM_FILE:
+        phrases = read_phrases(TTS_CACHE_PREWARM_FILE)
+        synthesized = prewarm_blocking(build_tts(), phrases, TTS_CACHE_PREWARM_SAMPLE_RATE)
+        logger.info(f"TTS cache prewarmed: {synthesized} of {len(phrases)} phrase(s) synthesized")
 
 
 async def get_current_weather(params: FunctionCallParams, location: str, format: str):
@@ -178,41 +443,123 @@ google_adk_schema = FunctionSchema(
 
 tools = ToolsSchema(standard_tools=[weather_function, google_adk_schema])
 
-async def run_bot(websocket_client):
-  
+CONTEXT_MESSAGES = [
+    {
+        "role": "system",
+        "content": " you are gemma who does only 1 job:- use the google_adk function to tell the time and use the get_current_weather function to get the weather.",
+    },
+    {
+        "role": "user",
+        "content": "can you tell the secret code ?",
+    }
+
+]
+
+
+class SharedClientOpenAILLMService(SpeculativeCompletionsMixin, OpenAILLMService):
+    """
+    OpenAILLMService that reuses one process-wide AsyncOpenAI client, so
+    connections keep the HTTP/TLS pool warm instead of each building its own.
+    Serves speculated turns when a Speculator is attached.
+    """
+
+    _clients: Dict[Tuple, object] = {}
+    # Services are also built off the loop (warm-up), so the map is shared across threads
+    _clients_lock = threading.Lock()
+
+    def create_client(self, api_key=None, base_url=None, organization=None, project=None, **kwargs):
+        key = (api_key, base_url, organization, project)
+        with self._clients_lock:
+            client = self._clients.get(key)
+            if client is None:
+                client = super().create_client(
+                    api_key=api_key,
+                    base_url=base_url,
+                    organization=organization,
+                    project=project,
+                    **kwargs,
+                )
+                self._clients[key] = client
+        return client
+
+
+class CachedDeepgramTTSService(CachedTTSMixin, DeepgramTTSService):
+    """DeepgramTTSService answering repeated phrases from the TTS audio cache."""
+
+
+@dataclass
+class ConnectionServices:
+    """Per-connection services, built ahead of time by service_pool."""
+    stt: STTService
+    llm: OpenAILLMService
+    tts: TTSService
+
+
+def build_tts() -> TTSService:
+    """Build one connection's TTS service, behind the TTS audio cache."""
+    if FAKE_SERVICES:
+        from fake_services import CachedFakeTTSService
+
+        return CachedFakeTTSService()
+    return CachedDeepgramTTSService(
+        api_key=os.getenv("DEEPGRAM_API_KEY"),
+        voice="aura-2-helena-en",
+    )
 
 
+def build_services() -> ConnectionServices:
+    """Build one connection's STT, LLM and TTS services."""
+    if FAKE_SERVICES:
+        from fake_services import FakeOpenAILLMService, FakeSTTService
+
+        return ConnectionServices(
+            stt=FakeSTTService(),
+            llm=FakeOpenAILLMService(model="gpt-4o-mini", system_instruction=SYSTEM_INSTRUCTION),
+            tts=build_tts(),
+        )
+    return ConnectionServices(
+        stt=DeepgramSTTService(api_key=os.getenv("DEEPGRAM_API_KEY")),
+        llm=SharedClientOpenAILLMService(
+            api_key=os.getenv("OPENAI_API_KEY"),
+            model="gpt-4o-mini",
+            system_instruction=SYSTEM_INSTRUCTION,
+        ),
+        tts=build_tts(),
+    )
+
+
+service_pool = ServicePool(build_services, size=int(os.getenv("PIPELINE_POOL_SIZE", "4")))
+
+async def run_bot(websocket_client, debug: bool = False):
+    """
+    Run one voice session on an accepted websocket.
+
+    Args:
+        websocket_client: FastAPI websocket of the caller
+        debug: The session was flagged for debugging at /connect
+    """
+    # Identifies this connection's pooled ADK session across turns
+    connection_id = str(uuid.uuid4())
+
     ws_transport = FastAPIWebsocketTransport(
         websocket=websocket_client,
         params=FastAPIWebsocketParams(
             audio_in_enabled=True,
             audio_out_enabled=True,
             add_wav_header=False,
-            vad_analyzer=SileroVADAnalyzer(),
-            serializer=ProtobufFrameSerializer(),
+            vad_analyzer=SharedSileroVADAnalyzer(),
+            # Input audio frames are views into the received messages
+            serializer=ZeroCopyProtobufFrameSerializer(),
         ),
     )
 
-    stt = DeepgramSTTService(api_key=os.getenv("DEEPGRAM_API_KEY"))
-    llm = OpenAILLMService(api_key=os.getenv("OPENAI_API_KEY"), model="gpt-4o-mini", system_instruction=SYSTEM_INSTRUCTION)
-
-    tts = DeepgramTTSService(
-        api_key=os.getenv("DEEPGRAM_API_KEY"),
-        voice="aura-2-helena-en",
-    )
+    # Prebuilt while idle; see service_pool
+    services = service_pool.acquire()
+    stt, llm, tts = services.stt, services.llm, services.tts
 
+    # The context appends to its message list, so each connection gets a copy
     context = OpenAILLMContext(
-        [
-            {
-                "role": "system",
-                "content": " you are gemma who does only 1 job:- use the google_adk function to tell the time and use the get_current_weather function to get the weather.",
-            },
-            {
-                "role": "user",
-                "content": "can you tell the secret code ?",
-            }
-
-        ],
+        [dict(message) for message in CONTEXT_MESSAGES],
         tools=tools,
     )
     context_aggregator = llm.create_context_aggregator(context)
@@ -220,37 +567,65 @@ async def run_bot(websocket_client):
     # RTVI events for Pipecat client UI
     rtvi = RTVIProcessor(config=RTVIConfig(config=[]))
 
+    # Keeps the context within budget on its way to the LLM, from the user
+    # aggregator (downstream) and after tool results (upstream)
+    context_window = ContextWindow()
+
+    # Starts the LLM turn on a stable interim transcript (see speculation)
+    speculation = []
+    if SPECULATION_ENABLED:
+        speculator = Speculator(
+            llm,
+            context,
+            # Defined below, once the task exists
+            prefetch_tool=lambda name, arguments: prefetch_tool(name, arguments),
+            compact=context_window.compact,
+        )
+        speculation = [SpeculationTrigger(speculator)]
+
     pipeline = Pipeline(
         [
             ws_transport.input(),
             stt,
+            *speculation,
             context_aggregator.user(),
             rtvi,
+            context_window,
             llm,
+            ContextWindow(),
             tts,
             ws_transport.output(),
             context_aggregator.assistant(),
         ]
     )
-    whisker = WhiskerObserver(pipeline)
+    observers = [RTVIObserver(rtvi), SpeechLatencyObserver()]
+    if claim_whisker(connection_id, debug):
+        logger.info(f"Attaching Whisker observer on port {WHISKER_PORT}")
+        observers.append(WhiskerObserver(pipeline, port=WHISKER_PORT))
     task = PipelineTask(
         pipeline,
         params=PipelineParams(
             enable_metrics=True,
             enable_usage_metrics=True,
         ),
-        observers=[RTVIObserver(rtvi),whisker],
+        # Each observer's cost shows up in /metrics as observer_seconds_total
+        observers=[TimedObserver(observer) for observer in observers],
     )
 
     # Define handler with access to task (closure)
-    async def handle_tool_function(params: FunctionCallParams):
+    async def dispatch_tool_function(params: FunctionCallParams):
         """Dispatch function calls with task access."""
         function_name = params.function_name
         args = params.arguments or {}
 
         if function_name == "google_adk":
             # Pass task to google_adk
-            await google_adk(params=params, query=args.get("query", ""), task=task)
+            await google_adk(
+                params=params,
+                query=args.get("query", ""),
+                task=task,
+                connection_id=connection_id,
+            )
             return
 
         if function_name == "get_current_weather":
@@ -263,9 +638,78 @@ async def run_bot(websocket_client):
 
         await params.result_callback(f"Unknown function: {function_name}")
 
+    async def handle_tool_function(params: FunctionCallParams):
+        """Dispatch a function call under its deadline, recording its outcome."""
+        function_name = params.function_name
+        timeout = get_tool_timeout(function_name)
+        started_at = time.perf_counter()
+        status = "cancelled"
+        results = []
+
+        async def record(result, **kwargs):
+            results.append(result)
+            await params.result_callback(result, **kwargs)
+
+        try:
+            await asyncio.wait_for(
+                tool_cache.run(
+                    dataclasses.replace(params, result_callback=record), dispatch_tool_function
+                ),
+                timeout=timeout,
+            )
+            status = "error" if results and is_error_result(results[0]) else "ok"
+        except asyncio.TimeoutError:
+            status = "timeout"
+            logger.warning(f"{function_name} timed out after {timeout:g}s")
+            await params.result_callback(tool_timeout_result(function_name, timeout))
+        except Exception:
+            status = "error"
+            raise
+        finally:
+            TOOL_DURATION.observe(time.perf_counter() - started_at, tool=function_name)
+            TOOL_CALLS.inc(tool=function_name, status=status)
+
+    async def prefetch_tool(function_name: str, arguments: dict):
+        """Run a speculated read-only call into the tool cache, for the real call to reuse."""
+        if tool_cache.ttls.get(function_name, 0) <= 0:
+            return  # Nothing would keep the result
+
+        async def discard(result, **kwargs):
+            pass
+
+        params = FunctionCallParams(
+            function_name=function_name,
+            tool_call_id=f"speculative_{uuid.uuid4().hex[:12]}",
+            arguments=arguments,
+            llm=llm,
+            context=context,
+            result_callback=discard,
+        )
+        try:
+            await asyncio.wait_for(
+                tool_cache.run(params, dispatch_tool_function),
+                timeout=get_tool_timeout(function_name),
+            )
+        except asyncio.TimeoutError:
+            logger.debug(f"Speculative {function_name} call timed out")
+
+    # Independent calls of one LLM turn run concurrently; results go back in order
+    tool_scheduler = ToolScheduler()
+
+    async def schedule_tool_function(params: FunctionCallParams):
+        await tool_scheduler.run(params, handle_tool_function)
+
+    # Pipecat schedules this handler before the per-call tasks, so the turn
+    # is known before any of its calls reach the scheduler
+    @llm.event_handler("on_function_calls_started")
+    async def on_function_calls_started(service, function_calls):
+        tool_scheduler.start_turn(
+            call.tool_call_id for call in function_calls if service.has_function(call.function_name)
+        )
+
     # Register handlers
-    llm.register_function("google_adk", handle_tool_function)
-    llm.register_function("get_current_weather", handle_tool_function)
+    llm.register_function("google_adk", schedule_tool_function)
+    llm.register_function("get_current_weather", schedule_tool_function)
 
     @rtvi.event_handler("on_client_ready")
     async def on_client_ready(rtvi):
@@ -281,8 +725,16 @@ async def run_bot(websocket_client):
     @ws_transport.event_handler("on_client_disconnected")
     async def on_client_disconnected(transport, client):
         logger.info("Pipecat Client disconnected")
+        unregister_owner(connection_id)
         await task.cancel()
 
     runner = PipelineRunner(handle_sigint=False)
 
-    await runner.run(task)
\ No newline at end of file
+    try:
+        # Everything the pipeline logs carries the connection ID
+        with logger.contextualize(session_id=connection_id):
+            await runner.run(task)
+    finally:
+        unregister_owner(connection_id)
+        release_whisker(connection_id)
+        await runner_pool.release(connection_id)
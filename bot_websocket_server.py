@@ -4,10 +4,19 @@
 # SPDX-License-Identifier: BSD 2-Clause License
 #
 
+"""
+Gemini Live bot for the websocket_server mode.
+
+One listening socket serves many callers: each accepted websocket gets its own
+transport, Gemini Live connection, context and pipeline, while the listener,
+the VAD model (see shared_vad) and the Gemini configuration are shared.
+New callers go through the same admission control as the fast_api mode.
+"""
+import asyncio
 import os
+import uuid
 
 from loguru import logger
-from pipecat.audio.vad.silero import SileroVADAnalyzer
 from pipecat.frames.frames import LLMRunFrame
 from pipecat.pipeline.pipeline import Pipeline
 from pipecat.pipeline.runner import PipelineRunner
@@ -17,9 +26,21 @@ from pipecat.processors.frameworks.rtvi import RTVIConfig, RTVIObserver, RTVIPro
 from pipecat.serializers.protobuf import ProtobufFrameSerializer
 from pipecat.services.gemini_multimodal_live import GeminiMultimodalLiveLLMService
 from pipecat.transports.websocket.server import (
+    WebsocketServerInputTransport,
     WebsocketServerParams,
     WebsocketServerTransport,
 )
+from websockets.asyncio.server import ServerConnection, serve
+
+from admission import AdmissionRejected, admission
+from shared_vad import SharedSileroVADAnalyzer
+
+# Address the websocket_server mode listens on
+WEBSOCKET_SERVER_HOST = os.getenv("WEBSOCKET_SERVER_HOST", "localhost")
+WEBSOCKET_SERVER_PORT = int(os.getenv("WEBSOCKET_SERVER_PORT", "8765"))
+
+# Longest session, in seconds
+SESSION_TIMEOUT = 60 * 3  # 3 minutes
 
 SYSTEM_INSTRUCTION = f"""
 "You are Gemini Chatbot, a friendly, helpful robot.
@@ -31,25 +52,111 @@ Your output will be converted to audio so don't include special characters in yo
 Respond to what the user said in a creative and helpful way. Keep your responses brief. One or two sentences at most.
 """
 
+# Every session's Gemini Live service is built from the same settings
+GEMINI_LIVE_SETTINGS = dict(
+    voice_id="Puck",  # Aoede, Charon, Fenrir, Kore, Puck
+    transcribe_model_audio=True,
+    system_instruction=SYSTEM_INSTRUCTION,
+)
+
 
-async def run_bot_websocket_server():
-    ws_transport = WebsocketServerTransport(
+class SessionWebsocketServerInputTransport(WebsocketServerInputTransport):
+    """
+    WebsocketServerInputTransport for one websocket accepted by a shared
+    listener, instead of a server of its own that admits a single client.
+    """
+
+    def __init__(self, websocket: ServerConnection, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._client = websocket
+
+    async def _server_task_handler(self):
+        """Serve the session's websocket until it closes or the pipeline ends."""
+        await self._callbacks.on_websocket_ready()
+        closer = asyncio.create_task(self._close_on_stop())
+        try:
+            await self._client_handler(self._client)
+        finally:
+            closer.cancel()
+
+    async def _close_on_stop(self):
+        await self._stop_server_event.wait()
+        await self._client.close()
+
+
+class SessionWebsocketServerTransport(WebsocketServerTransport):
+    """WebsocketServerTransport bound to one already-accepted websocket."""
+
+    def __init__(self, websocket: ServerConnection, params: WebsocketServerParams, **kwargs):
+        super().__init__(params, **kwargs)
+        self._client = websocket
+
+    def input(self) -> WebsocketServerInputTransport:
+        if not self._input:
+            self._input = SessionWebsocketServerInputTransport(
+                self._client,
+                self,
+                self._host,
+                self._port,
+                self._params,
+                self._callbacks,
+                name=self._input_name,
+            )
+        return self._input
+
+
+async def run_bot_websocket_server(host: str = WEBSOCKET_SERVER_HOST, port: int = WEBSOCKET_SERVER_PORT):
+    """
+    Accept callers on one listening socket, each in a session of its own.
+
+    Args:
+        host: Interface to listen on
+        port: Port to listen on
+    """
+    async with serve(_accept, host, port):
+        logger.info(f"Websocket server listening on {host}:{port}")
+        await asyncio.Future()  # Serve until cancelled
+
+
+async def _accept(websocket: ServerConnection):
+    """Run one caller's session; the connection closes when this returns."""
+    try:
+        # Waits briefly in a bounded queue when the process is over budget
+        await admission.acquire()
+    except AdmissionRejected as e:
+        # 1013: Try Again Later
+        await websocket.close(code=1013, reason=f"Server busy ({e.reason}), retry later")
+        return
+
+    try:
+        with logger.contextualize(session_id=str(uuid.uuid4())):
+            await run_session(websocket)
+    except Exception as e:
+        logger.exception(f"Session from {websocket.remote_address} failed: {e}")
+    finally:
+        await admission.release()
+
+
+async def run_session(websocket: ServerConnection):
+    """
+    Run one voice session on an accepted websocket.
+
+    Args:
+        websocket: The caller's connection, accepted by the shared listener
+    """
+    ws_transport = SessionWebsocketServerTransport(
+        websocket,
         params=WebsocketServerParams(
             serializer=ProtobufFrameSerializer(),
             audio_in_enabled=True,
             audio_out_enabled=True,
             add_wav_header=False,
-            vad_analyzer=SileroVADAnalyzer(),
-            session_timeout=60 * 3,  # 3 minutes
-        )
+            vad_analyzer=SharedSileroVADAnalyzer(),
+            session_timeout=SESSION_TIMEOUT,
+        ),
     )
 
-    llm = GeminiMultimodalLiveLLMService(
-        api_key=os.getenv("GOOGLE_API_KEY"),
-        voice_id="Puck",  # Aoede, Charon, Fenrir, Kore, Puck
-        transcribe_model_audio=True,
-        system_instruction=SYSTEM_INSTRUCTION,
-    )
+    llm = GeminiMultimodalLiveLLMService(api_key=os.getenv("GOOGLE_API_KEY"), **GEMINI_LIVE_SETTINGS)
 
     context = OpenAILLMContext(
         [
@@ -105,6 +212,6 @@ async def run_bot_websocket_server():
         logger.info(f"Entering in timeout for {client.remote_address}")
         await task.cancel()
 
-    runner = PipelineRunner()
+    runner = PipelineRunner(handle_sigint=False)
 
     await runner.run(task)
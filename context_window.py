@@ -0,0 +1,206 @@
+"""
+Rolling context window for long calls.
+
+The OpenAILLMContext of a session keeps every message and tool result and is
+resent on every LLM run, so prompt size (and with it LLM latency and cost)
+climbs over a long call. ContextWindow compacts the context in place each
+time it passes on its way to the LLM:
+
+- tool results longer than `max_tool_chars` are truncated
+- once the estimated size is over `token_budget`, the oldest turns are
+  dropped and folded into one short summary message (the user's and bot's
+  words from those turns, most recent first to be kept)
+
+Leading system messages and the tool schema are never touched, and turns are
+dropped whole, so tool calls always stay paired with their results.
+
+Tokens are estimated from characters (about four per token), which is close
+enough for a budget and needs no tokenizer.
+"""
+import json
+import os
+from typing import Any, Dict, List, Optional
+
+from pipecat.frames.frames import Frame
+from pipecat.processors.aggregators.openai_llm_context import OpenAILLMContext, OpenAILLMContextFrame
+from pipecat.processors.frame_processor import FrameDirection, FrameProcessor
+
+from metrics import Counter, Histogram
+
+# Estimated prompt tokens kept per LLM run (0 disables dropping turns)
+CONTEXT_TOKEN_BUDGET = int(os.getenv("CONTEXT_TOKEN_BUDGET", "3000"))
+
+# Longest tool result kept, in characters (0 disables truncation)
+CONTEXT_TOOL_RESULT_MAX_CHARS = int(os.getenv("CONTEXT_TOOL_RESULT_MAX_CHARS", "1500"))
+
+# Longest summary of dropped turns, in characters
+CONTEXT_SUMMARY_MAX_CHARS = int(os.getenv("CONTEXT_SUMMARY_MAX_CHARS", "800"))
+
+CHARS_PER_TOKEN = 4
+
+SUMMARY_PREFIX = "Summary of the earlier conversation: "
+
+TRUNCATED_MARK = " [truncated]"
+
+Message = Dict[str, Any]
+
+CONTEXT_TOKENS = Histogram(
+    "llm_context_tokens",
+    "Estimated prompt tokens of each context sent to the LLM, after compaction.",
+    buckets=(250, 500, 1000, 2000, 4000, 8000, 16000, 32000, 64000),
+)
+COMPACTIONS = Counter(
+    "context_compactions_total",
+    "Context compactions, by kind (truncated tool results or dropped turns).",
+    labelnames=("kind",),
+)
+
+
+def _content_text(content) -> str:
+    if isinstance(content, str):
+        return content
+    if isinstance(content, list):
+        return " ".join(part.get("text", "") for part in content if isinstance(part, dict))
+    return ""
+
+
+def estimate_tokens(messages: List[Message]) -> int:
+    """Rough token count of messages, from their text and tool call arguments."""
+    chars = 0
+    for message in messages:
+        chars += len(_content_text(message.get("content"))) + 8  # Role and framing
+        for tool_call in message.get("tool_calls") or ():
+            chars += len(json.dumps(tool_call.get("function", {})))
+    return chars // CHARS_PER_TOKEN
+
+
+def _split_turns(messages: List[Message]) -> List[List[Message]]:
+    """Group messages into turns, each starting at a user message."""
+    turns: List[List[Message]] = []
+    for message in messages:
+        if message.get("role") == "user" or not turns:
+            turns.append([])
+        turns[-1].append(message)
+    return turns
+
+
+def _is_summary(message: Message) -> bool:
+    return message.get("role") == "system" and _content_text(message.get("content")).startswith(SUMMARY_PREFIX)
+
+
+class ContextWindow(FrameProcessor):
+    """
+    Compacts every OpenAILLMContext passing through, in either direction.
+
+    The LLM is reached downstream from the user aggregator and upstream from
+    the assistant aggregator (after a tool result), so place one in front of
+    the LLM on each side.
+    """
+
+    def __init__(
+        self,
+        token_budget: int = CONTEXT_TOKEN_BUDGET,
+        max_tool_chars: int = CONTEXT_TOOL_RESULT_MAX_CHARS,
+        summary_max_chars: int = CONTEXT_SUMMARY_MAX_CHARS,
+        **kwargs,
+    ):
+        """
+        Args:
+            token_budget: Estimated prompt tokens kept (0 disables dropping turns)
+            max_tool_chars: Longest tool result kept (0 disables truncation)
+            summary_max_chars: Longest summary of dropped turns
+        """
+        super().__init__(**kwargs)
+        self.token_budget = token_budget
+        self.max_tool_chars = max_tool_chars
+        self.summary_max_chars = summary_max_chars
+
+    async def process_frame(self, frame: Frame, direction: FrameDirection):
+        await super().process_frame(frame, direction)
+        if isinstance(frame, OpenAILLMContextFrame):
+            self.compact(frame.context)
+            CONTEXT_TOKENS.observe(estimate_tokens(frame.context.messages))
+        await self.push_frame(frame, direction)
+
+    def compact(self, context: OpenAILLMContext) -> bool:
+        """
+        Compact a context in place.
+
+        Args:
+            context: Context about to be sent to the LLM
+
+        Returns:
+            bool: Whether anything was truncated or dropped
+        """
+        messages = context.messages
+        truncated = self._truncate_tool_results(messages)
+        if truncated:
+            COMPACTIONS.inc(truncated, kind="tool_result")
+
+        compacted = self._drop_old_turns(messages)
+        if compacted is not None:
+            context.set_messages(compacted)
+        return bool(truncated) or compacted is not None
+
+    def _truncate_tool_results(self, messages: List[Message]) -> int:
+        if self.max_tool_chars <= 0:
+            return 0
+        truncated = 0
+        for message in messages:
+            content = message.get("content")
+            if (
+                message.get("role") == "tool"
+                and isinstance(content, str)
+                and len(content) > self.max_tool_chars
+                and not content.endswith(TRUNCATED_MARK)
+            ):
+                message["content"] = content[: self.max_tool_chars] + TRUNCATED_MARK
+                truncated += 1
+        return truncated
+
+    def _drop_old_turns(self, messages: List[Message]) -> Optional[List[Message]]:
+        """The compacted message list, or None if it is within budget."""
+        if self.token_budget <= 0 or estimate_tokens(messages) <= self.token_budget:
+            return None
+
+        # Leading system messages (the prompt and any earlier summary) are kept
+        head_len = 0
+        while head_len < len(messages) and messages[head_len].get("role") == "system":
+            head_len += 1
+        head = [message for message in messages[:head_len] if not _is_summary(message)]
+        previous = next((m for m in messages[:head_len] if _is_summary(m)), None)
+        turns = _split_turns(messages[head_len:])
+
+        dropped: List[List[Message]] = []
+        # The current turn is always kept, even if it alone is over budget
+        while len(turns) > 1:
+            summary = self._summarize(previous, dropped)
+            kept = head + ([summary] if summary else []) + [m for turn in turns for m in turn]
+            if estimate_tokens(kept) <= self.token_budget:
+                break
+            dropped.append(turns.pop(0))
+        if not dropped:
+            return None
+
+        COMPACTIONS.inc(len(dropped), kind="turn")
+        summary = self._summarize(previous, dropped)
+        return head + ([summary] if summary else []) + [m for turn in turns for m in turn]
+
+    def _summarize(self, previous: Optional[Message], dropped: List[List[Message]]) -> Optional[Message]:
+        """Fold dropped turns into the summary message, newest words kept first."""
+        lines = []
+        for turn in dropped:
+            for message in turn:
+                text = _content_text(message.get("content")).strip()
+                if text and message.get("role") in ("user", "assistant"):
+                    speaker = "User" if message["role"] == "user" else "Bot"
+                    lines.append(f"{speaker}: {text}")
+        if not lines:
+            return previous
+
+        summary = " | ".join(lines)
+        if previous is not None:
+            summary = _content_text(previous["content"])[len(SUMMARY_PREFIX):] + " | " + summary
+        if len(summary) > self.summary_max_chars:
+            summary = "..." + summary[-self.summary_max_chars:]
+        return {"role": "system", "content": SUMMARY_PREFIX + summary}
@@ -1,13 +1,15 @@
 from google.adk.agents.llm_agent import Agent
 from google.adk.tools.tool_context import ToolContext
 import asyncio
+import hashlib
 import sys
 import os
 from dotenv import load_dotenv
 
-# Add parent directory to path to import streaming_bridge
+# Add parent directory to path to import streaming_bridge and tool_offload
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from streaming_bridge import get_task
+from streaming_bridge import get_speech_queue
+from tool_offload import offload_tool
 from pipecat.frames.frames import TTSSpeakFrame
 from loguru import logger
 
@@ -18,7 +20,7 @@ load_dotenv()
 async def streaming_tool(tool_context: ToolContext) -> str:
     """
     Streaming tool that speaks digits progressively via TTS.
-    Calls Pipecat task directly - no queue complexity!
+    Speaks through the task's bounded speech queue.
 
     Args:
         tool_context: ADK tool context with session state access
@@ -34,14 +36,16 @@ async def streaming_tool(tool_context: ToolContext) -> str:
         logger.error(error_msg)
         return error_msg
 
-    # Retrieve task from global registry
-    task = get_task(task_id)
-    if not task:
+    # Retrieve the task's bounded speech queue from the global registry
+    speech = get_speech_queue(task_id)
+    if not speech:
         error_msg = f"Error: Task {task_id[:8]}... not found"
         logger.error(error_msg)
         return error_msg
 
-    logger.info(f"Tool using task: {task_id[:8]}...")
+    # Fragments are logged at debug level, which is sampled per session
+    log = logger.bind(task_id=task_id)
+    log.info("Tool using task")
 
     # Progressive computation with direct TTS calls
     code = "1234"
@@ -49,21 +53,68 @@ async def streaming_tool(tool_context: ToolContext) -> str:
         await asyncio.sleep(0.3)  # Simulate processing time
 
         text = f"Digit {i+1} is {digit}"
-        logger.info(f"[Task {task_id[:8]}] Speaking: {text}")
+        log.debug(f"Speaking: {text}")
 
-        # DIRECT CALL - No queue, no monitor, no sentinel!
-        await task.queue_frames([TTSSpeakFrame(text=text)])
+        # Bounded and paced; may wait, merge or drop per SPEECH_QUEUE_POLICY
+        await speech.queue_frames([TTSSpeakFrame(text=text)])
 
     final_msg = "Secret code retrieval complete!"
-    logger.info(f"[Task {task_id[:8]}] Complete")
+    log.info("Complete")
     return final_msg
 
 
-# Configure agent with streaming tool
-root_agent = Agent(
-    model='gemini-2.5-flash',
-    name='root_agent',
-    description='A helpful assistant for user questions.',
-    instruction='Answer user questions to the best of your knowledge',
-    tools=[streaming_tool],
-)
+@offload_tool
+def fingerprint_tool(code: str, emit) -> str:
+    """
+    Computes a slow, salted fingerprint of a code, so codes can be compared
+    without reading them out.
+
+    Args:
+        code: The code to fingerprint
+
+    Returns:
+        str: The first 8 hex digits of the fingerprint
+    """
+    # Key stretching is CPU-bound, so it runs on the tool worker pool instead
+    # of the audio event loop; emit() speaks through the task's speech queue
+    emit("Computing the fingerprint")
+    digest = hashlib.pbkdf2_hmac("sha256", code.encode(), b"pipecat-demo", 200_000)
+    return f"Fingerprint: {digest.hex()[:8]}"
+
+
+_root_agent = None
+
+
+def _agent_model():
+    """Gemini, or a local stand-in when FAKE_SERVICES is set (see benchmark.py)."""
+    if os.getenv("FAKE_SERVICES", "false").lower() == "true":
+        from fake_services import FakeGeminiLlm
+        return FakeGeminiLlm()
+    return 'gemini-2.5-flash'
+
+
+def get_root_agent() -> Agent:
+    """
+    Build the root agent on first use instead of at import time.
+
+    Returns:
+        Agent: The shared root agent
+    """
+    global _root_agent
+    if _root_agent is None:
+        # Configure agent with its tools (the fake model calls the first one)
+        _root_agent = Agent(
+            model=_agent_model(),
+            name='root_agent',
+            description='A helpful assistant for user questions.',
+            instruction='Answer user questions to the best of your knowledge',
+            tools=[streaming_tool, fingerprint_tool],
+        )
+    return _root_agent
+
+
+def __getattr__(name):
+    # Keeps `from demo.agent import root_agent` (and adk web) working
+    if name == "root_agent":
+        return get_root_agent()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,226 @@
+"""
+Local stand-ins for Deepgram, OpenAI and Gemini, for offline benchmarks.
+
+With FAKE_SERVICES=true, bot_fast_api builds these instead of the real
+services and the ADK root agent runs on FakeGeminiLlm. Each call waits a
+configurable latency, plus or minus FAKE_JITTER of it, so the pipeline, tool
+scheduling, the ADK runner and the streaming bridge all run for real while
+nothing leaves the machine.
+
+A turn then goes: fake STT transcribes each utterance as a fixed question,
+the fake OpenAI model calls google_adk with it, the fake Gemini model calls
+streaming_tool (which speaks its digits), and the fake OpenAI model answers
+with the tool result, spoken by fake TTS as a tone of realistic length.
+"""
+import asyncio
+import json
+import os
+import random
+import time
+import uuid
+from typing import AsyncGenerator, AsyncIterator, Optional
+
+import numpy as np
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.genai import types
+from loguru import logger
+from openai.types.chat import ChatCompletionChunk
+from openai.types.chat.chat_completion_chunk import (
+    Choice,
+    ChoiceDelta,
+    ChoiceDeltaToolCall,
+    ChoiceDeltaToolCallFunction,
+)
+from pipecat.frames.frames import (
+    Frame,
+    InterimTranscriptionFrame,
+    TranscriptionFrame,
+    TTSAudioRawFrame,
+    TTSStartedFrame,
+    TTSStoppedFrame,
+)
+from pipecat.services.openai.llm import OpenAILLMService
+from pipecat.services.stt_service import STTService
+from pipecat.services.tts_service import TTSService
+from pipecat.utils.time import time_now_iso8601
+
+from speculation import SpeculativeCompletionsMixin
+from tts_cache import CachedTTSMixin
+
+# Per-call latencies, in seconds
+STT_LATENCY = float(os.getenv("FAKE_STT_LATENCY", "0.15"))
+LLM_LATENCY = float(os.getenv("FAKE_LLM_LATENCY", "0.35"))  # To first token
+TTS_LATENCY = float(os.getenv("FAKE_TTS_LATENCY", "0.2"))  # To first audio
+ADK_LATENCY = float(os.getenv("FAKE_ADK_LATENCY", "0.4"))
+
+# Latencies vary uniformly by this fraction either way
+JITTER = float(os.getenv("FAKE_JITTER", "0.25"))
+
+# Spoken length of fake TTS audio per character of text
+TTS_SECONDS_PER_CHAR = 0.06
+
+
+def fake_delay(latency: float) -> float:
+    """A latency with jitter applied, in seconds."""
+    return max(0.0, latency * (1 + random.uniform(-JITTER, JITTER)))
+
+
+class FakeSTTService(STTService):
+    """
+    Transcribes every utterance as `transcript`. An utterance is audio above
+    `energy_threshold` (RMS) and ends after `silence_ms` below it.
+    """
+
+    def __init__(
+        self,
+        transcript: str = "Can you tell me the secret code?",
+        energy_threshold: float = 500.0,
+        silence_ms: int = 300,
+        **kwargs,
+    ):
+        super().__init__(**kwargs)
+        self.transcript = transcript
+        self.energy_threshold = energy_threshold
+        self.silence_ms = silence_ms
+        self._in_utterance = False
+        self._silence = 0.0
+
+    async def run_stt(self, audio: bytes) -> AsyncGenerator[Frame, None]:
+        samples = np.frombuffer(audio, dtype=np.int16).astype(np.float32)
+        rms = float(np.sqrt(np.mean(samples**2))) if samples.size else 0.0
+        duration = samples.size / (self.sample_rate or 16000)
+
+        if rms >= self.energy_threshold:
+            self._in_utterance = True
+            self._silence = 0.0
+        elif self._in_utterance:
+            self._silence += duration
+            if self._silence * 1000 >= self.silence_ms:
+                self._in_utterance = False
+                # An interim result now and the final one in the background,
+                # like a streaming STT service
+                self.create_task(self._transcribe())
+                yield InterimTranscriptionFrame(self.transcript, "", time_now_iso8601())
+                return
+        yield None
+
+    async def _transcribe(self):
+        await asyncio.sleep(fake_delay(STT_LATENCY))
+        await self.push_frame(TranscriptionFrame(self.transcript, "", time_now_iso8601()))
+
+
+class FakeOpenAIClient:
+    """The slice of AsyncOpenAI that the OpenAI LLM service uses, answered locally."""
+
+    def __init__(self, words_per_second: float = 40.0):
+        self.words_per_second = words_per_second
+        self.chat = self
+        self.completions = self
+
+    async def create(self, messages, tools=None, **kwargs) -> AsyncIterator[ChatCompletionChunk]:
+        return self._stream(messages, tools)
+
+    async def _stream(self, messages, tools) -> AsyncIterator[ChatCompletionChunk]:
+        await asyncio.sleep(fake_delay(LLM_LATENCY))
+        last = messages[-1] if messages else {}
+        tools = tools if isinstance(tools, list) else []  # May be NOT_GIVEN
+        tool_names = [tool["function"]["name"] for tool in tools if "function" in tool]
+
+        if last.get("role") == "user" and "google_adk" in tool_names:
+            call = ChoiceDeltaToolCall(
+                index=0,
+                id=f"call_{uuid.uuid4().hex[:12]}",
+                function=ChoiceDeltaToolCallFunction(
+                    name="google_adk",
+                    arguments=json.dumps({"query": _text_of(last)}),
+                ),
+            )
+            yield _chunk(ChoiceDelta(tool_calls=[call]))
+            return
+
+        if last.get("role") == "tool":
+            reply = f"Here is what I found. {_text_of(last)}"
+        else:
+            reply = "Hello, how can I help you today?"
+        for word in reply.split():
+            yield _chunk(ChoiceDelta(content=word + " "))
+            await asyncio.sleep(1 / self.words_per_second)
+
+
+def _text_of(message: dict) -> str:
+    content = message.get("content") or ""
+    if isinstance(content, list):
+        content = " ".join(part.get("text", "") for part in content if isinstance(part, dict))
+    return str(content)
+
+
+def _chunk(delta: ChoiceDelta) -> ChatCompletionChunk:
+    return ChatCompletionChunk(
+        id="fake",
+        choices=[Choice(index=0, delta=delta, finish_reason=None)],
+        created=int(time.time()),
+        model="fake",
+        object="chat.completion.chunk",
+    )
+
+
+class FakeOpenAILLMService(SpeculativeCompletionsMixin, OpenAILLMService):
+    """OpenAILLMService backed by FakeOpenAIClient."""
+
+    def create_client(self, api_key=None, base_url=None, organization=None, project=None, **kwargs):
+        return FakeOpenAIClient()
+
+
+class FakeTTSService(TTSService):
+    """Speaks text as a quiet tone lasting as long as the speech would."""
+
+    def __init__(self, chunk_seconds: float = 0.1, **kwargs):
+        super().__init__(**kwargs)
+        self.chunk_seconds = chunk_seconds
+
+    def can_generate_metrics(self) -> bool:
+        return True
+
+    async def run_tts(self, text: str) -> AsyncGenerator[Frame, None]:
+        await self.start_ttfb_metrics()
+        await asyncio.sleep(fake_delay(TTS_LATENCY))
+        yield TTSStartedFrame()
+        await self.stop_ttfb_metrics()
+
+        samples_per_chunk = int(self.sample_rate * self.chunk_seconds)
+        tone = (np.sin(np.arange(samples_per_chunk) * 2 * np.pi * 220 / self.sample_rate) * 3000)
+        audio = tone.astype(np.int16).tobytes()
+        for _ in range(max(1, round(len(text) * TTS_SECONDS_PER_CHAR / self.chunk_seconds))):
+            yield TTSAudioRawFrame(audio=audio, sample_rate=self.sample_rate, num_channels=1)
+        yield TTSStoppedFrame()
+
+
+class CachedFakeTTSService(CachedTTSMixin, FakeTTSService):
+    """FakeTTSService behind the TTS audio cache, like the Deepgram one."""
+
+
+class FakeGeminiLlm(BaseLlm):
+    """
+    ADK model that calls the agent's first tool for a new question and
+    answers with a fixed sentence once the tool has responded.
+    """
+
+    model: str = "fake-gemini"
+    answer: str = "The secret code is 1234."
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        await asyncio.sleep(fake_delay(ADK_LATENCY))
+        last = llm_request.contents[-1] if llm_request.contents else None
+        answered = last is not None and any(part.function_response for part in last.parts or [])
+
+        tool_name: Optional[str] = next(iter(llm_request.tools_dict), None)
+        if answered or tool_name is None:
+            part = types.Part(text=self.answer)
+        else:
+            logger.debug(f"Fake Gemini calling {tool_name}")
+            part = types.Part(function_call=types.FunctionCall(name=tool_name, args={}))
+        yield LlmResponse(content=types.Content(role="model", parts=[part]))
@@ -0,0 +1,178 @@
+"""
+Logging setup for the bot processes.
+
+Records are written to stderr as text or JSON. With LOG_ASYNC, records are
+written by loguru's background thread, so formatting and I/O stay off the
+event loop. Session and task IDs are bound as context
+(logger.contextualize / logger.bind) and appear as fields instead of being
+formatted into messages.
+
+Debug records are sampled and rate-limited per session, so a few chatty
+sessions cannot flood the sink. Everything can be changed at runtime with
+configure_logging() (exposed as /logging by server.py).
+"""
+import os
+import random
+import sys
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass, replace
+from typing import Optional
+
+from loguru import logger
+
+# Minimum level written
+LOG_LEVEL = os.getenv("LOG_LEVEL", "DEBUG").upper()
+
+# "text" or "json" (one JSON object per line, context in record.extra)
+LOG_FORMAT = os.getenv("LOG_FORMAT", "text")
+
+# Write records from a background thread instead of the caller
+LOG_ASYNC = os.getenv("LOG_ASYNC", "true").lower() == "true"
+
+# Debug records per second allowed per session (0 means no limit)
+LOG_DEBUG_RATE = float(os.getenv("LOG_DEBUG_RATE", "0"))
+
+# Fraction of debug records kept, before rate limiting
+LOG_DEBUG_SAMPLE = float(os.getenv("LOG_DEBUG_SAMPLE", "1.0"))
+
+FORMATS = ("text", "json")
+
+_INFO = logger.level("INFO").no
+
+_TEXT_FORMAT = (
+    "<green>{time:YYYY-MM-DD HH:mm:ss.SSS}</green> | <level>{level: <8}</level> | "
+    "<cyan>{name}</cyan>:<cyan>{function}</cyan>:<cyan>{line}</cyan> - <level>{message}</level>"
+)
+
+
+@dataclass
+class LogSettings:
+    """Current logging configuration."""
+    level: str = LOG_LEVEL
+    format: str = LOG_FORMAT
+    enqueue: bool = LOG_ASYNC
+    debug_rate: float = LOG_DEBUG_RATE
+    debug_sample: float = LOG_DEBUG_SAMPLE
+
+
+class DebugRateLimiter:
+    """Token bucket per session; the least recently seen sessions are forgotten."""
+
+    def __init__(self, rate: float, burst: Optional[float] = None, max_sessions: int = 4096):
+        """
+        Args:
+            rate: Records per second per session (0 means no limit)
+            burst: Records allowed at once (defaults to one second's worth)
+            max_sessions: Sessions tracked before the oldest is dropped
+        """
+        self.rate = rate
+        self.burst = burst if burst is not None else max(rate, 1.0)
+        self.max_sessions = max_sessions
+        self._buckets: "OrderedDict[Optional[str], list]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def allow(self, session_id: Optional[str]) -> bool:
+        if self.rate <= 0:
+            return True
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.pop(session_id, None) or [self.burst, now]
+            tokens = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+            allowed = tokens >= 1
+            self._buckets[session_id] = [tokens - 1 if allowed else tokens, now]
+            while len(self._buckets) > self.max_sessions:
+                self._buckets.popitem(last=False)
+        return allowed
+
+
+_settings = LogSettings()
+_limiter = DebugRateLimiter(_settings.debug_rate)
+_handler_id: Optional[int] = 0  # loguru's default stderr handler
+_configured = False
+_lock = threading.Lock()
+
+
+def _filter(record) -> bool:
+    if record["level"].no >= _INFO:
+        return True
+    if _settings.debug_sample < 1 and random.random() >= _settings.debug_sample:
+        return False
+    return _limiter.allow(record["extra"].get("session_id"))
+
+
+def _format_text(record) -> str:
+    # Bound context is appended as key=value fields
+    fields = " ".join(f"{key}={{extra[{key}]}}" for key in record["extra"])
+    return _TEXT_FORMAT + (f" | {fields}" if fields else "") + "\n{exception}"
+
+
+def _validate(settings: LogSettings) -> LogSettings:
+    """Check field types and values (they may come from a JSON body), normalizing the level."""
+    if not isinstance(settings.level, str):
+        raise ValueError(f"Log level must be a string: {settings.level!r}")
+    settings.level = settings.level.upper()
+    logger.level(settings.level)  # Raises ValueError for unknown levels
+    if settings.format not in FORMATS:
+        raise ValueError(f"Unknown log format: {settings.format!r}")
+    if not isinstance(settings.enqueue, bool):
+        raise ValueError(f"enqueue must be true or false: {settings.enqueue!r}")
+    for name in ("debug_rate", "debug_sample"):
+        value = getattr(settings, name)
+        # bool is an int subclass, but true/false is not a rate
+        if isinstance(value, bool) or not isinstance(value, (int, float)) or value < 0:
+            raise ValueError(f"{name} must be a non-negative number: {value!r}")
+    if settings.debug_sample > 1:
+        raise ValueError(f"debug_sample must be at most 1: {settings.debug_sample!r}")
+    return settings
+
+
+def configure_logging(**changes) -> LogSettings:
+    """
+    Apply new logging settings, replacing the current handler.
+
+    Args:
+        **changes: LogSettings fields to change (level, format, enqueue,
+            debug_rate, debug_sample)
+
+    Returns:
+        LogSettings: The settings now in effect
+
+    Raises:
+        ValueError: If a field is unknown or has an invalid type or value
+    """
+    global _settings, _limiter, _handler_id, _configured
+    with _lock:
+        unknown = set(changes) - set(asdict(_settings))
+        if unknown:
+            raise ValueError(f"Unknown logging settings: {', '.join(sorted(unknown))}")
+        settings = _validate(replace(_settings, **changes))
+
+        _settings = settings
+        _limiter = DebugRateLimiter(settings.debug_rate)
+        if _handler_id is not None:
+            try:
+                logger.remove(_handler_id)
+            except ValueError:
+                pass  # Already removed elsewhere
+        _handler_id = logger.add(
+            sys.stderr,
+            level=settings.level,
+            format=_format_text if settings.format == "text" else "{message}",
+            serialize=settings.format == "json",
+            enqueue=settings.enqueue,
+            filter=_filter,
+        )
+        _configured = True
+    return settings
+
+
+def setup_logging() -> LogSettings:
+    """Configure logging from the environment unless already configured."""
+    return _settings if _configured else configure_logging()
+
+
+def get_log_settings() -> dict:
+    """Get the logging settings in effect (for /logging)."""
+    return asdict(_settings)
@@ -0,0 +1,265 @@
+"""
+Process-local latency histograms and counters for the ADK-Pipecat bridge,
+rendered in the Prometheus text format by server.py's /metrics endpoint.
+
+Metrics are plain in-memory objects with no external dependency. Each server
+process (every worker in multi-worker mode) keeps and serves its own; scrape
+each worker port.
+
+Hot-path spans:
+
+- adk_first_event_seconds: google_adk dispatch to the first ADK event
+- speech_forward_delay_seconds: a fragment produced by an ADK event or tool
+  to its queue_frames() into the pipeline
+- speech_tts_start_seconds: queue_frames() to the TTS service starting
+- tool_duration_seconds: full tool call, including cache and deadline
+"""
+import time
+from collections import deque
+from typing import Callable, Dict, Iterable, List, Tuple
+
+from pipecat.frames.frames import Frame, TTSSpeakFrame, TTSStartedFrame
+from pipecat.observers.base_observer import BaseObserver, FrameProcessed, FramePushed
+
+# Latency buckets, in seconds
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# Frame.metadata keys holding perf_counter() timestamps
+PRODUCED_AT = "produced_at"
+FORWARDED_AT = "forwarded_at"
+
+_registry: List["_Metric"] = []
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labelnames: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(labelnames, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        _registry.append(self)
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        try:
+            if len(labels) == len(self.labelnames):
+                return tuple(str(labels[name]) for name in self.labelnames)
+        except KeyError:
+            pass
+        raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+
+    def collect(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    """Monotonic count, optionally split by labels."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0) + amount
+
+    def get(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def collect(self) -> List[str]:
+        lines = super().collect()
+        for key, value in self._values.items():
+            lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {value:g}")
+        return lines
+
+
+class Gauge(_Metric):
+    """Current value read from a callback at scrape time."""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, getter: Callable[[], float]):
+        super().__init__(name, documentation)
+        self.getter = getter
+
+    def collect(self) -> List[str]:
+        return super().collect() + [f"{self.name} {self.getter():g}"]
+
+
+class Histogram(_Metric):
+    """Distribution of observed durations, optionally split by labels."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Iterable[str] = (),
+        buckets: Iterable[float] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: (bucket counts, sum, count)
+        self._values: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        series = self._values.get(key)
+        if series is None:
+            series = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                series[0][i] += 1
+                break
+        series[1] += value
+        series[2] += 1
+
+    def get_count(self, **labels) -> int:
+        series = self._values.get(self._key(labels))
+        return series[2] if series else 0
+
+    def collect(self) -> List[str]:
+        lines = super().collect()
+        for key, (counts, total, count) in self._values.items():
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                le = _format_labels(self.labelnames, key, f'le="{bound:g}"')
+                lines.append(f"{self.name}_bucket{le} {cumulative}")
+            le = _format_labels(self.labelnames, key, 'le="+Inf"')
+            lines.append(f"{self.name}_bucket{le} {count}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {total:g}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+def render_metrics() -> str:
+    """Render every metric of this process in the Prometheus text format."""
+    lines = []
+    for metric in _registry:
+        lines.extend(metric.collect())
+    return "\n".join(lines) + "\n"
+
+
+ADK_FIRST_EVENT = Histogram(
+    "adk_first_event_seconds",
+    "Time from google_adk dispatch to the first ADK event.",
+)
+SPEECH_FORWARD_DELAY = Histogram(
+    "speech_forward_delay_seconds",
+    "Time from a speech fragment being produced to its queue_frames() into the pipeline.",
+    labelnames=("source",),
+)
+SPEECH_TTS_START = Histogram(
+    "speech_tts_start_seconds",
+    "Time from queue_frames() of tool speech to the TTS service starting.",
+)
+TOOL_DURATION = Histogram(
+    "tool_duration_seconds",
+    "Full duration of a tool call.",
+    labelnames=("tool",),
+)
+OBSERVER_SECONDS = Counter(
+    "observer_seconds_total",
+    "Time spent in each pipeline observer's frame callbacks.",
+    labelnames=("observer",),
+)
+OBSERVER_FRAMES = Counter(
+    "observer_frames_total",
+    "Frame callbacks delivered to each pipeline observer.",
+    labelnames=("observer",),
+)
+TOOL_CALLS = Counter(
+    "tool_calls_total",
+    "Tool calls by outcome (ok, error, timeout or cancelled).",
+    labelnames=("tool", "status"),
+)
+
+
+def mark_produced(frame: Frame):
+    """Stamp a speech frame when its text is produced, unless already stamped."""
+    frame.metadata.setdefault(PRODUCED_AT, time.perf_counter())
+
+
+def mark_forwarded(frame: Frame, source: str):
+    """Record a speech frame's forward delay and stamp it for TTS start timing."""
+    now = time.perf_counter()
+    produced_at = frame.metadata.get(PRODUCED_AT)
+    if produced_at is not None:
+        SPEECH_FORWARD_DELAY.observe(now - produced_at, source=source)
+    frame.metadata[FORWARDED_AT] = now
+
+
+class SpeechLatencyObserver(BaseObserver):
+    """
+    Times tool speech from queue_frames() to the TTS service starting.
+
+    TTSStartedFrame does not say which text it is for, so forwarded frames are
+    matched to TTS starts in order; speech the LLM generates in between can
+    skew individual samples.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._forwarded: deque = deque(maxlen=64)
+
+    async def on_push_frame(self, data: FramePushed):
+        frame = data.frame
+        if isinstance(frame, TTSSpeakFrame):
+            # Popped so later hops of the same frame are not counted again
+            forwarded_at = frame.metadata.pop(FORWARDED_AT, None)
+            if forwarded_at is not None:
+                self._forwarded.append(forwarded_at)
+        elif isinstance(frame, TTSStartedFrame) and not frame.metadata.get("timed"):
+            frame.metadata["timed"] = True
+            if self._forwarded:
+                SPEECH_TTS_START.observe(time.perf_counter() - self._forwarded.popleft())
+
+
+class TimedObserver(BaseObserver):
+    """
+    Wraps an observer to record the time its frame callbacks take, per
+    observer class, in observer_seconds_total and observer_frames_total.
+    """
+
+    def __init__(self, observer: BaseObserver):
+        super().__init__()
+        self.observer = observer
+        self._label = type(observer).__name__
+
+    async def on_process_frame(self, data: FrameProcessed):
+        started_at = time.perf_counter()
+        try:
+            await self.observer.on_process_frame(data)
+        finally:
+            self._record(started_at)
+
+    async def on_push_frame(self, data: FramePushed):
+        started_at = time.perf_counter()
+        try:
+            await self.observer.on_push_frame(data)
+        finally:
+            self._record(started_at)
+
+    async def cleanup(self):
+        await super().cleanup()
+        await self.observer.cleanup()
+
+    def _record(self, started_at: float):
+        OBSERVER_SECONDS.inc(time.perf_counter() - started_at, observer=self._label)
+        OBSERVER_FRAMES.inc(observer=self._label)
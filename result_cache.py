@@ -0,0 +1,193 @@
+"""
+Tool result cache with per-tool TTLs and single-flight dedup.
+
+Sits in front of handle_tool_function: identical calls (same function name
+and normalized arguments) within a tool's TTL are answered from the cache,
+and concurrent identical calls share one in-flight execution instead of each
+hitting the backend. Only cache tools whose result depends on nothing but
+their arguments: a hit is replayed to a different caller.
+
+The storage backend is pluggable: subclass ResultCache (e.g. for a shared
+Redis) and pass it to ToolResultCache.
+"""
+import asyncio
+import dataclasses
+import json
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from loguru import logger
+from pipecat.services.llm_service import FunctionCallParams
+
+# Returned by ResultCache.get on a miss (a cached result may itself be None)
+MISS = object()
+
+
+class ResultCache:
+    """Async key/value store for tool results."""
+
+    async def get(self, key: str) -> Any:
+        """Return the cached value, or MISS."""
+        raise NotImplementedError
+
+    async def set(self, key: str, value: Any, ttl: float):
+        """Store a value for `ttl` seconds."""
+        raise NotImplementedError
+
+
+class LRUResultCache(ResultCache):
+    """In-process cache with TTL expiry and LRU eviction past `max_entries`."""
+
+    def __init__(self, max_entries: int = 1024):
+        """
+        Args:
+            max_entries: Size cap; least recently used entries are evicted first
+        """
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+
+    async def get(self, key: str) -> Any:
+        entry = self._entries.get(key)
+        if entry is None:
+            return MISS
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return MISS
+        self._entries.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: Any, ttl: float):
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def _normalize(value: Any) -> Any:
+    if isinstance(value, str):
+        return " ".join(value.lower().split())
+    if isinstance(value, dict):
+        return {k: _normalize(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_normalize(v) for v in value]
+    return value
+
+
+def make_cache_key(function_name: str, arguments: Optional[dict]) -> str:
+    """
+    Build a cache key from a function name and its arguments.
+
+    Strings are lower-cased and whitespace-collapsed, and keys are sorted, so
+    "San Francisco, CA" and "san  francisco, ca" share an entry.
+    """
+    normalized = json.dumps(_normalize(arguments or {}), sort_keys=True, default=str)
+    return f"{function_name}:{normalized}"
+
+
+class ToolResultCache:
+    """Caches and deduplicates function calls delivered via result_callback."""
+
+    def __init__(
+        self,
+        cache: ResultCache,
+        ttls: Dict[str, float],
+        is_cacheable: Callable[[Any], bool] = lambda result: True,
+    ):
+        """
+        Args:
+            cache: Storage backend
+            ttls: Seconds to cache each function's results; missing or 0 disables
+            is_cacheable: Decides whether a result may be cached (e.g. not errors)
+        """
+        self.cache = cache
+        self.ttls = ttls
+        self.is_cacheable = is_cacheable
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+    async def run(
+        self,
+        params: FunctionCallParams,
+        dispatch: Callable[[FunctionCallParams], Awaitable[None]],
+    ):
+        """
+        Answer a function call from the cache, a matching in-flight call, or
+        by dispatching it.
+
+        Args:
+            params: Pipecat function call parameters
+            dispatch: Runs the function and reports through params.result_callback
+        """
+        ttl = self.ttls.get(params.function_name, 0)
+        if ttl <= 0:
+            await dispatch(params)
+            return
+
+        key = make_cache_key(params.function_name, params.arguments)
+        cached = await self.cache.get(key)
+        if cached is not MISS:
+            logger.debug(f"Cache hit for {params.function_name}")
+            await _replay(params, cached)
+            return
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            try:
+                result = await asyncio.shield(inflight)
+            except asyncio.CancelledError:
+                # Leader was cancelled (e.g. its deadline); run our own call
+                if not inflight.cancelled() or asyncio.current_task().cancelling():
+                    raise
+            else:
+                logger.debug(f"Joined in-flight {params.function_name} call")
+                await _replay(params, result)
+                return
+
+        await self._lead(key, ttl, params, dispatch)
+
+    async def _lead(self, key, ttl, params, dispatch):
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        captured = []
+
+        async def capture(result, **kwargs):
+            captured.append((result, kwargs))
+            await params.result_callback(result, **kwargs)
+
+        try:
+            await dispatch(dataclasses.replace(params, result_callback=capture))
+        except BaseException as e:
+            if isinstance(e, asyncio.CancelledError):
+                future.cancel()
+            else:
+                future.set_exception(e)
+                future.exception()  # Followers may not exist
+            raise
+        else:
+            entry = _replayable(*captured[0]) if captured else (None, {})
+            if captured and self.is_cacheable(entry[0]):
+                await self.cache.set(key, entry, ttl)
+            future.set_result(entry)
+        finally:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+
+
+def _replayable(result: Any, kwargs: Dict[str, Any]) -> Tuple[Any, Dict[str, Any]]:
+    """
+    A result and its result_callback keyword arguments (e.g. run_llm=False),
+    minus the leader's on_context_updated hook, which belongs to its pipeline.
+    """
+    properties = kwargs.get("properties")
+    if properties is not None and getattr(properties, "on_context_updated", None) is not None:
+        kwargs = {**kwargs, "properties": dataclasses.replace(properties, on_context_updated=None)}
+    return result, kwargs
+
+
+async def _replay(params: FunctionCallParams, entry: Tuple[Any, Dict[str, Any]]):
+    result, kwargs = entry
+    await params.result_callback(result, **kwargs)
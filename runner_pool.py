@@ -0,0 +1,194 @@
+"""
+Shared ADK runner and session pool.
+
+Building an InMemoryRunner and a fresh session on every google_adk call puts
+runner setup on the latency of each voice turn. This pool keeps one runner per
+(agent, app name) and one ADK session per websocket connection, so follow-up
+questions reuse the conversation state instead of starting cold.
+"""
+import asyncio
+import os
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Dict, Optional, Tuple
+
+from loguru import logger
+
+if TYPE_CHECKING:
+    from google.adk.agents.base_agent import BaseAgent
+    from google.adk.runners import InMemoryRunner
+
+
+@dataclass
+class PooledSession:
+    """An ADK session bound to one websocket connection."""
+    runner: "InMemoryRunner"
+    app_name: str
+    user_id: str
+    session_id: str
+    last_used: float = field(default_factory=time.monotonic)
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+
+
+class RunnerPool:
+    """
+    Pool of InMemoryRunners keyed by agent and app name, plus per-connection
+    sessions with LRU bounding and idle eviction.
+    """
+
+    def __init__(self, max_sessions: int = 1000, idle_timeout: float = 15 * 60):
+        """
+        Args:
+            max_sessions: Maximum number of pooled sessions kept alive
+            idle_timeout: Seconds a session may stay unused before eviction
+        """
+        self.max_sessions = max_sessions
+        self.idle_timeout = idle_timeout
+        self._runners: Dict[Tuple[int, str], "InMemoryRunner"] = {}
+        self._sessions: "OrderedDict[str, PooledSession]" = OrderedDict()
+        self._pending: Dict[str, asyncio.Future] = {}
+
+    def get_runner(self, agent: "BaseAgent", app_name: str) -> "InMemoryRunner":
+        """
+        Get (or build once) the shared runner for an agent and app name.
+
+        Args:
+            agent: ADK root agent
+            app_name: ADK application name
+
+        Returns:
+            InMemoryRunner shared by every session of this agent/app
+        """
+        key = (id(agent), app_name)
+        runner = self._runners.get(key)
+        if runner is None:
+            from google.adk.runners import InMemoryRunner
+
+            runner = InMemoryRunner(agent=agent, app_name=app_name)
+            self._runners[key] = runner
+            logger.debug(f"Created runner for {agent.name}/{app_name}")
+        return runner
+
+    async def acquire(
+        self,
+        agent: "BaseAgent",
+        app_name: str,
+        connection_id: str,
+        user_id: str = "test_user",
+    ) -> PooledSession:
+        """
+        Get the pooled session for a connection, creating it on first use.
+
+        Args:
+            agent: ADK root agent
+            app_name: ADK application name
+            connection_id: Unique ID of the owning websocket connection
+            user_id: ADK user ID for a newly created session
+
+        Returns:
+            PooledSession; hold its lock while running the agent
+        """
+        await self._evict_idle()
+
+        while True:
+            pooled = self._sessions.get(connection_id)
+            if pooled is not None:
+                self._sessions.move_to_end(connection_id)
+                pooled.last_used = time.monotonic()
+                return pooled
+
+            # Concurrent first calls for the same connection share one creation
+            pending = self._pending.get(connection_id)
+            if pending is None:
+                break
+            try:
+                return await asyncio.shield(pending)
+            except asyncio.CancelledError:
+                # The creating call was cancelled (e.g. its deadline); create it ourselves
+                if not pending.cancelled() or asyncio.current_task().cancelling():
+                    raise
+
+        future = asyncio.get_running_loop().create_future()
+        self._pending[connection_id] = future
+        try:
+            runner = self.get_runner(agent, app_name)
+            session = await runner.session_service.create_session(
+                app_name=app_name,
+                user_id=user_id,
+                session_id=str(uuid.uuid4()),
+            )
+            pooled = PooledSession(
+                runner=runner,
+                app_name=app_name,
+                user_id=session.user_id,
+                session_id=session.id,
+            )
+            self._sessions[connection_id] = pooled
+            future.set_result(pooled)
+            logger.debug("Created ADK session", adk_session_id=session.id, session_id=connection_id)
+        except BaseException as e:
+            if isinstance(e, asyncio.CancelledError):
+                future.cancel()  # Waiters retry instead of failing with us
+            else:
+                future.set_exception(e)
+                # Nobody else may be waiting; avoid "exception never retrieved"
+                future.exception()
+            raise
+        finally:
+            self._pending.pop(connection_id, None)
+
+        await self._evict_overflow()
+        return pooled
+
+    async def release(self, connection_id: str):
+        """
+        Drop the session of a closed connection.
+
+        Args:
+            connection_id: Unique ID of the owning websocket connection
+        """
+        pooled = self._sessions.pop(connection_id, None)
+        if pooled:
+            await self._delete(connection_id, pooled)
+
+    def get_session_count(self) -> int:
+        """Get number of pooled sessions (for monitoring)."""
+        return len(self._sessions)
+
+    async def _evict_idle(self):
+        deadline = time.monotonic() - self.idle_timeout
+        stale = [
+            key for key, pooled in self._sessions.items()
+            if pooled.last_used < deadline and not pooled.lock.locked()
+        ]
+        for key in stale:
+            await self._delete(key, self._sessions.pop(key))
+
+    async def _evict_overflow(self):
+        # Oldest first; sessions with a run in flight are skipped
+        for key in list(self._sessions):
+            if len(self._sessions) <= self.max_sessions:
+                break
+            pooled = self._sessions[key]
+            if not pooled.lock.locked():
+                await self._delete(key, self._sessions.pop(key))
+
+    async def _delete(self, connection_id: str, pooled: PooledSession):
+        try:
+            await pooled.runner.session_service.delete_session(
+                app_name=pooled.app_name,
+                user_id=pooled.user_id,
+                session_id=pooled.session_id,
+            )
+        except Exception as e:
+            logger.warning(f"Failed to delete session {pooled.session_id[:8]}: {e}")
+        logger.debug("Released ADK session", session_id=connection_id)
+
+
+# Process-wide pool shared by every websocket connection
+runner_pool = RunnerPool(
+    max_sessions=int(os.getenv("ADK_POOL_MAX_SESSIONS", "1000")),
+    idle_timeout=float(os.getenv("ADK_POOL_IDLE_TIMEOUT", str(15 * 60))),
+)
@@ -4,26 +4,100 @@
 # SPDX-License-Identifier: BSD 2-Clause License
 #
 import asyncio
+import importlib
+import ipaddress
+import multiprocessing
 import os
+import secrets
+import sys
+import time
 from contextlib import asynccontextmanager
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 
 import uvicorn
 from dotenv import load_dotenv
-from fastapi import FastAPI, Request, WebSocket
+from fastapi import FastAPI, HTTPException, Request, WebSocket
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse
 
 # Load environment variables
 load_dotenv(override=True)
 
-from bot_fast_api import run_bot
-from bot_websocket_server import run_bot_websocket_server
+from admission import FALLBACK_WS_URL, RETRY_AFTER, AdmissionRejected, admission
+from log_config import configure_logging, get_log_settings
+from metrics import render_metrics
+from shared_vad import preload_vad_model
+from streaming_bridge import close_registry, start_registry
+from tool_offload import tool_pool
+
+HOST = "0.0.0.0"
+PORT = int(os.getenv("PORT", "7860"))
+
+# Host name handed out in ws_urls by /connect
+PUBLIC_HOST = os.getenv("PUBLIC_HOST", "localhost")
+
+# Bearer token required by POST /logging; without one, only local clients may use it
+LOGGING_TOKEN = os.getenv("LOGGING_TOKEN", "")
+
+# Live /ws session count per worker, shared with the supervisor process so
+# /connect can route new callers to the least-loaded worker.
+_session_counts = None
+_worker_index = None
+
+# Per worker: 1 while its event loop lag or CPU is over budget (see admission)
+_worker_overloaded = None
+
+# Bot module for each WEBSOCKET_SERVER mode. Only the selected one is imported,
+# and only on first connection unless warmed up.
+BOT_MODULES = {
+    "fast_api": "bot_fast_api",
+    "websocket_server": "bot_websocket_server",
+}
+
+
+def _import_timed(name: str):
+    """Import a module, reporting how long it took the first time."""
+    if name in sys.modules:
+        return sys.modules[name]
+    start = time.perf_counter()
+    module = importlib.import_module(name)
+    print(f"Imported {name} in {(time.perf_counter() - start) * 1000:.0f} ms")
+    return module
+
+
+def warm_up():
+    """Import the selected mode's bot module and preload its heavy dependencies."""
+    server_mode = os.getenv("WEBSOCKET_SERVER", "fast_api")
+    start = time.perf_counter()
+    module = _import_timed(BOT_MODULES.get(server_mode, "bot_fast_api"))
+    if hasattr(module, "warm_up"):
+        module.warm_up()
+    print(f"Warm-up finished in {(time.perf_counter() - start) * 1000:.0f} ms")
+
+
+def _is_supervisor() -> bool:
+    """Whether this is the /connect-only supervisor of multi-worker mode, which never runs pipelines."""
+    return _session_counts is not None and _worker_index is None
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Handles FastAPI startup and shutdown."""
+    is_supervisor = _is_supervisor()
+    if not is_supervisor:
+        # Always load the VAD model up front (cheap), so the first connection
+        # doesn't load it on its event loop; the rest of warm_up is opt-in
+        preload_vad_model()
+    if os.getenv("WARM_UP_ON_STARTUP", "false").lower() == "true" and not is_supervisor:
+        warm_up()
+    if not is_supervisor:
+        await start_registry()
+        admission.on_update = _publish_load
+        admission.start()
     yield  # Run app
+    await admission.stop()
+    await close_registry()
+    tool_pool.shutdown()
 
 
 # Initialize FastAPI app with lifespan manager
@@ -41,38 +115,235 @@ app.add_middleware(
 
 @app.websocket("/ws")
 async def websocket_endpoint(websocket: WebSocket):
+    if _is_supervisor():
+        # Sessions belong on the workers /connect routes to, where they are counted
+        await websocket.close(code=1008, reason="Connect to the ws_url returned by /connect")
+        return
     await websocket.accept()
     print("WebSocket connection accepted")
     try:
-        await run_bot(websocket)
+        # Waits briefly in a bounded queue when the process is over budget
+        await admission.acquire()
+    except AdmissionRejected as e:
+        # 1013: Try Again Later
+        await websocket.close(code=1013, reason=f"Server busy ({e.reason}), retry later")
+        return
+
+    _add_session(1)
+    try:
+        run_bot = _import_timed("bot_fast_api").run_bot
+        await run_bot(websocket, debug=websocket.query_params.get("debug") == "1")
     except Exception as e:
         print(f"Exception in run_bot: {e}")
+    finally:
+        _add_session(-1)
+        await admission.release()
+
+
+def _add_session(delta: int):
+    if _session_counts is not None and _worker_index is not None:
+        with _session_counts.get_lock():
+            _session_counts[_worker_index] += delta
+
+
+def _publish_load(controller):
+    """Share this worker's overload state with the /connect supervisor."""
+    if _worker_overloaded is not None and _worker_index is not None:
+        _worker_overloaded[_worker_index] = 1 if controller.overload_reason() else 0
+
+
+def _least_loaded_worker() -> Optional[int]:
+    """Index of the least-loaded worker with room, or None if all are over budget."""
+    with _session_counts.get_lock():
+        counts = list(_session_counts)
+    candidates = [
+        index for index, count in enumerate(counts)
+        if not _worker_overloaded[index]
+        and not (admission.max_sessions and count >= admission.max_sessions)
+    ]
+    return min(candidates, key=counts.__getitem__) if candidates else None
+
+
+def _over_budget_response(reason: str):
+    """Redirect to the fallback node if there is one, else ask the caller to retry."""
+    admission.reject(reason)
+    if FALLBACK_WS_URL:
+        return {"ws_url": FALLBACK_WS_URL}
+    return JSONResponse(
+        status_code=503,
+        content={"error": "Server busy", "reason": reason, "retry_after": RETRY_AFTER},
+        headers={"Retry-After": str(RETRY_AFTER)},
+    )
+
+
+async def _debug_requested(request: Request) -> bool:
+    """Whether the caller asked for a debugged session (?debug=1 or {"debug": true})."""
+    if request.query_params.get("debug", "").lower() in ("1", "true"):
+        return True
+    try:
+        body = await request.json()
+    except ValueError:
+        return False
+    return isinstance(body, dict) and body.get("debug") is True
 
 
 @app.post("/connect")
-async def bot_connect(request: Request) -> Dict[Any, Any]:
+async def bot_connect(request: Request):
     server_mode = os.getenv("WEBSOCKET_SERVER", "fast_api")
     if server_mode == "websocket_server":
-        ws_url = "ws://localhost:8765"
+        reason = admission.over_budget()
+        if reason:
+            return _over_budget_response(reason)
+        port = os.getenv("WEBSOCKET_SERVER_PORT", "8765")
+        return {"ws_url": f"ws://{PUBLIC_HOST}:{port}"}
+    if _session_counts is not None and len(_session_counts) > 1:
+        worker = _least_loaded_worker()
+        if worker is None:
+            return _over_budget_response("all_workers_busy")
+        ws_url = f"ws://{PUBLIC_HOST}:{PORT + 1 + worker}/ws"
     else:
-        ws_url = "ws://localhost:7860/ws"
+        reason = admission.over_budget()
+        if reason:
+            return _over_budget_response(reason)
+        ws_url = f"ws://{PUBLIC_HOST}:{PORT}/ws"
+    # Flagged sessions get the Whisker observer (see WHISKER_MODE)
+    if await _debug_requested(request):
+        ws_url += "?debug=1"
     return {"ws_url": ws_url}
 
 
+@app.post("/warmup")
+async def bot_warmup() -> Dict[Any, Any]:
+    await asyncio.to_thread(warm_up)
+    return {"status": "ready"}
+
+
+@app.get("/metrics")
+async def bot_metrics() -> PlainTextResponse:
+    """Latency histograms and counters of this process (each worker serves its own)."""
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
+
+@app.get("/logging")
+async def bot_logging() -> Dict[str, Any]:
+    return get_log_settings()
+
+
+@app.post("/logging")
+async def bot_configure_logging(request: Request) -> Dict[str, Any]:
+    """
+    Change logging at runtime, e.g. {"level": "INFO", "format": "json",
+    "debug_rate": 5}. Applies to the process serving the request only.
+    """
+    _check_logging_access(request)
+    try:
+        changes = await request.json()  # ValueError on a malformed body
+        if not isinstance(changes, dict):
+            raise ValueError("Expected a JSON object of logging settings")
+        # Replacing a queued handler waits for it to flush
+        await asyncio.to_thread(configure_logging, **changes)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return get_log_settings()
+
+
+def _check_logging_access(request: Request):
+    """Allow the LOGGING_TOKEN bearer, or local clients when no token is configured."""
+    if LOGGING_TOKEN:
+        authorization = request.headers.get("authorization", "")
+        if not secrets.compare_digest(authorization.encode(), f"Bearer {LOGGING_TOKEN}".encode()):
+            raise HTTPException(status_code=401, detail="Invalid or missing logging token")
+        return
+    host = request.client.host if request.client else ""
+    try:
+        local = ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        local = host == "localhost"
+    # CORS allows any origin, so a web page could otherwise reach this through a
+    # local browser; browsers always send Origin on cross-origin POSTs
+    if not local or "origin" in request.headers:
+        raise HTTPException(status_code=403, detail="Set LOGGING_TOKEN to change logging remotely")
+
+
+def _run_worker(index: int, port: int, session_counts, worker_overloaded):
+    """Entry point of a worker process serving /ws on its own port."""
+    global _session_counts, _worker_index, _worker_overloaded
+    _session_counts = session_counts
+    _worker_index = index
+    _worker_overloaded = worker_overloaded
+    # Each worker's Whisker debugger gets its own port (read when the bot module loads)
+    os.environ["WHISKER_PORT"] = str(int(os.getenv("WHISKER_PORT", "9090")) + index)
+
+    config = uvicorn.Config(app, host=HOST, port=port)
+    server = uvicorn.Server(config)
+    try:
+        asyncio.run(server.serve())
+    except KeyboardInterrupt:
+        pass
+
+
+def _start_workers(count: int):
+    """
+    Spawn worker processes on ports PORT+1..PORT+count.
+
+    Each worker serves /ws on its own port rather than all sharing PORT
+    (e.g. with SO_REUSEPORT), because the kernel would then pick the worker
+    per connection and /connect could not route callers to the least-loaded
+    one. Clients must be able to reach every worker port, not only PORT.
+    """
+    global _session_counts, _worker_overloaded
+    ctx = multiprocessing.get_context("spawn")
+    _session_counts = ctx.Array("i", count)
+    _worker_overloaded = ctx.Array("i", count, lock=False)
+    processes = []
+    for index in range(count):
+        process = ctx.Process(
+            target=_run_worker,
+            args=(index, PORT + 1 + index, _session_counts, _worker_overloaded),
+            name=f"bot-worker-{index}",
+            daemon=True,
+        )
+        process.start()
+        processes.append(process)
+    print(f"Started {count} workers on ports {PORT + 1}-{PORT + count}")
+    return processes
+
+
 async def main():
+    global _session_counts, _worker_index
     server_mode = os.getenv("WEBSOCKET_SERVER", "fast_api")
+    # Opt-in ("auto" for one per core) rather than the core count by default:
+    # more than 1 moves pipelines to workers on PORT+1..PORT+N, which existing
+    # single-port deployments (firewalls, proxies, clients that skip /connect)
+    # would have to open up for
+    workers_setting = os.getenv("SERVER_WORKERS") or "1"
+    workers = (os.cpu_count() or 1) if workers_setting == "auto" else int(workers_setting)
+    processes = []
     tasks = []
     try:
         if server_mode == "websocket_server":
-            tasks.append(run_bot_websocket_server())
+            # One listener on WEBSOCKET_SERVER_PORT runs every session; single process only
+            bot_websocket_server = _import_timed("bot_websocket_server")
+            tasks.append(bot_websocket_server.run_bot_websocket_server())
+        elif workers > 1:
+            # This process only routes /connect; pipelines run in the workers
+            processes = _start_workers(workers)
+        else:
+            _session_counts = multiprocessing.Array("i", 1)
+            _worker_index = 0
 
-        config = uvicorn.Config(app, host="0.0.0.0", port=7860)
+        config = uvicorn.Config(app, host=HOST, port=PORT)
         server = uvicorn.Server(config)
         tasks.append(server.serve())
 
         await asyncio.gather(*tasks)
     except asyncio.CancelledError:
         print("Tasks cancelled (probably due to shutdown).")
+    finally:
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            process.join(timeout=5)
 
 
 if __name__ == "__main__":
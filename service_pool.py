@@ -0,0 +1,89 @@
+"""
+Pool of prebuilt, idle pipeline services.
+
+Pipecat processors are linked into exactly one pipeline, so pooled items are
+single use: a connection takes one, and the pool is topped up again in the
+background on the event loop, one item per loop iteration, so refilling never
+blocks other sessions for long.
+
+fill() may run on another thread (e.g. /warmup) while the loop refills; both
+only ever add items while there is room, so the pool never overfills.
+"""
+import asyncio
+import threading
+from collections import deque
+from typing import Callable, Deque, Generic, TypeVar
+
+from loguru import logger
+
+T = TypeVar("T")
+
+
+class ServicePool(Generic[T]):
+    """Keeps `size` items built by `factory` ready for new connections."""
+
+    def __init__(self, factory: Callable[[], T], size: int):
+        """
+        Args:
+            factory: Builds one item (e.g. a connection's STT/LLM/TTS services)
+            size: Number of idle items to keep ready; 0 disables pooling
+        """
+        self.factory = factory
+        self.size = size
+        self._idle: Deque[T] = deque()
+        self._lock = threading.Lock()
+        self._refilling = False
+
+    def fill(self):
+        """Build items until the pool is full (e.g. during warm-up)."""
+        while self._add(self.factory()):
+            pass
+        logger.debug(f"Service pool filled with {len(self._idle)} item(s)")
+
+    def _add(self, item: T) -> bool:
+        """Add a built item if there is room; returns whether more would fit."""
+        with self._lock:
+            if len(self._idle) < self.size:
+                self._idle.append(item)
+            return len(self._idle) < self.size
+
+    def acquire(self) -> T:
+        """
+        Take a prebuilt item, or build one inline if the pool is empty.
+
+        Returns:
+            An item that now belongs to the caller
+        """
+        try:
+            item = self._idle.popleft()
+        except IndexError:
+            item = self.factory()
+        self._schedule_refill()
+        return item
+
+    def get_idle_count(self) -> int:
+        """Get number of prebuilt items ready (for monitoring)."""
+        return len(self._idle)
+
+    def _schedule_refill(self):
+        if self._refilling or len(self._idle) >= self.size:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        self._refilling = True
+        loop.call_soon(self._refill_one, loop)
+
+    def _refill_one(self, loop: asyncio.AbstractEventLoop):
+        try:
+            room = len(self._idle) < self.size and self._add(self.factory())
+        except Exception as e:
+            logger.error(f"Failed to prebuild pooled services: {e}")
+            self._refilling = False
+            return
+        if room:
+            loop.call_soon(self._refill_one, loop)
+        else:
+            self._refilling = False
+
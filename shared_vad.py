@@ -0,0 +1,363 @@
+"""
+Process-wide Silero VAD model shared across connections.
+
+SileroVADAnalyzer loads and initializes the ONNX model for every connection.
+Here the ONNX inference session is loaded once (at server startup via
+preload_vad_model) and each connection's analyzer only carries its own
+recurrent state and audio context.
+
+The analyzer also avoids per-window allocations: audio is gathered into a
+reused AudioChunker buffer, samples are converted into a reused float buffer,
+the model input (context + window) is built in place, and the loudness meter
+is built once per window size instead of for every window.
+
+With VAD_BATCHING, windows from all sessions are run together: pipecat calls
+analyze_audio on each transport's own executor thread, which hands its window
+and recurrent state to the process-wide VADBatcher and waits. The batcher
+collects windows for up to VAD_BATCH_WAIT_MS, runs them as one batch (the
+model takes a batch of inputs and states), and hands each session back its
+confidence and new state. Results are the same as running them one by one.
+"""
+import os
+import queue
+import threading
+import time
+from importlib import resources
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import onnxruntime
+import pyloudnorm as pyln
+from loguru import logger
+from pipecat.audio.utils import exp_smoothing, normalize_value
+from pipecat.audio.vad.silero import _MODEL_RESET_STATES_TIME, SileroOnnxModel, SileroVADAnalyzer
+from pipecat.audio.vad.vad_analyzer import VADAnalyzer, VADParams, VADState
+
+from audio_buffers import AudioChunker
+from metrics import Histogram
+
+# Run VAD windows of all sessions in shared batches
+VAD_BATCHING = os.getenv("VAD_BATCHING", "true").lower() == "true"
+
+# Longest a window waits for others to join its batch, in milliseconds
+VAD_BATCH_WAIT_MS = float(os.getenv("VAD_BATCH_WAIT_MS", "2"))
+
+# Most windows run in one batch
+VAD_BATCH_MAX = int(os.getenv("VAD_BATCH_MAX", "128"))
+
+_INT16_SCALE = np.float32(1 / 32768.0)
+
+VAD_BATCH_SIZE = Histogram(
+    "vad_batch_size",
+    "Windows run per batched Silero VAD inference.",
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256),
+)
+
+_session: Optional[onnxruntime.InferenceSession] = None
+_batcher: Optional["VADBatcher"] = None
+
+
+def preload_vad_model() -> onnxruntime.InferenceSession:
+    """
+    Load the Silero ONNX model once for the whole process.
+
+    Returns:
+        onnxruntime.InferenceSession shared by every analyzer
+    """
+    global _session
+    if _session is None:
+        logger.debug("Loading shared Silero VAD model...")
+        model_path = str(resources.files("pipecat.audio.vad.data").joinpath("silero_vad.onnx"))
+        opts = onnxruntime.SessionOptions()
+        opts.inter_op_num_threads = 1
+        opts.intra_op_num_threads = 1
+        _session = onnxruntime.InferenceSession(
+            model_path, providers=["CPUExecutionProvider"], sess_options=opts
+        )
+        logger.debug("Loaded shared Silero VAD model")
+    return _session
+
+
+class _BatchRequest:
+    """One stream's window waiting for its batch."""
+
+    __slots__ = ("input", "state", "sr", "out", "error", "done")
+
+    def __init__(self, input: np.ndarray, state: np.ndarray, sr: int):
+        self.input = input
+        self.state = state
+        self.sr = sr
+        self.out: Optional[np.ndarray] = None
+        self.error: Optional[BaseException] = None
+        self.done = threading.Event()
+
+
+class VADBatcher:
+    """
+    Runs Silero windows from many streams as batched inferences on one
+    thread. Each stream passes its own recurrent state in and gets the
+    updated state back, so streams never see each other's state.
+    """
+
+    def __init__(
+        self,
+        session: onnxruntime.InferenceSession,
+        max_wait: float = VAD_BATCH_WAIT_MS / 1000,
+        max_batch: int = VAD_BATCH_MAX,
+    ):
+        """
+        Args:
+            session: Shared ONNX inference session
+            max_wait: Longest a window waits for others to join, in seconds
+            max_batch: Most windows run in one batch
+        """
+        self.session = session
+        self.max_wait = max_wait
+        self.max_batch = max_batch
+        self._requests: "queue.SimpleQueue[Optional[_BatchRequest]]" = queue.SimpleQueue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def run(self, input: np.ndarray, state: np.ndarray, sr: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Run one window in the next batch, blocking until it has run.
+
+        Args:
+            input: Model input of shape (1, context + window)
+            state: The stream's recurrent state, shape (2, 1, 128)
+            sr: Sample rate
+
+        Returns:
+            The window's output and the stream's new state
+        """
+        self._ensure_thread()
+        request = _BatchRequest(input, state, sr)
+        self._requests.put(request)
+        request.done.wait()
+        if request.error is not None:
+            raise request.error
+        return request.out, request.state
+
+    def close(self):
+        """Stop the batching thread once queued windows have run."""
+        with self._lock:
+            if self._thread is not None:
+                self._requests.put(None)
+                self._thread.join()
+                self._thread = None
+
+    def _ensure_thread(self):
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._loop, name="vad-batcher", daemon=True)
+                    self._thread.start()
+
+    def _loop(self):
+        while True:
+            first = self._requests.get()
+            if first is None:
+                return
+            batch = [first]
+            deadline = time.monotonic() + self.max_wait
+            stopping = False
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                try:
+                    if remaining > 0:
+                        request = self._requests.get(timeout=remaining)
+                    else:
+                        request = self._requests.get_nowait()  # Only what is already queued
+                except queue.Empty:
+                    break
+                if request is None:
+                    stopping = True
+                    break
+                batch.append(request)
+            self._run_batch(batch)
+            if stopping:
+                return
+
+    def _run_batch(self, batch: List[_BatchRequest]):
+        # The sample rate is one scalar per inference, so batches are per rate
+        groups: Dict[Tuple[int, int], List[_BatchRequest]] = {}
+        for request in batch:
+            groups.setdefault((request.sr, request.input.shape[1]), []).append(request)
+        for (sr, _), group in groups.items():
+            try:
+                out, state = self.session.run(
+                    None,
+                    {
+                        "input": np.concatenate([request.input for request in group]),
+                        "state": np.concatenate([request.state for request in group], axis=1),
+                        "sr": np.array(sr, dtype="int64"),
+                    },
+                )
+                VAD_BATCH_SIZE.observe(len(group))
+                for i, request in enumerate(group):
+                    request.out = out[i:i + 1]
+                    request.state = state[:, i:i + 1]
+            except Exception as e:
+                for request in group:
+                    request.error = e
+            for request in group:
+                request.done.set()
+
+
+def get_vad_batcher() -> VADBatcher:
+    """The process-wide VADBatcher over the shared model."""
+    global _batcher
+    if _batcher is None:
+        _batcher = VADBatcher(preload_vad_model())
+    return _batcher
+
+
+class SharedSileroOnnxModel(SileroOnnxModel):
+    """Per-stream Silero state over a shared inference session."""
+
+    def __init__(self, session: onnxruntime.InferenceSession, batcher: Optional[VADBatcher] = None):
+        """
+        Args:
+            session: Shared ONNX inference session
+            batcher: Runs windows in batches with other streams; None runs
+                each window on its own
+        """
+        # State goes in and out of session.run() explicitly, so one session
+        # can serve any number of streams.
+        self.session = session
+        self.batcher = batcher
+        self._input: Optional[np.ndarray] = None
+        self._sr_inputs = {sr: np.array(sr, dtype="int64") for sr in (8000, 16000)}
+        self.reset_states()
+        self.sample_rates = [8000, 16000]
+
+    def reset_states(self, batch_size=1):
+        super().reset_states(batch_size)
+        if self._input is not None:
+            self._input.fill(0)
+
+    def __call__(self, x, sr: int):
+        """Run one window, reusing the model input buffer across calls."""
+        if sr not in self._sr_inputs:
+            raise ValueError(f"Unsupported sample rate: {sr}")
+        num_samples = 512 if sr == 16000 else 256
+        context_size = 64 if sr == 16000 else 32
+        if np.shape(x)[-1] != num_samples:
+            raise ValueError(f"Provided number of samples is {np.shape(x)[-1]} (expected {num_samples})")
+
+        if self._input is None or self._input.shape[1] != context_size + num_samples or self._last_sr != sr:
+            self.reset_states()
+            self._input = np.zeros((1, context_size + num_samples), dtype="float32")
+
+        # Input is the previous window's tail followed by this window
+        self._input[0, context_size:] = x
+        if self.batcher is not None:
+            out, self._state = self.batcher.run(self._input, self._state, sr)
+        else:
+            out, self._state = self.session.run(
+                None, {"input": self._input, "state": self._state, "sr": self._sr_inputs[sr]}
+            )
+        self._input[0, :context_size] = self._input[0, -context_size:]
+        self._last_sr = sr
+        self._last_batch_size = 1
+        return out
+
+
+class SharedSileroVADAnalyzer(SileroVADAnalyzer):
+    """SileroVADAnalyzer that reuses the process-wide model instead of loading its own."""
+
+    def __init__(
+        self,
+        *,
+        sample_rate: Optional[int] = None,
+        params: Optional[VADParams] = None,
+        batched: bool = VAD_BATCHING,
+    ):
+        """
+        Args:
+            sample_rate: Audio sample rate (8000 or 16000 Hz). If None, will be set later.
+            params: VAD parameters for detection thresholds and timing.
+            batched: Run windows in batches with other sessions (see VADBatcher)
+        """
+        VADAnalyzer.__init__(self, sample_rate=sample_rate, params=params)
+        self._model = SharedSileroOnnxModel(preload_vad_model(), get_vad_batcher() if batched else None)
+        self._last_reset_time = 0
+        self._chunker = AudioChunker(window_bytes=1024)
+        self._samples = np.empty(0, dtype=np.float32)
+        self._samples64 = np.empty(0, dtype=np.float64)
+        self._meters: Dict[tuple, pyln.Meter] = {}
+
+    def analyze_audio(self, buffer) -> VADState:
+        """Same state machine as VADAnalyzer.analyze_audio, without copying audio."""
+        if self._chunker.window_bytes != self._vad_frames_num_bytes:
+            self._chunker.resize(self._vad_frames_num_bytes)
+
+        analyzed = False
+        for window in self._chunker.push(buffer):
+            analyzed = True
+            confidence = self.voice_confidence(window)
+            volume = self._get_smoothed_volume(window)
+            self._prev_volume = volume
+            speaking = confidence >= self._params.confidence and volume >= self._params.min_volume
+            self._update_state(speaking)
+        if not analyzed:
+            return self._vad_state
+
+        if self._vad_state == VADState.STARTING and self._vad_starting_count >= self._vad_start_frames:
+            self._vad_state = VADState.SPEAKING
+            self._vad_starting_count = 0
+        if self._vad_state == VADState.STOPPING and self._vad_stopping_count >= self._vad_stop_frames:
+            self._vad_state = VADState.QUIET
+            self._vad_stopping_count = 0
+        return self._vad_state
+
+    def _update_state(self, speaking: bool):
+        match (speaking, self._vad_state):
+            case (True, VADState.QUIET):
+                self._vad_state = VADState.STARTING
+                self._vad_starting_count = 1
+            case (True, VADState.STARTING):
+                self._vad_starting_count += 1
+            case (True, VADState.STOPPING):
+                self._vad_state = VADState.SPEAKING
+                self._vad_stopping_count = 0
+            case (False, VADState.STARTING):
+                self._vad_state = VADState.QUIET
+                self._vad_starting_count = 0
+            case (False, VADState.SPEAKING):
+                self._vad_state = VADState.STOPPING
+                self._vad_stopping_count = 1
+            case (False, VADState.STOPPING):
+                self._vad_stopping_count += 1
+
+    def voice_confidence(self, buffer) -> float:
+        try:
+            samples = np.frombuffer(buffer, np.int16)
+            if self._samples.shape != samples.shape:
+                self._samples = np.empty(samples.shape, dtype=np.float32)
+            np.multiply(samples, _INT16_SCALE, out=self._samples)
+            confidence = self._model(self._samples, self.sample_rate)[0]
+
+            # Reset from time to time, as SileroVADAnalyzer does
+            now = time.time()
+            if now - self._last_reset_time >= _MODEL_RESET_STATES_TIME:
+                self._model.reset_states()
+                self._last_reset_time = now
+            return confidence
+        except Exception as e:
+            logger.error(f"Error analyzing audio with Silero VAD: {e}")
+            return 0
+
+    def _get_smoothed_volume(self, audio) -> float:
+        """Same loudness as pipecat's calculate_audio_volume, with a cached meter."""
+        samples = np.frombuffer(audio, np.int16)
+        if self._samples64.shape != samples.shape:
+            self._samples64 = np.empty(samples.shape, dtype=np.float64)
+        np.copyto(self._samples64, samples)
+
+        key = (self.sample_rate, samples.size)
+        meter = self._meters.get(key)
+        if meter is None:
+            meter = self._meters[key] = pyln.Meter(self.sample_rate, block_size=samples.size / self.sample_rate)
+        volume = normalize_value(meter.integrated_loudness(self._samples64), -20, 80)
+        return exp_smoothing(volume, self._prev_volume, self._smoothing_factor)
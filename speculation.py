@@ -0,0 +1,360 @@
+"""
+Speculative LLM turns on stable interim transcripts (opt-in).
+
+Normally the LLM request starts only once the user aggregator has the final
+transcript, after VAD decides the user stopped speaking. With speculation, a
+per-session Speculator watches the transcripts. Once the text (finals so far
+plus the current interim) has not changed for `stable_secs`, it sends the
+LLM request the turn would make and buffers the streamed reply. It also
+prefetches read-only tool calls from that reply through the tool result
+cache.
+
+When the real request arrives, it is compared with the speculative one: the
+same prompt, with the last user message compared ignoring case, punctuation
+and spacing. On a match the buffered (and still streaming) reply is
+committed as the real response. Otherwise the speculative request and its
+tool calls are cancelled. Nothing is pushed into the pipeline before a
+commit, so a wrong guess leaves no frames to discard.
+"""
+import asyncio
+import copy
+import json
+import os
+import re
+import time
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional
+
+from loguru import logger
+from pipecat.adapters.services.open_ai_adapter import OpenAILLMInvocationParams
+from pipecat.frames.frames import Frame, InterimTranscriptionFrame, TranscriptionFrame
+from pipecat.processors.aggregators.openai_llm_context import OpenAILLMContext
+from pipecat.processors.frame_processor import FrameDirection, FrameProcessor
+
+from metrics import Counter, Histogram
+
+# Opt-in: speculate on interim transcripts
+SPECULATION_ENABLED = os.getenv("SPECULATION_ENABLED", "false").lower() == "true"
+
+# Seconds the transcript must stay unchanged before speculating
+SPECULATION_STABLE_SECS = float(os.getenv("SPECULATION_STABLE_SECS", "0.3"))
+
+# Speculative requests started per user turn, per session
+SPECULATION_SESSION_MAX = int(os.getenv("SPECULATION_SESSION_MAX", "2"))
+
+# Speculative requests in flight at once across this process
+SPECULATION_PROCESS_MAX = int(os.getenv("SPECULATION_PROCESS_MAX", "32"))
+
+# Tools without side effects, which may run before the turn is committed
+SPECULATIVE_TOOLS = tuple(
+    name.strip() for name in os.getenv("SPECULATIVE_TOOLS", "get_current_weather").split(",") if name.strip()
+)
+
+SPECULATIONS = Counter(
+    "llm_speculations_total",
+    "Speculative LLM turns by outcome (committed, mismatched, superseded or skipped).",
+    labelnames=("outcome",),
+)
+SPECULATION_HEAD_START = Histogram(
+    "llm_speculation_head_start_seconds",
+    "Time a committed speculative request had been running when the real turn arrived.",
+)
+
+# Speculative requests in flight in this process
+_in_flight = 0
+
+
+def _request_done(_task: asyncio.Task):
+    global _in_flight
+    _in_flight -= 1
+
+
+_UNSPOKEN = re.compile(r"[^\w\s]")
+
+
+def _normalize(text: str) -> str:
+    """Text as spoken: case, punctuation and spacing ignored."""
+    return " ".join(_UNSPOKEN.sub(" ", text.lower()).split())
+
+
+def prompt_key(messages: List[Dict[str, Any]]) -> str:
+    """Key identifying a prompt, with its last user message normalized."""
+    *history, last = messages
+    content = last.get("content")
+    spoken = _normalize(content) if isinstance(content, str) else json.dumps(content, default=str)
+    return json.dumps(history, sort_keys=True, default=str) + "\n" + last.get("role", "") + ":" + spoken
+
+
+class Speculation:
+    """One speculative LLM request, buffering its streamed reply."""
+
+    def __init__(self, text: str, key: str):
+        self.text = text
+        self.key = key
+        self.started_at = time.monotonic()
+        self.chunks: List[Any] = []
+        self.done = False
+        self.error: Optional[BaseException] = None
+        self.task: Optional[asyncio.Task] = None
+        self.tool_tasks: List[asyncio.Task] = []
+        self._changed = asyncio.Event()
+
+    def append(self, chunk):
+        self.chunks.append(chunk)
+        self._changed.set()
+
+    def finish(self, error: Optional[BaseException] = None):
+        self.done = True
+        self.error = error
+        self._changed.set()
+
+    def cancel(self, with_tools: bool = True):
+        if self.task is not None and not self.task.done():
+            self.task.cancel()
+        if with_tools:
+            for task in self.tool_tasks:
+                task.cancel()
+
+    async def replay(self) -> AsyncIterator[Any]:
+        """Stream the buffered chunks, then the rest as they arrive."""
+        sent = 0
+        try:
+            while True:
+                while sent < len(self.chunks):
+                    yield self.chunks[sent]
+                    sent += 1
+                if self.done:
+                    if self.error is not None:
+                        raise self.error
+                    return
+                self._changed.clear()
+                await self._changed.wait()
+        finally:
+            if not self.done:
+                # The committed turn was interrupted; stop the request too
+                self.cancel(with_tools=False)
+
+    def tool_calls(self) -> List[Dict[str, Any]]:
+        """Tool calls in the buffered reply, as {"name", "arguments"}."""
+        calls: Dict[int, Dict[str, str]] = {}
+        for chunk in self.chunks:
+            if not chunk.choices or not chunk.choices[0].delta or not chunk.choices[0].delta.tool_calls:
+                continue
+            for tool_call in chunk.choices[0].delta.tool_calls:
+                call = calls.setdefault(tool_call.index, {"name": "", "arguments": ""})
+                if tool_call.function and tool_call.function.name:
+                    call["name"] += tool_call.function.name
+                if tool_call.function and tool_call.function.arguments:
+                    call["arguments"] += tool_call.function.arguments
+        parsed = []
+        for call in calls.values():
+            try:
+                parsed.append({"name": call["name"], "arguments": json.loads(call["arguments"] or "{}")})
+            except json.JSONDecodeError:
+                continue
+        return parsed
+
+
+class SpeculativeCompletionsMixin:
+    """
+    Mixin for OpenAILLMService subclasses: serves a request from a matching
+    speculation when a Speculator is attached.
+    """
+
+    speculator: Optional["Speculator"] = None
+
+    async def get_chat_completions(self, params_from_context: OpenAILLMInvocationParams):
+        if self.speculator is not None:
+            stream = self.speculator.claim(params_from_context["messages"])
+            if stream is not None:
+                return stream
+        return await super().get_chat_completions(params_from_context)
+
+    async def get_speculative_completions(self, params_from_context: OpenAILLMInvocationParams):
+        """Start a request without consulting the speculator."""
+        return await super().get_chat_completions(params_from_context)
+
+
+class Speculator:
+    """Speculates LLM turns for one session."""
+
+    def __init__(
+        self,
+        llm: SpeculativeCompletionsMixin,
+        context: OpenAILLMContext,
+        prefetch_tool: Optional[Callable[[str, dict], Awaitable[None]]] = None,
+        compact: Optional[Callable[[OpenAILLMContext], Any]] = None,
+        stable_secs: float = SPECULATION_STABLE_SECS,
+        max_per_turn: int = SPECULATION_SESSION_MAX,
+        read_only_tools=SPECULATIVE_TOOLS,
+    ):
+        """
+        Args:
+            llm: The session's LLM service
+            context: The session's LLM context
+            prefetch_tool: Runs a read-only tool call ahead of the turn (e.g.
+                into the tool result cache); cancelled if the guess is wrong
+            compact: Applies the compaction the real request will get (e.g.
+                ContextWindow.compact), so the prompts can match
+            stable_secs: Seconds the transcript must stay unchanged
+            max_per_turn: Speculative requests per user turn
+            read_only_tools: Tools that prefetch_tool may run
+        """
+        self.llm = llm
+        self.context = context
+        self.prefetch_tool = prefetch_tool
+        self.compact = compact
+        self.stable_secs = stable_secs
+        self.max_per_turn = max_per_turn
+        self.read_only_tools = tuple(read_only_tools)
+        self._finals: List[str] = []
+        self._interim = ""
+        self._attempts = 0
+        self._current: Optional[Speculation] = None
+        self._timer: Optional[asyncio.Task] = None
+        llm.speculator = self
+
+    @property
+    def text(self) -> str:
+        """What the user has said this turn, as the aggregator will join it."""
+        parts = self._finals + ([self._interim] if self._interim else [])
+        return " ".join(part.strip() for part in parts if part.strip())
+
+    def on_interim(self, text: str):
+        self._interim = text
+        self._changed()
+
+    def on_final(self, text: str):
+        if text.strip():
+            self._finals.append(text)
+        self._interim = ""
+        self._changed()
+
+    def _changed(self):
+        text = self.text
+        current = self._current
+        if current is not None and _normalize(current.text) != _normalize(text):
+            # The user kept talking; that guess can no longer match
+            self._drop("superseded")
+        if self._timer is not None:
+            self._timer.cancel()
+        if text and self._current is None:
+            self._timer = asyncio.create_task(self._speculate_when_stable(text))
+
+    async def _speculate_when_stable(self, text: str):
+        await asyncio.sleep(self.stable_secs)
+        self._timer = None
+        self.speculate(text)
+
+    def speculate(self, text: str) -> Optional[Speculation]:
+        """Start a speculative request for the turn ending with `text`."""
+        global _in_flight
+        if self._attempts >= self.max_per_turn or _in_flight >= SPECULATION_PROCESS_MAX:
+            SPECULATIONS.inc(outcome="skipped")
+            return None
+        self._attempts += 1
+
+        # The request the user aggregator would make if the turn ended here
+        spec_context = OpenAILLMContext(
+            copy.deepcopy(self.context.messages) + [{"role": "user", "content": text}]
+        )
+        if self.compact is not None:
+            self.compact(spec_context)
+        params = OpenAILLMInvocationParams(
+            messages=spec_context.get_messages(),
+            tools=self.context.tools,
+            tool_choice=self.context.tool_choice,
+        )
+        speculation = Speculation(text, prompt_key(params["messages"]))
+        _in_flight += 1
+        speculation.task = asyncio.create_task(self._run(speculation, params))
+        speculation.task.add_done_callback(_request_done)
+        self._current = speculation
+        logger.debug(f"Speculating on: {text}")
+        return speculation
+
+    async def _run(self, speculation: Speculation, params: OpenAILLMInvocationParams):
+        try:
+            stream = await self.llm.get_speculative_completions(params)
+            async for chunk in stream:
+                speculation.append(chunk)
+        except asyncio.CancelledError:
+            speculation.finish(asyncio.CancelledError())
+            raise
+        except Exception as e:
+            speculation.finish(e)
+            return
+        speculation.finish()
+
+        if self.prefetch_tool is None:
+            return
+        for call in speculation.tool_calls():
+            if call["name"] in self.read_only_tools:
+                speculation.tool_tasks.append(
+                    asyncio.create_task(self.prefetch_tool(call["name"], call["arguments"]))
+                )
+
+    def claim(self, messages: List[Dict[str, Any]]) -> Optional[AsyncIterator[Any]]:
+        """
+        Commit the current speculation if it made this request, or cancel it.
+
+        Args:
+            messages: Messages of the real request
+
+        Returns:
+            The committed reply stream, or None to make the request normally
+        """
+        if not messages or messages[-1].get("role") != "user":
+            return None  # Not a user turn (e.g. the follow-up to a tool result)
+
+        speculation, self._current = self._current, None
+        self._finals, self._interim, self._attempts = [], "", 0
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if speculation is None:
+            return None
+        if speculation.key != prompt_key(messages) or (speculation.done and speculation.error):
+            speculation.cancel()
+            SPECULATIONS.inc(outcome="mismatched")
+            logger.debug("Speculation did not match the final transcript")
+            return None
+
+        SPECULATIONS.inc(outcome="committed")
+        SPECULATION_HEAD_START.observe(time.monotonic() - speculation.started_at)
+        logger.debug(f"Committed speculation ({len(speculation.chunks)} chunk(s) ready)")
+        return speculation.replay()
+
+    def _drop(self, outcome: str):
+        speculation, self._current = self._current, None
+        if speculation is not None:
+            speculation.cancel()
+            SPECULATIONS.inc(outcome=outcome)
+
+    def close(self):
+        """Cancel any speculation (when the session ends)."""
+        self._drop("superseded")
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if self.llm.speculator is self:
+            self.llm.speculator = None
+
+
+class SpeculationTrigger(FrameProcessor):
+    """Feeds a Speculator the transcripts on their way to the user aggregator."""
+
+    def __init__(self, speculator: Speculator, **kwargs):
+        super().__init__(**kwargs)
+        self.speculator = speculator
+
+    async def process_frame(self, frame: Frame, direction: FrameDirection):
+        await super().process_frame(frame, direction)
+        if isinstance(frame, TranscriptionFrame):
+            self.speculator.on_final(frame.text)
+        elif isinstance(frame, InterimTranscriptionFrame):
+            self.speculator.on_interim(frame.text)
+        await self.push_frame(frame, direction)
+
+    async def cleanup(self):
+        await super().cleanup()
+        self.speculator.close()
@@ -1,28 +1,111 @@
 """
 Simple task registry for ADK-Pipecat integration.
 Allows ADK tools to call Pipecat task methods directly.
+
+Entries hold only a weak reference to their task, carry a deadline and the
+owning connection, and are evicted by a background reaper so the registry
+cannot grow without bound when cleanup is skipped.
+
+Tools should speak through get_speech_queue() rather than calling
+queue_frames() on the task directly: the speech queue is bounded and paced
+by the bot actually finishing speaking, so a chatty tool cannot flood TTS.
+
+Tasks always live in the process running their pipeline. With the "ipc"
+registry backend, that process also listens on a Unix socket and task IDs
+name the socket, so a tool running in another process (e.g. a CPU-heavy agent
+in a process pool) gets a RemoteTask from get_task() whose queue_frames()
+forwards the frames to the owning pipeline.
 """
+import asyncio
+import json
+import os
+import shutil
+import socket
+import stat
+import struct
+import tempfile
+import time
 import uuid
-from typing import Optional, Dict
+import weakref
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Deque, Optional, Dict
 from loguru import logger
+from pipecat.frames.frames import BotStoppedSpeakingFrame, Frame, TTSSpeakFrame
+from pipecat.observers.base_observer import BaseObserver, FramePushed
+
+from metrics import PRODUCED_AT, Counter, Gauge, mark_forwarded, mark_produced
+
+# Default lifetime of a registration, in seconds
+DEFAULT_TTL = float(os.getenv("TASK_REGISTRY_TTL", "600"))
+
+# How often the background reaper sweeps expired entries, in seconds
+REAPER_INTERVAL = float(os.getenv("TASK_REGISTRY_REAPER_INTERVAL", "30"))
+
+# Pending frames per task before the overflow policy applies
+SPEECH_HIGH_WATER_MARK = int(os.getenv("SPEECH_QUEUE_HIGH_WATER_MARK", "3"))
+
+# Overflow policy: "block", "coalesce" or "drop"
+SPEECH_POLICY = os.getenv("SPEECH_QUEUE_POLICY", "block")
+
+# Fragments arriving less than this many seconds apart are spoken as one
+# utterance (0 disables batching)
+SPEECH_BATCH_WINDOW = float(os.getenv("SPEECH_BATCH_WINDOW", "0.25"))
+
+# Longest a fragment is held back waiting for more, in seconds
+SPEECH_BATCH_MAX_DELAY = float(os.getenv("SPEECH_BATCH_MAX_DELAY", "1.0"))
+
+# Registry backend: "local" (tools run in the pipeline process) or "ipc"
+# (tools may run in other processes and reach the pipeline over a Unix socket)
+TASK_REGISTRY_BACKEND = os.getenv("TASK_REGISTRY_BACKEND", "local")
+
+# Directory holding each pipeline process's socket for the "ipc" backend. Must
+# be owned by this user and closed to everyone else (mode 0700); by default a
+# private directory under $XDG_RUNTIME_DIR or a fresh one from mkdtemp()
+TASK_REGISTRY_SOCKET_DIR = os.getenv("TASK_REGISTRY_SOCKET_DIR") or None
+
+
+@dataclass
+class TaskEntry:
+    """Registry entry for one tool invocation."""
+    task_ref: weakref.ref
+    owner: Optional[str]
+    created_at: float
+    deadline: float
+
+    def expired(self, now: float) -> bool:
+        return now >= self.deadline or self.task_ref() is None
+
 
 # Global registry of tasks (keyed by unique ID)
-_tasks: Dict[str, any] = {}
+_tasks: Dict[str, TaskEntry] = {}
+
+_reaper: Optional[asyncio.Task] = None
 
 
-def register_task(task) -> str:
+def register_task(task, owner: Optional[str] = None, ttl: Optional[float] = None) -> str:
     """
     Register a Pipecat task and return its unique ID.
 
     Args:
         task: PipelineTask instance to register
+        owner: ID of the owning connection, for bulk cleanup on disconnect
+        ttl: Seconds until the entry expires (defaults to DEFAULT_TTL)
 
     Returns:
         str: Unique task ID to pass via session state
     """
-    task_id = str(uuid.uuid4())
-    _tasks[task_id] = task
-    logger.debug(f"Registered task: {task_id[:8]}...")
+    task_id = _backend.new_task_id()
+    now = time.monotonic()
+    _tasks[task_id] = TaskEntry(
+        # Drop the entry as soon as the pipeline is garbage collected
+        task_ref=weakref.ref(task, lambda _: _tasks.pop(task_id, None)),
+        owner=owner,
+        created_at=now,
+        deadline=now + (DEFAULT_TTL if ttl is None else ttl),
+    )
+    _ensure_reaper()
+    logger.debug("Registered task", task_id=task_id)
     return task_id
 
 
@@ -34,11 +117,18 @@ def get_task(task_id: str):
         task_id: Unique task identifier
 
     Returns:
-        PipelineTask or None if not found
+        PipelineTask, RemoteTask if another process owns it, or None if not
+        found or expired
     """
-    task = _tasks.get(task_id)
+    entry = _tasks.get(task_id)
+    task = entry.task_ref() if entry else None
+    if entry and entry.expired(time.monotonic()):
+        _tasks.pop(task_id, None)
+        task = None
     if not task:
-        logger.warning(f"Task {task_id[:8]}... not found")
+        task = _backend.remote_task(task_id)
+    if not task:
+        logger.warning("Task not found", task_id=task_id)
     return task
 
 
@@ -50,9 +140,674 @@ def unregister_task(task_id: str):
         task_id: Unique task identifier
     """
     if _tasks.pop(task_id, None):
-        logger.debug(f"Unregistered task: {task_id[:8]}...")
+        logger.debug("Unregistered task", task_id=task_id)
+
+
+def unregister_owner(owner: str) -> int:
+    """
+    Remove every task registered by a connection. Call when its pipeline
+    finishes or the client disconnects.
+
+    Args:
+        owner: ID of the owning connection
+
+    Returns:
+        int: Number of entries removed
+    """
+    task_ids = [task_id for task_id, entry in _tasks.items() if entry.owner == owner]
+    for task_id in task_ids:
+        _tasks.pop(task_id, None)
+    if task_ids:
+        logger.debug(f"Unregistered {len(task_ids)} task(s)", session_id=owner)
+    return len(task_ids)
+
+
+def reap_expired() -> int:
+    """
+    Remove entries past their deadline or whose task has been collected.
+
+    Returns:
+        int: Number of entries removed
+    """
+    now = time.monotonic()
+    task_ids = [task_id for task_id, entry in _tasks.items() if entry.expired(now)]
+    for task_id in task_ids:
+        _tasks.pop(task_id, None)
+    if task_ids:
+        REAPED.inc(len(task_ids))
+        logger.info(f"Reaped {len(task_ids)} expired task(s)")
+    return len(task_ids)
+
+
+async def _reap_forever(interval: float):
+    while True:
+        await asyncio.sleep(interval)
+        reap_expired()
+
+
+def _ensure_reaper():
+    """Start the reaper on the running loop if it is not already running there."""
+    global _reaper
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        return
+    if _reaper is None or _reaper.done() or _reaper.get_loop() is not loop:
+        _reaper = loop.create_task(_reap_forever(REAPER_INTERVAL))
+
+
+async def stop_reaper():
+    """Cancel the background reaper (on server shutdown)."""
+    global _reaper
+    if _reaper is not None and not _reaper.done():
+        _reaper.cancel()
+        try:
+            await _reaper
+        except asyncio.CancelledError:
+            pass
+    _reaper = None
+
+
+async def start_registry():
+    """
+    Start the registry backend (on server startup), e.g. bind the "ipc"
+    backend's socket.
+
+    Raises:
+        OSError: The backend could not start listening
+    """
+    await _backend.start()
+
+
+async def close_registry():
+    """Stop the reaper and the registry backend (on server shutdown)."""
+    await stop_reaper()
+    await _backend.close()
 
 
 def get_active_task_count() -> int:
     """Get number of registered tasks (for monitoring)."""
     return len(_tasks)
+
+
+REGISTRY_SIZE = Gauge(
+    "task_registry_size",
+    "Tasks currently registered in the streaming bridge.",
+    get_active_task_count,
+)
+REAPED = Counter(
+    "task_registry_reaped_total",
+    "Registry entries evicted by the reaper.",
+)
+
+
+class SpeechQueue:
+    """
+    Bounded, paced speech queue in front of one PipelineTask.
+
+    Frames are forwarded to the task at most `max_in_flight` at a time; more
+    are sent once the bot stops speaking (or after `max_wait` seconds). When
+    `high_water_mark` frames are pending, new frames are handled by `policy`:
+
+    - "block": the caller waits for room
+    - "coalesce": text is merged into the newest pending TTSSpeakFrame
+    - "drop": the oldest pending TTSSpeakFrame (a stale partial) is dropped
+
+    Adjacent pending TTSSpeakFrames are sent as one utterance, each fragment
+    kept as its own sentence. Before sending, the queue waits until no new
+    fragment has arrived for `batch_window` seconds, but never longer than
+    `batch_max_delay`, so fewer and larger TTS requests are made.
+    """
+
+    POLICIES = ("block", "coalesce", "drop")
+
+    def __init__(
+        self,
+        task,
+        high_water_mark: int = SPEECH_HIGH_WATER_MARK,
+        policy: str = SPEECH_POLICY,
+        max_in_flight: int = 2,
+        max_wait: float = 10.0,
+        batch_window: float = SPEECH_BATCH_WINDOW,
+        batch_max_delay: float = SPEECH_BATCH_MAX_DELAY,
+        batch_max_chars: int = 400,
+    ):
+        """
+        Args:
+            task: PipelineTask to forward frames to (held weakly)
+            high_water_mark: Pending frames before the policy applies
+            policy: One of POLICIES
+            max_in_flight: Frames forwarded but not yet spoken
+            max_wait: Seconds to wait for the bot to stop speaking
+            batch_window: Quiet gap that ends a batch of fragments
+            batch_max_delay: Longest extra wait for a batch to fill
+            batch_max_chars: Longest merged utterance
+        """
+        if policy not in self.POLICIES:
+            raise ValueError(f"Unknown speech queue policy: {policy}")
+        self._task_ref = weakref.ref(task)
+        self.high_water_mark = high_water_mark
+        self.policy = policy
+        self.max_in_flight = max_in_flight
+        self.max_wait = max_wait
+        self.batch_window = batch_window
+        self.batch_max_delay = batch_max_delay
+        self.batch_max_chars = batch_max_chars
+        self._pending: Deque[Frame] = deque()
+        self._last_arrival = 0.0
+        self._arrived = asyncio.Event()
+        self._in_flight = 0
+        self._spoken = asyncio.Event()
+        self._space = asyncio.Event()
+        self._drain_task: Optional[asyncio.Task] = None
+
+    @property
+    def depth(self) -> int:
+        """Frames waiting to be forwarded to the pipeline."""
+        return len(self._pending)
+
+    async def queue_frames(self, frames):
+        """
+        Queue frames for the pipeline, applying the overflow policy.
+
+        Args:
+            frames: Frames to queue (same as PipelineTask.queue_frames)
+        """
+        for frame in frames:
+            mark_produced(frame)
+            await self._put(frame)
+        self._ensure_drain()
+
+    def clear(self) -> int:
+        """
+        Drop every frame not yet forwarded (e.g. when a tool is cancelled).
+
+        Returns:
+            int: Number of frames dropped
+        """
+        dropped = len(self._pending)
+        self._pending.clear()
+        if self._drain_task is not None and not self._drain_task.done():
+            self._drain_task.cancel()
+        self._space.set()
+        return dropped
+
+    def mark_spoken(self):
+        """Signal that everything forwarded so far has been spoken."""
+        self._in_flight = 0
+        self._spoken.set()
+
+    async def _put(self, frame: Frame):
+        while len(self._pending) >= self.high_water_mark:
+            if self.policy == "coalesce" and self._coalesce(frame):
+                return
+            if self.policy == "drop" and self._drop_stale():
+                break
+            self._ensure_drain()
+            self._space.clear()
+            await self._space.wait()
+        self._pending.append(frame)
+        self._mark_arrival()
+
+    def _mark_arrival(self):
+        self._last_arrival = time.monotonic()
+        self._arrived.set()
+
+    def _coalesce(self, frame: Frame) -> bool:
+        tail = self._pending[-1]
+        if not (isinstance(frame, TTSSpeakFrame) and isinstance(tail, TTSSpeakFrame)):
+            return False
+        self._pending[-1] = _merged(tail, _join_sentences(tail.text, frame.text))
+        self._mark_arrival()
+        return True
+
+    def _drop_stale(self) -> bool:
+        for i, pending in enumerate(self._pending):
+            if isinstance(pending, TTSSpeakFrame):
+                del self._pending[i]
+                logger.debug(f"Dropped stale speech: {pending.text[:30]}")
+                return True
+        return False
+
+    def _ensure_drain(self):
+        if self._pending and (self._drain_task is None or self._drain_task.done()):
+            self._drain_task = asyncio.create_task(self._drain())
+
+    async def _drain(self):
+        while self._pending:
+            if self._in_flight >= self.max_in_flight:
+                self._spoken.clear()
+                try:
+                    await asyncio.wait_for(self._spoken.wait(), timeout=self.max_wait)
+                except asyncio.TimeoutError:
+                    self._in_flight = 0
+                continue
+
+            if self.batch_window > 0 and isinstance(self._pending[0], TTSSpeakFrame):
+                await self._wait_for_batch()
+
+            task = self._task_ref()
+            if task is None:
+                self._pending.clear()
+                break
+            frame = self._take_batch()
+            self._space.set()
+            if isinstance(frame, TTSSpeakFrame):
+                self._in_flight += 1
+            mark_forwarded(frame, source="speech_queue")
+            await task.queue_frames([frame])
+            del task
+        self._space.set()
+
+    async def _wait_for_batch(self):
+        """Hold the head fragment until arrivals pause or batch_max_delay passes."""
+        deadline = time.monotonic() + self.batch_max_delay
+        while True:
+            now = time.monotonic()
+            quiet_at = self._last_arrival + self.batch_window
+            if quiet_at <= now or deadline <= now:
+                return
+            self._arrived.clear()
+            try:
+                await asyncio.wait_for(self._arrived.wait(), timeout=min(quiet_at, deadline) - now)
+            except asyncio.TimeoutError:
+                pass
+
+    def _take_batch(self) -> Frame:
+        """Pop the head frame, merging adjacent text fragments into it."""
+        frame = self._pending.popleft()
+        if self.batch_window <= 0 or not isinstance(frame, TTSSpeakFrame):
+            return frame
+        text = frame.text
+        while self._pending and isinstance(self._pending[0], TTSSpeakFrame):
+            merged = _join_sentences(text, self._pending[0].text)
+            if len(merged) > self.batch_max_chars:
+                break
+            text = merged
+            self._pending.popleft()
+        return frame if text is frame.text else _merged(frame, text)
+
+
+def _merged(first: TTSSpeakFrame, text: str) -> TTSSpeakFrame:
+    """New frame for merged text, timed from the first fragment."""
+    frame = TTSSpeakFrame(text=text)
+    frame.metadata.update(first.metadata)
+    return frame
+
+
+def _join_sentences(first: str, second: str) -> str:
+    """Join two spoken fragments, ending the first as a sentence if it isn't one."""
+    first = first.rstrip()
+    separator = " " if first[-1:] in ".!?,;:" else ". "
+    return first + separator + second.strip()
+
+
+class _SpeechPacer(BaseObserver):
+    """Tells a SpeechQueue when the bot has stopped speaking."""
+
+    def __init__(self, speech_queue: SpeechQueue):
+        super().__init__()
+        # The task owns the pacer, which keeps the queue alive as long as the task
+        self._speech_queue = speech_queue
+
+    async def on_push_frame(self, data: FramePushed):
+        if isinstance(data.frame, BotStoppedSpeakingFrame):
+            self._speech_queue.mark_spoken()
+
+
+# One speech queue per pipeline task, dropped with the task
+_speech_queues: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+
+
+def get_speech_queue(task_id: str) -> Optional[SpeechQueue]:
+    """
+    Get the bounded speech queue of a registered task.
+
+    Args:
+        task_id: Unique task identifier
+
+    Returns:
+        SpeechQueue, RemoteSpeechQueue if another process owns the task, or
+        None if the task is not found
+    """
+    task = get_task(task_id)
+    if task is None:
+        return None
+    if isinstance(task, RemoteTask):
+        return RemoteSpeechQueue(task.path, task_id)
+    speech_queue = _speech_queues.get(task)
+    if speech_queue is None:
+        speech_queue = SpeechQueue(task)
+        _speech_queues[task] = speech_queue
+        if hasattr(task, "add_observer"):
+            task.add_observer(_SpeechPacer(speech_queue))
+    return speech_queue
+
+
+def clear_speech_queue(task_id: str) -> int:
+    """
+    Drop frames still waiting in a task's speech queue.
+
+    Args:
+        task_id: Unique task identifier
+
+    Returns:
+        int: Number of frames dropped
+    """
+    entry = _tasks.get(task_id)
+    task = entry.task_ref() if entry else None
+    speech_queue = _speech_queues.get(task) if task is not None else None
+    dropped = speech_queue.clear() if speech_queue else 0
+    if dropped:
+        logger.debug(f"Dropped {dropped} queued frame(s)", task_id=task_id)
+    return dropped
+
+
+def get_speech_queue_depth(task_id: str) -> int:
+    """Get number of frames waiting in a task's speech queue (for monitoring)."""
+    entry = _tasks.get(task_id)
+    task = entry.task_ref() if entry else None
+    speech_queue = _speech_queues.get(task) if task is not None else None
+    return speech_queue.depth if speech_queue else 0
+
+
+class RemoteTask:
+    """
+    Stand-in for a PipelineTask owned by another process.
+
+    Each queue_frames() call opens a connection to the owner's socket, so a
+    blocked call (e.g. a full speech queue) never holds up other tools.
+    """
+
+    op = "queue_frames"
+
+    def __init__(self, path: str, task_id: str):
+        """
+        Args:
+            path: Unix socket of the owning pipeline process
+            task_id: Unique task identifier
+        """
+        self.path = path
+        self.task_id = task_id
+
+    async def queue_frames(self, frames):
+        """
+        Forward frames to the task in the owning process.
+
+        Raises:
+            LookupError: The task or its process is gone
+            RuntimeError: The owner failed to queue the frames
+            TypeError: A frame type that cannot cross processes (see _WIRE_FRAMES)
+        """
+        frames = list(frames)
+        for frame in frames:
+            mark_produced(frame)
+        await _call(
+            self.path,
+            {"op": self.op, "task_id": self.task_id, "frames": [_encode_frame(frame) for frame in frames]},
+        )
+
+
+class RemoteSpeechQueue(RemoteTask):
+    """Speech queue of a task owned by another process; the owner paces it."""
+
+    op = "speak"
+
+
+class RegistryBackend:
+    """
+    How task IDs are minted and how tasks of other processes are reached.
+
+    Registrations are always kept in this process; the base class is the
+    in-process backend, where every task ID belongs to this process.
+    """
+
+    def new_task_id(self) -> str:
+        return str(uuid.uuid4())
+
+    async def start(self):
+        """Called once on startup, before any task is registered."""
+
+    def remote_task(self, task_id: str) -> Optional[RemoteTask]:
+        """Get a RemoteTask for an ID owned by another process, if it is one."""
+        return None
+
+    async def close(self):
+        pass
+
+
+class InProcessBackend(RegistryBackend):
+    """Tools run on the pipeline's own process and event loop."""
+
+
+class UnixSocketBackend(RegistryBackend):
+    """
+    Serves this process's tasks on a Unix socket; task IDs carry the socket
+    path ("<uuid>@<path>"), so any local process can reach their owner.
+
+    The socket lives in a directory only this user can enter, and messages
+    are JSON, so a peer can at most queue speech, never run code here.
+    """
+
+    def __init__(self, socket_dir: Optional[str] = TASK_REGISTRY_SOCKET_DIR):
+        """
+        Args:
+            socket_dir: Private directory for this process's socket (default:
+                one is made on start())
+        """
+        self.socket_dir = socket_dir
+        self.path: Optional[str] = None
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._made_dir: Optional[str] = None
+
+    def new_task_id(self) -> str:
+        if self._server is None:
+            raise RuntimeError("Task registry socket is not listening; await start_registry() first")
+        return f"{uuid.uuid4()}@{self.path}"
+
+    async def start(self):
+        """
+        Bind and listen on the socket.
+
+        Raises:
+            PermissionError: The socket directory is not private to this user
+            FileExistsError: Something other than our own stale socket holds the path
+        """
+        if self._server is not None:
+            return
+        socket_dir = self.socket_dir or self._make_private_dir()
+        _check_private_dir(socket_dir)
+        path = os.path.join(socket_dir, f"pipecat-tasks-{os.getpid()}.sock")
+        _remove_stale_socket(path)
+        # No window where the socket is reachable before it is locked down
+        umask = os.umask(0o077)
+        try:
+            self._server = await asyncio.start_unix_server(self._serve, path=path)
+        finally:
+            os.umask(umask)
+        self.path = path
+        logger.info(f"Task registry listening on {path}")
+
+    def _make_private_dir(self) -> str:
+        runtime_dir = os.getenv("XDG_RUNTIME_DIR")
+        if runtime_dir and os.path.isdir(runtime_dir):
+            socket_dir = os.path.join(runtime_dir, "pipecat-tasks")
+            os.makedirs(socket_dir, mode=0o700, exist_ok=True)
+            return socket_dir
+        self._made_dir = tempfile.mkdtemp(prefix="pipecat-tasks-")
+        return self._made_dir
+
+    def remote_task(self, task_id: str) -> Optional[RemoteTask]:
+        _, _, path = task_id.partition("@")
+        if not path or path == self.path:
+            return None
+        return RemoteTask(path, task_id)
+
+    async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                try:
+                    request = await _read_message(reader)
+                except asyncio.IncompleteReadError:
+                    break
+                except ValueError as e:
+                    logger.warning(f"Rejected malformed registry message: {e}")
+                    _write_message(writer, {"ok": False, "error": f"Malformed message: {e}"})
+                    await writer.drain()
+                    break
+                _write_message(writer, await self._handle(request))
+                await writer.drain()
+        except (ConnectionError, OSError):
+            pass
+        finally:
+            writer.close()
+
+    async def _handle(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        try:
+            task_id = str(request["task_id"])
+            frames = [_decode_frame(frame) for frame in request["frames"]]
+        except (KeyError, TypeError, ValueError) as e:
+            return {"ok": False, "error": f"Bad request: {e}"}
+        if request.get("op") == "speak":
+            target = get_speech_queue(task_id)
+        else:
+            target = get_task(task_id)
+        if target is None or isinstance(target, RemoteTask):
+            return {"ok": False, "missing": True, "error": "Task not found"}
+        try:
+            await target.queue_frames(frames)
+        except Exception as e:
+            logger.exception("Remote queue_frames failed", task_id=task_id)
+            return {"ok": False, "error": str(e)}
+        return {"ok": True}
+
+    async def close(self):
+        if self._server is None:
+            return
+        server, self._server = self._server, None
+        server.close()
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+        if self._made_dir is not None:
+            shutil.rmtree(self._made_dir, ignore_errors=True)
+            self._made_dir = None
+
+
+def _check_private_dir(path: str):
+    """Raise PermissionError unless only this user can reach into `path`."""
+    st = os.stat(path)
+    if not stat.S_ISDIR(st.st_mode):
+        raise NotADirectoryError(f"Task registry socket dir is not a directory: {path}")
+    if st.st_uid != os.getuid() or st.st_mode & 0o077:
+        raise PermissionError(
+            f"Task registry socket dir must be owned by uid {os.getuid()} with mode 0700: "
+            f"{path} (uid {st.st_uid}, mode {stat.S_IMODE(st.st_mode):o})"
+        )
+
+
+def _remove_stale_socket(path: str):
+    """Unlink our own dead socket at `path`; refuse anything else found there."""
+    try:
+        st = os.lstat(path)
+    except FileNotFoundError:
+        return
+    if not stat.S_ISSOCK(st.st_mode) or st.st_uid != os.getuid():
+        raise FileExistsError(f"Refusing to replace {path}: not our socket")
+    with socket.socket(socket.AF_UNIX) as probe:
+        try:
+            probe.connect(path)
+        except ConnectionRefusedError:
+            os.unlink(path)  # Left behind by a crashed process with our PID
+            return
+    raise FileExistsError(f"Refusing to replace {path}: another process is listening")
+
+
+_LENGTH = struct.Struct("!I")
+
+# Largest message accepted from a peer, in bytes
+_MAX_MESSAGE = 1 << 20
+
+# Frames a tool may send to another process's pipeline, by type name
+_WIRE_FRAMES = {cls.__name__: cls for cls in (TTSSpeakFrame,)}
+
+
+def _encode_frame(frame: Frame) -> Dict[str, Any]:
+    if type(frame).__name__ not in _WIRE_FRAMES:
+        raise TypeError(f"{type(frame).__name__} cannot be sent to another process")
+    return {"type": type(frame).__name__, "text": frame.text, "produced_at": frame.metadata.get(PRODUCED_AT)}
+
+
+def _decode_frame(data: Dict[str, Any]) -> Frame:
+    frame_class = _WIRE_FRAMES.get(data.get("type"))
+    if frame_class is None or not isinstance(data.get("text"), str):
+        raise ValueError(f"Unsupported frame: {data.get('type')!r}")
+    frame = frame_class(text=data["text"])
+    if isinstance(data.get("produced_at"), (int, float)):
+        # perf_counter is CLOCK_MONOTONIC, comparable across local processes
+        frame.metadata[PRODUCED_AT] = data["produced_at"]
+    return frame
+
+
+async def _read_message(reader: asyncio.StreamReader) -> Dict[str, Any]:
+    """
+    Read one length-prefixed JSON object.
+
+    Raises:
+        ValueError: The message is too large, not JSON, or not an object
+    """
+    (length,) = _LENGTH.unpack(await reader.readexactly(_LENGTH.size))
+    if length > _MAX_MESSAGE:
+        raise ValueError(f"Message of {length} bytes is over the {_MAX_MESSAGE} byte limit")
+    message = json.loads(await reader.readexactly(length))
+    if not isinstance(message, dict):
+        raise ValueError("Message is not a JSON object")
+    return message
+
+
+def _write_message(writer: asyncio.StreamWriter, message: Dict[str, Any]):
+    payload = json.dumps(message).encode()
+    writer.write(_LENGTH.pack(len(payload)) + payload)
+
+
+async def _call(path: str, request: Dict[str, Any]):
+    """Send one request to a task owner's socket and raise on failure."""
+    try:
+        reader, writer = await asyncio.open_unix_connection(path)
+    except (FileNotFoundError, ConnectionRefusedError):
+        raise LookupError(f"Task owner is gone: {path}")
+    try:
+        _write_message(writer, request)
+        await writer.drain()
+        response = await _read_message(reader)
+    except asyncio.IncompleteReadError:
+        raise LookupError(f"Task owner closed the connection: {path}")
+    finally:
+        writer.close()
+    if response.get("missing"):
+        raise LookupError(response["error"])
+    if not response["ok"]:
+        raise RuntimeError(response["error"])
+
+
+BACKENDS = {"local": InProcessBackend, "ipc": UnixSocketBackend}
+
+if TASK_REGISTRY_BACKEND not in BACKENDS:
+    raise ValueError(f"Unknown task registry backend: {TASK_REGISTRY_BACKEND}")
+
+_backend: RegistryBackend = BACKENDS[TASK_REGISTRY_BACKEND]()
+
+
+def get_registry_backend() -> RegistryBackend:
+    return _backend
+
+
+def set_registry_backend(backend: RegistryBackend) -> RegistryBackend:
+    """
+    Replace the registry backend, returning the previous one.
+
+    Tasks registered under the old backend keep their IDs and stay reachable
+    in this process.
+    """
+    global _backend
+    previous, _backend = _backend, backend
+    return previous
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Simple test to verify sentence-by-sentence streaming of google_adk output.
+"""
+import asyncio
+from types import SimpleNamespace
+import bot_fast_api
+from bot_fast_api import AgentRunner, speak_sentences
+from streaming_bridge import SpeechQueue
+
+
+class MockTask:
+    """Mock PipelineTask recording what is queued for TTS."""
+    def __init__(self):
+        self.texts = []
+
+    async def queue_frames(self, frames):
+        self.texts.extend(frame.text for frame in frames)
+
+
+def event(text: str, partial: bool, author: str = "agent"):
+    """An ADK event with one text part."""
+    content = SimpleNamespace(parts=[SimpleNamespace(text=text)])
+    return SimpleNamespace(partial=partial, content=content, author=author)
+
+
+class MockRunnerPool:
+    """Stands in for runner_pool, serving one session whose runner replays `events`."""
+    def __init__(self, events):
+        async def run_async(**kwargs):
+            for e in events:
+                await asyncio.sleep(0)
+                yield e
+
+        self.session = SimpleNamespace(
+            session_id="session",
+            user_id="user",
+            lock=asyncio.Lock(),
+            runner=SimpleNamespace(run_async=run_async),
+        )
+
+    async def acquire(self, root_agent, app_name, session_key):
+        return self.session
+
+    async def release(self, session_key):
+        pass
+
+
+def punkt_available() -> bool:
+    """Whether NLTK's sentence tokenizer data, which pipecat downloads on import, is installed."""
+    import nltk
+    try:
+        nltk.data.find("tokenizers/punkt_tab/english/")
+    except LookupError:
+        return False
+    return True
+
+
+async def stream_events(events):
+    """Run AgentRunner.run_streaming over fake SSE events, returning its chunks."""
+    pool, bot_fast_api.runner_pool = bot_fast_api.runner_pool, MockRunnerPool(events)
+    try:
+        return [chunk async for chunk in AgentRunner.run_streaming("q", None, "task")]
+    finally:
+        bot_fast_api.runner_pool = pool
+
+
+async def speak_events(events, **queue_options):
+    """Run the streaming path over fake SSE events, returning (task, speech queue, result)."""
+    pool, bot_fast_api.runner_pool = bot_fast_api.runner_pool, MockRunnerPool(events)
+    try:
+        task = MockTask()
+        speech_queue = SpeechQueue(task, **{"batch_window": 0, "max_in_flight": 100, **queue_options})
+        result = await speak_sentences(AgentRunner.run_streaming("q", None, "task"), speech_queue)
+        return task, speech_queue, result
+    finally:
+        bot_fast_api.runner_pool = pool
+
+
+PARTIALS = [
+    event("Hello there. How", partial=True),
+    event(" are you? I am", partial=True),
+    event(" fine", partial=True),
+    event("Hello there. How are you? I am fine", partial=False),  # SSE aggregate
+]
+
+
+async def test_aggregate_skipped():
+    """Test that the aggregate event after partials is not yielded again."""
+    print("Test 1: Aggregate Event Skipped After Partials")
+    chunks = await stream_events(PARTIALS)
+    assert chunks == ["Hello there. How", " are you? I am", " fine"], f"Chunks: {chunks}"
+
+    chunks = await stream_events([
+        event("Looking that up.", partial=True),
+        event("Looking that up.", partial=False),  # Aggregate of the partial above
+        event("The code is 42.", partial=False, author="sub_agent"),
+        event("Anything else?", partial=False, author="sub_agent"),
+    ])
+    assert chunks == ["Looking that up.", "The code is 42.", "Anything else?"], f"Chunks: {chunks}"
+    print(f"✓ Partials yielded once, complete events after an aggregate still yielded\n")
+
+
+async def test_sentences_queued_to_tts():
+    """Test that streamed chunks reach TTS as whole sentences, once each."""
+    print("Test 2: Sentences Queued to TTS")
+    if not punkt_available():
+        print("⚠ Skipped: NLTK punkt_tab data (used by pipecat's sentence matching) not installed\n")
+        return
+    task, _, result = await speak_events(PARTIALS)
+    await asyncio.sleep(0.05)  # Speech queue forwards in the background
+    assert task.texts == ["Hello there.", "How are you?", "I am fine"], f"Spoken: {task.texts}"
+    assert result == "Hello there. How are you? I am fine", f"Result: {result}"
+    print(f"✓ Spoken {task.texts}")
+
+    # Paced like any tool speech: unsent sentences go when the queue is cleared
+    task, speech_queue, _ = await speak_events(PARTIALS, max_in_flight=1)
+    await asyncio.sleep(0.05)
+    assert task.texts == ["Hello there."] and speech_queue.depth == 2, "Rest wait for the bot"
+    assert speech_queue.clear() == 2 and task.texts == ["Hello there."], "Cleared on deadline"
+    print(f"✓ Sentences go through the speech queue; clear() drops the unsent ones\n")
+
+
+async def main():
+    """Run all tests."""
+    print("=" * 60)
+    print("ADK STREAMING TESTS")
+    print("=" * 60 + "\n")
+
+    try:
+        await test_aggregate_skipped()
+        await test_sentences_queued_to_tts()
+
+        print("=" * 60)
+        print("✅ ALL TESTS PASSED!")
+        print("=" * 60)
+
+    except AssertionError as e:
+        print(f"\n❌ TEST FAILED: {e}")
+        return 1
+    except Exception as e:
+        print(f"\n❌ ERROR: {e}")
+        import traceback
+        traceback.print_exc()
+        return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    exit_code = asyncio.run(main())
+    exit(exit_code)
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Simple test to verify session admission control and load shedding.
+"""
+import asyncio
+import time
+from types import SimpleNamespace
+import admission
+from admission import AdmissionController, AdmissionRejected, REJECTED
+
+
+async def test_cap_and_queue():
+    """Test that callers past the cap wait for a slot in order."""
+    print("Test 1: Session Cap and Wait Queue")
+    controller = AdmissionController(max_sessions=2, queue_size=2, queue_timeout=1.0)
+    await controller.acquire()
+    await controller.acquire()
+    assert controller.over_budget() == "sessions", "Cap should be reached"
+
+    admitted = []
+
+    async def caller(name):
+        await controller.acquire()
+        admitted.append(name)
+
+    waiters = [asyncio.create_task(caller(name)) for name in ("first", "second")]
+    await asyncio.sleep(0.01)
+    assert controller.waiting == 2 and not admitted, "Both callers should wait"
+
+    await controller.release()
+    await asyncio.sleep(0.01)
+    assert admitted == ["first"], f"Earliest waiter admitted first: {admitted}"
+    await controller.release()
+    await asyncio.gather(*waiters)
+    assert admitted == ["first", "second"] and controller.live_sessions == 2
+    print(f"✓ Waiters admitted in order as slots freed\n")
+
+
+async def test_rejections():
+    """Test that a full queue and a timed-out wait are rejected cleanly."""
+    print("Test 2: Queue Full and Timeout")
+    controller = AdmissionController(max_sessions=1, queue_size=1, queue_timeout=0.05)
+    await controller.acquire()
+    before = REJECTED.get(reason="queue_full")
+
+    waiter = asyncio.create_task(controller.acquire())
+    await asyncio.sleep(0.01)
+    try:
+        await controller.acquire()
+        assert False, "Queue is full"
+    except AdmissionRejected as e:
+        assert e.reason == "queue_full"
+    assert REJECTED.get(reason="queue_full") == before + 1, "Rejection counted"
+
+    try:
+        await waiter
+        assert False, "Waiter should time out"
+    except AdmissionRejected as e:
+        assert e.reason == "queue_timeout"
+    assert controller.waiting == 0 and controller.live_sessions == 1
+    print(f"✓ Queue full rejected at once, waiter timed out\n")
+
+
+async def test_overload_sheds_load():
+    """Test that loop lag and CPU over budget hold back new sessions."""
+    print("Test 3: Loop Lag and CPU")
+    controller = AdmissionController(max_sessions=0, max_loop_lag=0.1, max_cpu=0.8, queue_timeout=1.0)
+    controller.loop_lag = 0.5
+    assert controller.over_budget() == "loop_lag", "Lag over budget"
+
+    waiter = asyncio.create_task(controller.acquire())
+    controller.start()
+    await asyncio.sleep(0.15)
+    assert not waiter.done(), "Caller should wait while the loop lags"
+
+    # The lag recovers on its own as the monitor samples an idle loop
+    await asyncio.wait_for(waiter, timeout=1.0)
+    assert controller.over_budget() is None
+    await controller.stop()
+    print(f"✓ Admitted once lag recovered ({controller.loop_lag * 1000:.1f} ms)")
+
+    controller.cpu = 0.95
+    assert controller.over_budget() == "cpu", "CPU over budget"
+    print(f"✓ CPU over budget detected\n")
+
+
+async def test_cpu_per_usable_core():
+    """Test that CPU use from many threads is measured against all usable cores."""
+    print("Test 4: CPU Measured Against Usable Cores")
+    started = time.monotonic()
+    # Three cores busy: e.g. VAD batching, a tool pool and the event loop
+    clock = SimpleNamespace(monotonic=time.monotonic, process_time=lambda: 3 * (time.monotonic() - started))
+    real_time, admission.time = admission.time, clock
+    try:
+        controllers = [AdmissionController(max_cpu=0.9, interval=0.005, cores=cores) for cores in (4, 2)]
+        for controller in controllers:
+            controller.start()
+        await asyncio.sleep(0.6)
+        for controller in controllers:
+            await controller.stop()
+    finally:
+        admission.time = real_time
+
+    four, two = controllers
+    assert 0.6 < four.cpu < 0.8 and four.over_budget() is None, f"3 of 4 cores: {four.cpu:.2f}"
+    assert two.cpu > 0.9 and two.over_budget() == "cpu", f"3 cores' work on 2: {two.cpu:.2f}"
+    assert admission.usable_cores() >= 1
+    print(f"✓ 3 busy threads: {four.cpu:.2f} of 4 cores admitted, {two.cpu:.2f} of 2 shed\n")
+
+
+async def main():
+    """Run all tests."""
+    print("=" * 60)
+    print("ADMISSION CONTROL TESTS")
+    print("=" * 60 + "\n")
+
+    try:
+        await test_cap_and_queue()
+        await test_rejections()
+        await test_overload_sheds_load()
+        await test_cpu_per_usable_core()
+
+        print("=" * 60)
+        print("✅ ALL TESTS PASSED!")
+        print("=" * 60)
+
+    except AssertionError as e:
+        print(f"\n❌ TEST FAILED: {e}")
+        return 1
+    except Exception as e:
+        print(f"\n❌ ERROR: {e}")
+        import traceback
+        traceback.print_exc()
+        return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    exit_code = asyncio.run(main())
+    exit(exit_code)
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Simple test to verify the copy-free input audio path.
+"""
+import asyncio
+import numpy as np
+from pipecat.audio.vad.silero import SileroVADAnalyzer
+from pipecat.frames.frames import InputAudioRawFrame
+from pipecat.frames.protobufs import frames_pb2
+from pipecat.serializers.protobuf import ProtobufFrameSerializer
+from audio_buffers import AudioChunker, ZeroCopyProtobufFrameSerializer
+from shared_vad import SharedSileroVADAnalyzer
+
+
+def make_audio(seconds: float = 3.0, sample_rate: int = 16000) -> bytes:
+    """Tone bursts with noise, separated by silence."""
+    rng = np.random.default_rng(0)
+    t = np.arange(int(seconds * sample_rate)) / sample_rate
+    voiced = (t % 1.0) < 0.6
+    signal = np.sin(2 * np.pi * 220 * t) * 0.4 + rng.normal(0, 0.05, t.size)
+    return (signal * voiced * 32767).astype(np.int16).tobytes()
+
+
+async def test_zero_copy_deserialize():
+    """Test that audio frames reference the message and match protobuf."""
+    print("Test 1: Zero-Copy Audio Deserialization")
+    audio = make_audio(0.02)
+    message = frames_pb2.Frame(
+        audio=frames_pb2.AudioRawFrame(audio=audio, sample_rate=16000, num_channels=1, pts=7)
+    ).SerializeToString()
+
+    frame = await ZeroCopyProtobufFrameSerializer().deserialize(message)
+    expected = await ProtobufFrameSerializer().deserialize(message)
+    assert isinstance(frame, InputAudioRawFrame), f"Unexpected frame: {frame}"
+    assert isinstance(frame.audio, memoryview) and frame.audio.obj is message, "Audio should be a view"
+    assert bytes(frame.audio) == expected.audio and frame.pts == 7
+    assert (frame.sample_rate, frame.num_channels, frame.num_frames) == (16000, 1, 320)
+    print(f"✓ {len(frame.audio)} audio bytes sliced from the message without a copy")
+
+    text = frames_pb2.Frame(text=frames_pb2.TextFrame(text="hi")).SerializeToString()
+    text_frame = await ZeroCopyProtobufFrameSerializer().deserialize(text)
+    assert text_frame.text == "hi", "Other frames go through protobuf"
+    print(f"✓ Non-audio frames fall back to protobuf\n")
+
+
+def test_chunker():
+    """Test that windows come out whole and in order from a reused buffer."""
+    print("Test 2: Audio Chunker")
+    chunker = AudioChunker(window_bytes=1024, capacity=2048)
+    data = bytes(range(256)) * 40
+    windows = []
+    for start in range(0, len(data), 640):  # 20 ms chunks
+        windows.extend(bytes(window) for window in chunker.push(data[start:start + 640]))
+    assert b"".join(windows) == data[:len(windows) * 1024], "Windows should tile the stream"
+    assert chunker.pending == len(data) - len(windows) * 1024
+    buffer = chunker._buffer
+    list(chunker.push(b"\x00" * 640))
+    assert chunker._buffer is buffer, "Buffer should be reused"
+    print(f"✓ {len(windows)} windows from 640-byte chunks, buffer reused\n")
+
+
+def test_vad_matches_pipecat():
+    """Test that the pooled analyzer gives the same results as pipecat's."""
+    print("Test 3: VAD Results Unchanged")
+    audio = make_audio()
+    reference, pooled = SileroVADAnalyzer(), SharedSileroVADAnalyzer()
+    for analyzer in (reference, pooled):
+        analyzer.set_sample_rate(16000)  # As the transport does on start
+    reference._last_reset_time = pooled._last_reset_time = float("inf")  # No mid-test resets
+
+    confidences = {reference: [], pooled: []}
+    for analyzer, recorded in confidences.items():
+        def recording(buffer, analyzer=analyzer, recorded=recorded):
+            confidence = type(analyzer).voice_confidence(analyzer, buffer)
+            recorded.append(float(np.ravel(confidence)[0]))
+            return confidence
+        analyzer.voice_confidence = recording
+
+    states = []
+    for start in range(0, len(audio), 640):
+        chunk = audio[start:start + 640]
+        expected = reference.analyze_audio(chunk)
+        actual = pooled.analyze_audio(memoryview(chunk))
+        assert actual == expected, f"State differs at byte {start}: {actual} != {expected}"
+        assert abs(pooled._prev_volume - reference._prev_volume) < 1e-9, "Volume should match"
+        states.append(actual)
+    assert np.allclose(confidences[pooled], confidences[reference], atol=1e-6), "Confidence should match"
+    print(f"✓ Same VAD states, confidences and volumes over {len(states)} chunks")
+    print(f"✓ Peak confidence {max(confidences[pooled]):.3f} over {len(confidences[pooled])} windows\n")
+
+
+async def main():
+    """Run all tests."""
+    print("=" * 60)
+    print("AUDIO BUFFER TESTS")
+    print("=" * 60 + "\n")
+
+    try:
+        await test_zero_copy_deserialize()
+        test_chunker()
+        test_vad_matches_pipecat()
+
+        print("=" * 60)
+        print("✅ ALL TESTS PASSED!")
+        print("=" * 60)
+
+    except AssertionError as e:
+        print(f"\n❌ TEST FAILED: {e}")
+        return 1
+    except Exception as e:
+        print(f"\n❌ ERROR: {e}")
+        import traceback
+        traceback.print_exc()
+        return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    exit_code = asyncio.run(main())
+    exit(exit_code)
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Simple test to verify context-window compaction for long calls.
+"""
+from pipecat.processors.aggregators.openai_llm_context import OpenAILLMContext
+from context_window import SUMMARY_PREFIX, TRUNCATED_MARK, ContextWindow, estimate_tokens
+
+SYSTEM_PROMPT = {"role": "system", "content": "You are a helpful voice bot."}
+
+
+def add_turn(context: OpenAILLMContext, i: int, tool_result: str = "Sunny, 21 degrees"):
+    """Append one user turn with a tool call, its result and a reply."""
+    call_id = f"call_{i}"
+    context.add_messages([
+        {"role": "user", "content": f"Question number {i} about the weather in town {i}?"},
+        {
+            "role": "assistant",
+            "tool_calls": [{
+                "id": call_id,
+                "type": "function",
+                "function": {"name": "get_current_weather", "arguments": '{"location": "Town"}'},
+            }],
+        },
+        {"role": "tool", "tool_call_id": call_id, "content": tool_result},
+        {"role": "assistant", "content": f"Answer number {i}: it is sunny today."},
+    ])
+
+
+def test_truncate_tool_results():
+    """Test that large tool results are cut down once."""
+    print("Test 1: Tool Result Truncation")
+    window = ContextWindow(token_budget=0, max_tool_chars=100)
+    context = OpenAILLMContext([dict(SYSTEM_PROMPT)])
+    add_turn(context, 1, tool_result="x" * 5000)
+
+    assert window.compact(context), "Large result should be truncated"
+    tool_message = context.messages[3]
+    assert tool_message["content"] == "x" * 100 + TRUNCATED_MARK
+    assert not window.compact(context), "Already truncated results are left alone"
+    print(f"✓ 5000-char tool result cut to {len(tool_message['content'])} chars\n")
+
+
+def test_long_call_stays_in_budget():
+    """Test that a long call keeps the prompt, recent turns and a summary."""
+    print("Test 2: Rolling Window Over a Long Call")
+    window = ContextWindow(token_budget=300, max_tool_chars=0, summary_max_chars=200)
+    context = OpenAILLMContext([dict(SYSTEM_PROMPT)])
+    sizes = []
+    for i in range(50):
+        add_turn(context, i)
+        window.compact(context)
+        sizes.append(estimate_tokens(context.messages))
+
+    messages = context.messages
+    assert max(sizes) <= 300, f"Context exceeded budget: {max(sizes)}"
+    assert messages[0] == SYSTEM_PROMPT, "System prompt kept first"
+    assert messages[1]["content"].startswith(SUMMARY_PREFIX), "Dropped turns summarized"
+    assert len(messages[1]["content"]) <= len(SUMMARY_PREFIX) + 203, "Summary bounded"
+    assert "Question number 49" in messages[-4]["content"], "Latest turn kept"
+    assert messages[2]["role"] == "user", "Turns dropped whole, tool calls stay paired"
+    print(f"✓ Size flat at {sizes[10]}..{sizes[-1]} tokens over 50 turns, {len(messages)} messages kept")
+    print(f"✓ {messages[1]['content'][:70]}...\n")
+
+
+def test_within_budget_untouched():
+    """Test that a short context is not changed."""
+    print("Test 3: Short Context Untouched")
+    window = ContextWindow(token_budget=3000)
+    context = OpenAILLMContext([dict(SYSTEM_PROMPT)])
+    add_turn(context, 1)
+    before = [dict(message) for message in context.messages]
+    assert not window.compact(context), "Nothing to compact"
+    assert context.messages == before
+    print(f"✓ {len(before)} messages left as they were\n")
+
+
+def main():
+    """Run all tests."""
+    print("=" * 60)
+    print("CONTEXT WINDOW TESTS")
+    print("=" * 60 + "\n")
+
+    try:
+        test_truncate_tool_results()
+        test_long_call_stays_in_budget()
+        test_within_budget_untouched()
+
+        print("=" * 60)
+        print("✅ ALL TESTS PASSED!")
+        print("=" * 60)
+
+    except AssertionError as e:
+        print(f"\n❌ TEST FAILED: {e}")
+        return 1
+    except Exception as e:
+        print(f"\n❌ ERROR: {e}")
+        import traceback
+        traceback.print_exc()
+        return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
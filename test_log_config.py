@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Simple test to verify structured, rate-limited logging.
+"""
+import io
+import json
+import sys
+import time
+from loguru import logger
+from log_config import DebugRateLimiter, configure_logging, get_log_settings
+
+
+def capture_logs(**settings) -> io.StringIO:
+    """Point the log handler at a buffer, with the given settings."""
+    buffer = io.StringIO()
+    stderr, sys.stderr = sys.stderr, buffer
+    try:
+        configure_logging(enqueue=False, **settings)
+    finally:
+        sys.stderr = stderr
+    return buffer
+
+
+def test_rate_limiter():
+    """Test that debug records are limited per session."""
+    print("Test 1: Per-Session Rate Limit")
+    limiter = DebugRateLimiter(rate=5)
+    allowed = sum(limiter.allow("session-a") for _ in range(20))
+    assert allowed == 5, f"Burst should be one second's worth: {allowed}"
+    assert limiter.allow("session-b"), "Other sessions have their own budget"
+    time.sleep(0.25)
+    assert limiter.allow("session-a"), "Tokens refill over time"
+    assert all(DebugRateLimiter(rate=0).allow("s") for _ in range(100)), "0 means no limit"
+    print(f"✓ 5 of 20 burst records kept, other sessions unaffected\n")
+
+
+def test_json_records_carry_context():
+    """Test that bound session and task IDs become JSON fields."""
+    print("Test 2: JSON Records With Context")
+    buffer = capture_logs(format="json", level="DEBUG", debug_rate=0)
+    with logger.contextualize(session_id="conn-1"):
+        logger.bind(task_id="task-1").info("Speaking")
+
+    record = json.loads(buffer.getvalue().splitlines()[-1])["record"]
+    assert record["message"] == "Speaking", "Message should not embed IDs"
+    assert record["extra"] == {"session_id": "conn-1", "task_id": "task-1"}
+    print(f"✓ IDs carried as fields: {record['extra']}\n")
+
+
+def test_runtime_switch():
+    """Test that level, format and rate limit change without a restart."""
+    print("Test 3: Runtime Switch")
+    buffer = capture_logs(format="text", level="DEBUG", debug_rate=2)
+    with logger.contextualize(session_id="chatty"):
+        for i in range(10):
+            logger.debug(f"Fragment {i}")
+        logger.info("Turn complete")
+    lines = buffer.getvalue().splitlines()
+    assert sum("Fragment" in line for line in lines) == 2, "Debug records rate-limited"
+    assert any("Turn complete" in line and "session_id=chatty" in line for line in lines)
+    print(f"✓ Debug limited to 2 records, info always written")
+
+    buffer = capture_logs(level="WARNING")
+    logger.info("Hidden")
+    assert buffer.getvalue() == "", "Level raised at runtime"
+    assert get_log_settings()["level"] == "WARNING"
+    for bad in ({"format": "xml"}, {"level": 5}, {"level": None}, {"debug_rate": -1},
+                {"debug_sample": "all"}, {"enqueue": "yes"}, {"colour": "red"}):
+        try:
+            configure_logging(**bad)
+            assert False, f"{bad} should be rejected"
+        except ValueError:
+            pass
+    assert get_log_settings()["level"] == "WARNING", "Rejected changes leave settings alone"
+    print(f"✓ Level switched to WARNING, bad settings rejected\n")
+
+
+def main():
+    """Run all tests."""
+    print("=" * 60)
+    print("LOG CONFIG TESTS")
+    print("=" * 60 + "\n")
+
+    try:
+        test_rate_limiter()
+        test_json_records_carry_context()
+        test_runtime_switch()
+
+        print("=" * 60)
+        print("✅ ALL TESTS PASSED!")
+        print("=" * 60)
+
+    except AssertionError as e:
+        print(f"\n❌ TEST FAILED: {e}")
+        return 1
+    except Exception as e:
+        print(f"\n❌ ERROR: {e}")
+        import traceback
+        traceback.print_exc()
+        return 1
+    finally:
+        configure_logging(level="DEBUG", format="text", debug_rate=0)
+
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+Simple test to verify tool result caching and single-flight dedup.
+"""
+import asyncio
+from pipecat.frames.frames import FunctionCallResultProperties
+from pipecat.services.llm_service import FunctionCallParams
+from result_cache import LRUResultCache, ToolResultCache, make_cache_key, MISS
+
+
+def make_params(function_name, arguments, results):
+    """Build FunctionCallParams whose result_callback records into `results`."""
+    async def result_callback(result, *, properties=None):
+        results.append(result)
+
+    return FunctionCallParams(
+        function_name=function_name,
+        tool_call_id="call",
+        arguments=arguments,
+        llm=None,
+        context=None,
+        result_callback=result_callback,
+    )
+
+
+async def test_cache_hits_and_normalization():
+    """Test that identical normalized calls are answered from the cache."""
+    print("Test 1: Cache Hits and Normalization")
+    calls = []
+
+    async def dispatch(params):
+        calls.append(params.arguments)
+        await params.result_callback(f"Weather for {params.arguments['location']}")
+
+    tool_cache = ToolResultCache(LRUResultCache(), ttls={"get_current_weather": 60})
+    results = []
+    await tool_cache.run(make_params("get_current_weather", {"location": "San Francisco, CA"}, results), dispatch)
+    await tool_cache.run(make_params("get_current_weather", {"location": " san  francisco, ca"}, results), dispatch)
+
+    assert len(calls) == 1, "Second call should be a cache hit"
+    assert results == ["Weather for San Francisco, CA"] * 2, "Both callers get the result"
+    assert make_cache_key("f", {"b": 1, "a": "X"}) == make_cache_key("f", {"a": "x", "b": 1})
+    print(f"✓ 2 calls, 1 execution\n")
+
+
+async def test_single_flight():
+    """Test that concurrent identical calls share one execution."""
+    print("Test 2: Single-Flight Dedup")
+    calls = []
+
+    async def dispatch(params):
+        calls.append(params.arguments)
+        await asyncio.sleep(0.05)
+        await params.result_callback("The secret code is 1234")
+
+    tool_cache = ToolResultCache(LRUResultCache(), ttls={"google_adk": 30})
+    results = []
+    await asyncio.gather(*[
+        tool_cache.run(make_params("google_adk", {"query": "secret code?"}, results), dispatch)
+        for _ in range(5)
+    ])
+
+    assert len(calls) == 1, "Concurrent identical calls should run once"
+    assert results == ["The secret code is 1234"] * 5, "Every caller gets the result"
+    print(f"✓ 5 concurrent calls, 1 execution\n")
+
+
+async def test_leader_cancelled():
+    """Test that followers recover when the leading call is cancelled."""
+    print("Test 3: Leader Cancelled")
+    calls = []
+
+    async def dispatch(params):
+        calls.append(params.arguments)
+        await asyncio.sleep(0.05)
+        await params.result_callback("done")
+
+    tool_cache = ToolResultCache(LRUResultCache(), ttls={"google_adk": 30})
+    results = []
+    leader = asyncio.create_task(tool_cache.run(make_params("google_adk", {"query": "q"}, results), dispatch))
+    await asyncio.sleep(0)
+    follower = asyncio.create_task(tool_cache.run(make_params("google_adk", {"query": "q"}, results), dispatch))
+    await asyncio.sleep(0)
+    leader.cancel()
+    await follower
+
+    assert results == ["done"], "Follower should run its own call"
+    assert len(calls) == 2, "Leader and follower each executed"
+    print(f"✓ Follower completed after leader cancellation\n")
+
+
+async def test_ttl_lru_and_errors():
+    """Test TTL expiry, the size cap and uncacheable results."""
+    print("Test 4: TTL, LRU and Uncacheable Results")
+    cache = LRUResultCache(max_entries=2)
+    await cache.set("a", 1, ttl=0.05)
+    await cache.set("b", 2, ttl=60)
+    await cache.set("c", 3, ttl=60)
+    assert await cache.get("a") is MISS, "Oldest entry evicted past the cap"
+    assert len(cache) == 2, "Cache should stay at its cap"
+    await cache.set("d", 4, ttl=0.05)
+    await asyncio.sleep(0.1)
+    assert await cache.get("d") is MISS, "Expired entry should miss"
+    print(f"✓ Size cap and TTL enforced")
+
+    calls = []
+
+    async def dispatch(params):
+        calls.append(params.arguments)
+        await params.result_callback("Error: backend down")
+
+    tool_cache = ToolResultCache(
+        LRUResultCache(),
+        ttls={"google_adk": 30},
+        is_cacheable=lambda result: not result.startswith("Error"),
+    )
+    for _ in range(2):
+        await tool_cache.run(make_params("google_adk", {"query": "q"}, []), dispatch)
+    assert len(calls) == 2, "Errors should not be cached"
+    print(f"✓ Errors not cached\n")
+
+
+async def test_replay_properties_and_scope():
+    """Test that hits keep result_callback properties and google_adk is not shared."""
+    print("Test 5: Replayed Properties and Per-Session Tools")
+
+    async def on_context_updated():
+        pass
+
+    async def dispatch(params):
+        await asyncio.sleep(0.05)
+        properties = FunctionCallResultProperties(run_llm=False, on_context_updated=on_context_updated)
+        await params.result_callback("Sunny", properties=properties)
+
+    received = []
+
+    def make_recording_params():
+        params = make_params("get_current_weather", {"location": "Paris"}, [])
+
+        async def result_callback(result, **kwargs):
+            received.append((result, kwargs.get("properties")))
+        params.result_callback = result_callback
+        return params
+
+    tool_cache = ToolResultCache(LRUResultCache(), ttls={"get_current_weather": 60})
+    await asyncio.gather(*[tool_cache.run(make_recording_params(), dispatch) for _ in range(2)])
+    await tool_cache.run(make_recording_params(), dispatch)
+
+    leader, follower, hit = [properties for _, properties in received]
+    assert leader.on_context_updated is on_context_updated, "Leader keeps its own hook"
+    for properties in (follower, hit):
+        assert properties is not None and properties.run_llm is False, "run_llm=False replayed"
+        assert properties.on_context_updated is None, "Leader's hook not run for other callers"
+    print(f"✓ run_llm=False replayed to the follower and the cache hit")
+
+    from bot_fast_api import tool_cache as bot_tool_cache
+    assert "google_adk" not in bot_tool_cache.ttls, "google_adk answers depend on the caller's session"
+    print(f"✓ google_adk results are never shared across callers\n")
+
+
+async def main():
+    """Run all tests."""
+    print("=" * 60)
+    print("RESULT CACHE TESTS")
+    print("=" * 60 + "\n")
+
+    try:
+        await test_cache_hits_and_normalization()
+        await test_single_flight()
+        await test_leader_cancelled()
+        await test_ttl_lru_and_errors()
+        await test_replay_properties_and_scope()
+
+        print("=" * 60)
+        print("✅ ALL TESTS PASSED!")
+        print("=" * 60)
+
+    except AssertionError as e:
+        print(f"\n❌ TEST FAILED: {e}")
+        return 1
+    except Exception as e:
+        print(f"\n❌ ERROR: {e}")
+        import traceback
+        traceback.print_exc()
+        return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    exit_code = asyncio.run(main())
+    exit(exit_code)
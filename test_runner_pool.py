@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Simple test to verify ADK runner/session pooling.
+"""
+import asyncio
+from google.adk.agents.llm_agent import Agent
+from runner_pool import RunnerPool
+
+
+agent = Agent(model='gemini-2.5-flash', name='pool_test_agent', instruction='test')
+
+
+async def test_session_reuse():
+    """Test that a connection reuses its session and runner across turns."""
+    print("Test 1: Session Reuse")
+    pool = RunnerPool()
+
+    first = await pool.acquire(agent, "test_app", "conn-a")
+    second = await pool.acquire(agent, "test_app", "conn-a")
+    other = await pool.acquire(agent, "test_app", "conn-b")
+
+    assert first is second, "Same connection should reuse its session"
+    assert first.session_id != other.session_id, "Connections should not share sessions"
+    assert first.runner is other.runner, "Runner should be shared per agent/app"
+    assert pool.get_session_count() == 2, "Should have 2 pooled sessions"
+    print(f"✓ Session {first.session_id[:8]} reused, runner shared")
+
+    await pool.release("conn-a")
+    await pool.release("conn-b")
+    assert pool.get_session_count() == 0, "Should have 0 pooled sessions"
+    session = await first.runner.session_service.get_session(
+        app_name="test_app", user_id=first.user_id, session_id=first.session_id
+    )
+    assert session is None, "Released session should be deleted"
+    print(f"✓ Released sessions deleted\n")
+
+
+async def test_concurrent_first_acquire():
+    """Test that concurrent first calls for a connection share one session."""
+    print("Test 2: Concurrent First Acquire")
+    pool = RunnerPool()
+
+    sessions = await asyncio.gather(*[
+        pool.acquire(agent, "test_app", "conn-a") for _ in range(5)
+    ])
+
+    assert all(s is sessions[0] for s in sessions), "Should create exactly one session"
+    assert pool.get_session_count() == 1, "Should have 1 pooled session"
+    print(f"✓ 5 concurrent acquires shared session {sessions[0].session_id[:8]}\n")
+
+
+async def test_first_acquire_cancelled():
+    """Test that cancelling the creating call does not fail concurrent waiters."""
+    print("Test 3: First Acquire Cancelled")
+    pool = RunnerPool()
+    service = pool.get_runner(agent, "test_app").session_service
+    create_session = service.create_session
+    created = []
+
+    async def slow_create_session(**kwargs):
+        await asyncio.sleep(0.05)
+        created.append(kwargs["session_id"])
+        return await create_session(**kwargs)
+    service.create_session = slow_create_session
+
+    first = asyncio.create_task(pool.acquire(agent, "test_app", "conn-a"))
+    await asyncio.sleep(0)
+    second = asyncio.create_task(pool.acquire(agent, "test_app", "conn-a"))
+    await asyncio.sleep(0.01)
+    first.cancel()
+    session = await asyncio.wait_for(second, timeout=1)
+
+    assert first.cancelled(), "Cancelled caller sees its cancellation"
+    assert pool.get_session_count() == 1 and len(created) == 1, "Waiter created the session itself"
+    assert (await pool.acquire(agent, "test_app", "conn-a")) is session
+    print(f"✓ Waiter created session {session.session_id[:8]} after the first call was cancelled\n")
+
+
+async def test_bounded_and_idle_eviction():
+    """Test LRU bound and idle eviction."""
+    print("Test 4: Bounded Size and Idle Eviction")
+    pool = RunnerPool(max_sessions=2, idle_timeout=0.1)
+
+    await pool.acquire(agent, "test_app", "conn-a")
+    busy = await pool.acquire(agent, "test_app", "conn-b")
+    await pool.acquire(agent, "test_app", "conn-c")
+    assert pool.get_session_count() == 2, "Oldest session should be evicted"
+    print(f"✓ Pool bounded at {pool.max_sessions} sessions")
+
+    async with busy.lock:
+        await asyncio.sleep(0.15)
+        await pool.acquire(agent, "test_app", "conn-d")
+        assert pool.get_session_count() == 2, "Idle session evicted, busy one kept"
+        assert busy is await pool.acquire(agent, "test_app", "conn-b"), \
+            "Session with a run in flight should not be evicted"
+    print(f"✓ Idle sessions evicted, in-flight session kept\n")
+
+
+async def main():
+    """Run all tests."""
+    print("=" * 60)
+    print("RUNNER POOL TESTS")
+    print("=" * 60 + "\n")
+
+    try:
+        await test_session_reuse()
+        await test_concurrent_first_acquire()
+        await test_first_acquire_cancelled()
+        await test_bounded_and_idle_eviction()
+
+        print("=" * 60)
+        print("✅ ALL TESTS PASSED!")
+        print("=" * 60)
+
+    except AssertionError as e:
+        print(f"\n❌ TEST FAILED: {e}")
+        return 1
+    except Exception as e:
+        print(f"\n❌ ERROR: {e}")
+        import traceback
+        traceback.print_exc()
+        return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    exit_code = asyncio.run(main())
+    exit(exit_code)
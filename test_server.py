@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Simple test to verify server startup and /connect routing.
+"""
+import multiprocessing
+from fastapi.testclient import TestClient
+from starlette.websockets import WebSocketDisconnect
+import bot_fast_api
+import server
+import shared_vad
+from admission import RETRY_AFTER, admission
+from log_config import configure_logging, get_log_settings
+
+
+def test_vad_preloaded_at_startup():
+    """Test that the VAD model is loaded before the first connection, without warm-up."""
+    print("Test 1: VAD Model Loaded at Startup")
+    shared_vad._session = None
+    loaded_at_run_bot = []
+
+    async def run_bot(websocket, debug=False):
+        loaded_at_run_bot.append(shared_vad._session is not None)
+
+    run_bot_before, bot_fast_api.run_bot = bot_fast_api.run_bot, run_bot
+    try:
+        with TestClient(server.app) as client:
+            assert shared_vad._session is not None, "Model loaded by the lifespan"
+            with client.websocket_connect("/ws"):
+                pass
+    finally:
+        bot_fast_api.run_bot = run_bot_before
+
+    assert loaded_at_run_bot == [True], f"Model should be loaded before run_bot: {loaded_at_run_bot}"
+    print(f"✓ Silero model loaded at startup with WARM_UP_ON_STARTUP off\n")
+
+
+def test_least_loaded_routing():
+    """Test /connect routing across workers, the 503 path and the supervisor's /ws."""
+    print("Test 2: Least-Loaded Routing and Over-Budget Responses")
+    server._session_counts = multiprocessing.Array("i", [3, 1, 2])
+    server._worker_overloaded = multiprocessing.Array("i", 3, lock=False)
+    max_sessions = admission.max_sessions
+    try:
+        assert server._least_loaded_worker() == 1, "Fewest sessions wins"
+        server._worker_overloaded[1] = 1
+        assert server._least_loaded_worker() == 2, "Overloaded worker skipped"
+        admission.max_sessions = 3
+        server._session_counts[2] = 3
+        assert server._least_loaded_worker() is None, "Full and overloaded workers skipped"
+        print(f"✓ Least-loaded worker picked, full and overloaded ones skipped")
+
+        with TestClient(server.app) as client:
+            response = client.post("/connect")
+            assert response.status_code == 503, f"Expected 503, got {response.status_code}"
+            assert response.headers["Retry-After"] == str(RETRY_AFTER)
+            assert response.json()["reason"] == "all_workers_busy"
+            print(f"✓ 503 with Retry-After: {RETRY_AFTER} when every worker is busy")
+
+            server._session_counts[0] = 0
+            ws_url = client.post("/connect").json()["ws_url"]
+            assert ws_url.endswith(f":{server.PORT + 1}/ws"), f"Routed to worker 0: {ws_url}"
+
+            try:
+                with client.websocket_connect("/ws") as websocket:
+                    websocket.receive_text()
+            except WebSocketDisconnect as e:
+                assert e.code == 1008, f"Supervisor should refuse sessions: {e.code}"
+            else:
+                raise AssertionError("Supervisor should not run sessions")
+            print(f"✓ Routed to {ws_url}; the supervisor refuses /ws sessions\n")
+    finally:
+        admission.max_sessions = max_sessions
+        server._session_counts = None
+        server._worker_overloaded = None
+
+
+def test_one_whisker_per_process():
+    """Test that only one session at a time holds the process's Whisker port."""
+    print("Test 3: One Whisker Observer per Process")
+    mode, bot_fast_api.WHISKER_MODE = bot_fast_api.WHISKER_MODE, "always"
+    try:
+        assert bot_fast_api.claim_whisker("a"), "First session observed"
+        assert not bot_fast_api.claim_whisker("b"), "Port already taken"
+        bot_fast_api.release_whisker("b")
+        assert not bot_fast_api.claim_whisker("c"), "Only the holder releases the port"
+        bot_fast_api.release_whisker("a")
+        assert bot_fast_api.claim_whisker("c"), "Port free again"
+        bot_fast_api.release_whisker("c")
+    finally:
+        bot_fast_api.WHISKER_MODE = mode
+    print(f"✓ Second session skipped while the first holds port {bot_fast_api.WHISKER_PORT}\n")
+
+
+def test_logging_endpoint():
+    """Test that POST /logging is restricted and rejects bad input with 400."""
+    print("Test 4: Guarded, Validated POST /logging")
+    settings = get_log_settings()
+    token = server.LOGGING_TOKEN
+    try:
+        server.LOGGING_TOKEN = ""
+        with TestClient(server.app) as client:
+            response = client.post("/logging", json={"level": "INFO"})
+            assert response.status_code == 403, f"Remote client without token: {response.status_code}"
+        with TestClient(server.app, client=("127.0.0.1", 50000)) as client:
+            response = client.post("/logging", json={"level": "INFO"})
+            assert response.status_code == 200, f"Local client: {response.status_code}"
+            assert response.json()["level"] == "INFO"
+            response = client.post("/logging", json={"level": "DEBUG"}, headers={"Origin": "https://evil.example"})
+            assert response.status_code == 403, f"Browser request from a web page: {response.status_code}"
+        print(f"✓ Without LOGGING_TOKEN only local, non-browser clients may change logging")
+
+        server.LOGGING_TOKEN = "secret"
+        with TestClient(server.app) as client:
+            response = client.post("/logging", json={"level": "INFO"}, headers={"Authorization": "Bearer wrong"})
+            assert response.status_code == 401, f"Wrong token: {response.status_code}"
+
+            auth = {"Authorization": "Bearer secret"}
+            for body in ({"level": 5}, {"level": None}, {"format": ["json"]}, {"debug_rate": "fast"},
+                         {"debug_rate": True}, {"debug_sample": 2}, {"colour": "red"}, ["INFO"], None):
+                response = client.post("/logging", json=body, headers=auth)
+                assert response.status_code == 400, f"{body!r}: {response.status_code}"
+            response = client.post("/logging", content=b"{not json", headers=auth)
+            assert response.status_code == 400, f"Malformed body: {response.status_code}"
+            response = client.post("/logging", json={"level": "warning"}, headers=auth)
+            assert response.status_code == 200 and response.json()["level"] == "WARNING"
+        print(f"✓ Token required when set; wrong types and malformed JSON get 400, not 500\n")
+    finally:
+        server.LOGGING_TOKEN = token
+        configure_logging(**{key: settings[key] for key in ("level", "format", "debug_rate")})
+
+
+def main():
+    """Run all tests."""
+    print("=" * 60)
+    print("SERVER TESTS")
+    print("=" * 60 + "\n")
+
+    try:
+        test_vad_preloaded_at_startup()
+        test_least_loaded_routing()
+        test_one_whisker_per_process()
+        test_logging_endpoint()
+
+        print("=" * 60)
+        print("✅ ALL TESTS PASSED!")
+        print("=" * 60)
+
+    except AssertionError as e:
+        print(f"\n❌ TEST FAILED: {e}")
+        return 1
+    except Exception as e:
+        print(f"\n❌ ERROR: {e}")
+        import traceback
+        traceback.print_exc()
+        return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Simple test to verify the prebuilt service pool and the shared OpenAI client.
+"""
+import asyncio
+import threading
+from bot_fast_api import SharedClientOpenAILLMService
+from service_pool import ServicePool
+
+
+class Counter:
+    """Factory numbering the items it builds."""
+    def __init__(self):
+        self.built = 0
+        self.lock = threading.Lock()
+
+    def __call__(self):
+        with self.lock:
+            self.built += 1
+            return self.built
+
+
+async def test_refill():
+    """Test that acquired items are replaced in the background."""
+    print("Test 1: Pool Refill")
+    factory = Counter()
+    pool = ServicePool(factory, size=3)
+    pool.fill()
+    assert pool.get_idle_count() == 3 and factory.built == 3
+
+    taken = [pool.acquire(), pool.acquire()]
+    assert taken == [1, 2], "Prebuilt items handed out first"
+    assert pool.get_idle_count() == 1, "Refill runs on later loop iterations"
+    for _ in range(5):
+        await asyncio.sleep(0)
+    assert pool.get_idle_count() == 3, f"Pool topped up: {pool.get_idle_count()}"
+    assert factory.built == 5, "Only the missing items are rebuilt"
+    print(f"✓ 2 taken, refilled to 3 with {factory.built - 3} new build(s)\n")
+
+
+async def test_exhaustion():
+    """Test that an empty pool builds inline rather than failing."""
+    print("Test 2: Exhausted Pool Builds Inline")
+    factory = Counter()
+    pool = ServicePool(factory, size=1)
+    pool.fill()
+    assert [pool.acquire(), pool.acquire(), pool.acquire()] == [1, 2, 3], "Inline builds"
+    assert ServicePool(factory, size=0).acquire() == 4, "Size 0 always builds inline"
+    for _ in range(5):
+        await asyncio.sleep(0)
+    assert pool.get_idle_count() == 1, "Pool refilled to its size, not beyond"
+    print(f"✓ Callers served while empty, pool back at size 1\n")
+
+
+async def test_fill_races_refill():
+    """Test that a warm-up fill on a thread and loop refills never overfill."""
+    print("Test 3: Thread Fill Racing Loop Refill")
+    factory = Counter()
+    pool = ServicePool(factory, size=8)
+    pool.acquire()  # Schedules a refill on the loop
+    fill = asyncio.create_task(asyncio.to_thread(pool.fill))
+    while not fill.done():
+        pool.acquire()
+        await asyncio.sleep(0)
+    await fill
+    for _ in range(20):
+        await asyncio.sleep(0)
+    assert pool.get_idle_count() == 8, f"Pool overfilled or short: {pool.get_idle_count()}"
+    print(f"✓ Pool at exactly 8 after {factory.built} builds from both sides\n")
+
+
+async def test_client_per_api_key():
+    """Test that LLM services share one client per API key, also across threads."""
+    print("Test 4: One OpenAI Client per API Key")
+    SharedClientOpenAILLMService._clients.clear()
+    services = []
+
+    def build(api_key):
+        services.append((api_key, SharedClientOpenAILLMService(api_key=api_key, model="gpt-4o-mini")))
+
+    threads = [threading.Thread(target=build, args=(key,)) for key in ["key-a", "key-b"] * 4]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    build("key-a")
+
+    clients = {key: {id(service._client) for k, service in services if k == key} for key in ("key-a", "key-b")}
+    assert len(clients["key-a"]) == 1 and len(clients["key-b"]) == 1, "One client per key"
+    assert clients["key-a"] != clients["key-b"], "Keys do not share clients"
+    assert len(SharedClientOpenAILLMService._clients) == 2
+    print(f"✓ {len(services)} services built on 8 threads share 2 clients\n")
+
+
+async def main():
+    """Run all tests."""
+    print("=" * 60)
+    print("SERVICE POOL TESTS")
+    print("=" * 60 + "\n")
+
+    try:
+        await test_refill()
+        await test_exhaustion()
+        await test_fill_races_refill()
+        await test_client_per_api_key()
+
+        print("=" * 60)
+        print("✅ ALL TESTS PASSED!")
+        print("=" * 60)
+
+    except AssertionError as e:
+        print(f"\n❌ TEST FAILED: {e}")
+        return 1
+    except Exception as e:
+        print(f"\n❌ ERROR: {e}")
+        import traceback
+        traceback.print_exc()
+        return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    exit_code = asyncio.run(main())
+    exit(exit_code)
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Simple test to verify speculative LLM turns on interim transcripts.
+"""
+import asyncio
+import json
+from openai.types.chat.chat_completion_chunk import (
+    ChoiceDelta,
+    ChoiceDeltaToolCall,
+    ChoiceDeltaToolCallFunction,
+)
+from pipecat.processors.aggregators.openai_llm_context import OpenAILLMContext
+import fake_services
+import speculation
+from fake_services import FakeOpenAIClient, FakeOpenAILLMService, _chunk
+from speculation import SPECULATIONS, Speculator
+
+SYSTEM_PROMPT = {"role": "system", "content": "You are a helpful voice bot."}
+
+
+class CountingClient(FakeOpenAIClient):
+    """FakeOpenAIClient recording the last user message of each request."""
+
+    def __init__(self):
+        super().__init__(words_per_second=1000)
+        self.requests = []
+
+    async def create(self, messages, tools=None, **kwargs):
+        self.requests.append(messages[-1]["content"])
+        return await super().create(messages, tools, **kwargs)
+
+
+def make_session():
+    """An LLM service with a counting client, and a session context."""
+    llm = FakeOpenAILLMService(model="fake")
+    llm._client = CountingClient()
+    return llm, OpenAILLMContext([dict(SYSTEM_PROMPT)])
+
+
+async def real_turn(llm, context, text: str) -> str:
+    """Make the request the user aggregator would make, and read the reply."""
+    params = {"messages": context.messages + [{"role": "user", "content": text}]}
+    stream = await llm.get_chat_completions(params)
+    return "".join([chunk.choices[0].delta.content or "" async for chunk in stream])
+
+
+async def test_commit():
+    """Test that a matching final transcript reuses the speculative request."""
+    print("Test 1: Matching Final Transcript Commits")
+    llm, context = make_session()
+    speculator = Speculator(llm, context, stable_secs=0.01)
+    before = SPECULATIONS.get(outcome="committed")
+
+    speculator.on_interim("what is the weather")
+    await asyncio.sleep(0.1)  # Stable: the request starts
+    speculator.on_final("What is the weather?")
+    reply = await real_turn(llm, context, "What is the weather?")
+
+    assert reply.startswith("Hello"), f"Unexpected reply: {reply}"
+    assert llm._client.requests == ["what is the weather"], "One request, made early"
+    assert SPECULATIONS.get(outcome="committed") == before + 1
+    print(f"✓ Reply served from the speculative request: {reply.strip()!r}\n")
+
+
+async def test_mismatch():
+    """Test that a different final transcript cancels the speculation."""
+    print("Test 2: Different Final Transcript Cancels")
+    llm, context = make_session()
+    speculator = Speculator(llm, context, stable_secs=0.01)
+    before = SPECULATIONS.get(outcome="mismatched")
+
+    speculator.on_interim("weather in paris")
+    await asyncio.sleep(0.01 + 0.05)
+    speculation = speculator._current
+    assert speculation is not None, "Speculation should have started"
+    await real_turn(llm, context, "Weather in London")
+    await asyncio.sleep(0)
+
+    assert speculation.task.done(), "Speculative request cancelled"
+    assert llm._client.requests[-1] == "Weather in London", "Real request made"
+    assert SPECULATIONS.get(outcome="mismatched") == before + 1
+    assert speculator._current is None and speculator.text == "", "Turn state reset"
+    print(f"✓ Speculative request cancelled and the real one made\n")
+
+
+async def test_limits():
+    """Test the per-turn and per-process limits, and superseded guesses."""
+    print("Test 3: Limits and Superseded Guesses")
+    llm, context = make_session()
+    speculator = Speculator(llm, context, stable_secs=0.01, max_per_turn=2)
+
+    first = speculator.speculate("weather in")
+    speculator.on_interim("weather in paris")
+    await asyncio.sleep(0.01)
+    assert first.task.done(), "Superseded speculation cancelled"
+    assert speculator.speculate("weather in paris please") is not None
+    assert speculator.speculate("weather in paris please now") is None, "Per-turn limit"
+    print(f"✓ Superseded guess cancelled, third attempt in a turn skipped")
+
+    limit = speculation.SPECULATION_PROCESS_MAX
+    speculation.SPECULATION_PROCESS_MAX = speculation._in_flight
+    try:
+        other, other_context = make_session()
+        assert Speculator(other, other_context).speculate("hello") is None, "Per-process limit"
+    finally:
+        speculation.SPECULATION_PROCESS_MAX = limit
+    speculator.close()
+    await asyncio.sleep(0.01)
+    assert speculation._in_flight == 0, "All speculative requests accounted for"
+    print(f"✓ Process-wide limit applies across sessions\n")
+
+
+async def test_prefetch_read_only_tools():
+    """Test that only read-only tool calls are prefetched."""
+    print("Test 4: Read-Only Tool Prefetch")
+
+    class ToolCallingLLM:
+        speculator = None
+
+        async def get_speculative_completions(self, params):
+            async def stream():
+                for index, (name, arguments) in enumerate(
+                    [("get_current_weather", {"location": "Paris"}), ("google_adk", {"query": "x"})]
+                ):
+                    call = ChoiceDeltaToolCall(
+                        index=index,
+                        id=f"call_{index}",
+                        function=ChoiceDeltaToolCallFunction(name=name, arguments=json.dumps(arguments)),
+                    )
+                    yield _chunk(ChoiceDelta(tool_calls=[call]))
+            return stream()
+
+    prefetched = []
+
+    async def prefetch_tool(name, arguments):
+        prefetched.append((name, arguments))
+
+    speculator = Speculator(
+        ToolCallingLLM(),
+        OpenAILLMContext([dict(SYSTEM_PROMPT)]),
+        prefetch_tool=prefetch_tool,
+        read_only_tools=("get_current_weather",),
+    )
+    spec = speculator.speculate("weather in paris")
+    await spec.task
+    await asyncio.gather(*spec.tool_tasks)
+    assert prefetched == [("get_current_weather", {"location": "Paris"})], f"Got {prefetched}"
+    print(f"✓ Prefetched {prefetched[0][0]}, skipped google_adk\n")
+
+
+async def main():
+    """Run all tests."""
+    print("=" * 60)
+    print("SPECULATION TESTS")
+    print("=" * 60 + "\n")
+
+    fake_services.LLM_LATENCY = 0.02
+    try:
+        await test_commit()
+        await test_mismatch()
+        await test_limits()
+        await test_prefetch_read_only_tools()
+
+        print("=" * 60)
+        print("✅ ALL TESTS PASSED!")
+        print("=" * 60)
+
+    except AssertionError as e:
+        print(f"\n❌ TEST FAILED: {e}")
+        return 1
+    except Exception as e:
+        print(f"\n❌ ERROR: {e}")
+        import traceback
+        traceback.print_exc()
+        return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    exit_code = asyncio.run(main())
+    exit(exit_code)
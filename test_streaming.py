@@ -3,11 +3,37 @@
 Simple test to verify simplified streaming bridge functionality.
 """
 import asyncio
+import gc
+import json
+import multiprocessing
+import os
+import pickle
+import stat
+import struct
+import tempfile
 from streaming_bridge import (
     register_task,
     get_task,
     unregister_task,
-    get_active_task_count
+    unregister_owner,
+    reap_expired,
+    get_active_task_count,
+    SpeechQueue,
+    get_speech_queue,
+    clear_speech_queue,
+    RemoteTask,
+    UnixSocketBackend,
+    set_registry_backend,
+)
+from pipecat.frames.frames import TTSSpeakFrame, TTSStartedFrame
+from pipecat.observers.base_observer import FramePushed
+from metrics import (
+    SPEECH_FORWARD_DELAY,
+    SPEECH_TTS_START,
+    OBSERVER_FRAMES,
+    SpeechLatencyObserver,
+    TimedObserver,
+    render_metrics,
 )
 
 
@@ -136,6 +162,330 @@ async def test_concurrent_task_usage():
     print(f"✓ Cleaned up both tasks\n")
 
 
+async def test_ttl_expiry():
+    """Test that expired entries are hidden and reaped."""
+    print("Test 4: TTL Expiry and Reaping")
+
+    task = MockTask("short_lived")
+    short_id = register_task(task, ttl=0.05)
+    long_id = register_task(task)
+
+    assert get_task(short_id) is task, "Task should be found before deadline"
+    await asyncio.sleep(0.1)
+    assert reap_expired() == 1, "Should reap exactly the expired entry"
+    assert get_task(short_id) is None, "Expired task should not be returned"
+    assert get_task(long_id) is task, "Unexpired task should remain"
+    print(f"✓ Expired entry reaped, live entry kept")
+
+    unregister_task(long_id)
+    assert get_active_task_count() == 0, "Should have 0 active tasks"
+    print(f"✓ Cleaned up\n")
+
+
+async def test_owner_cleanup():
+    """Test that all entries of a connection are dropped together."""
+    print("Test 5: Owner Cleanup")
+
+    task_a = MockTask("Conn A")
+    task_b = MockTask("Conn B")
+    register_task(task_a, owner="conn-a")
+    register_task(task_a, owner="conn-a")
+    id_b = register_task(task_b, owner="conn-b")
+
+    assert unregister_owner("conn-a") == 2, "Should drop both conn-a entries"
+    assert get_active_task_count() == 1, "Only conn-b entry should remain"
+    assert get_task(id_b) is task_b, "Other owners should be untouched"
+    print(f"✓ Disconnect dropped only the owner's entries")
+
+    unregister_owner("conn-b")
+    assert get_active_task_count() == 0, "Should have 0 active tasks"
+    print(f"✓ Cleaned up\n")
+
+
+async def test_weak_reference():
+    """Test that the registry does not keep a dead pipeline alive."""
+    print("Test 6: Weak References")
+
+    task = MockTask("dropped")
+    task_id = register_task(task)
+    assert get_active_task_count() == 1, "Should have 1 active task"
+
+    del task
+    gc.collect()
+    assert get_task(task_id) is None, "Collected task should not be returned"
+    assert get_active_task_count() == 0, "Entry should be dropped with its task"
+    print(f"✓ Entry dropped when task was garbage collected\n")
+
+
+async def test_speech_queue_policies():
+    """Test bounded speech queue overflow policies."""
+    print("Test 7: Speech Queue Policies")
+
+    def speak(*texts):
+        return [TTSSpeakFrame(text=t) for t in texts]
+
+    # Drop: oldest pending partials make room for the newest
+    task = MockTask("drop")
+    speech = SpeechQueue(task, high_water_mark=2, policy="drop", max_in_flight=1, batch_window=0)
+    await speech.queue_frames(speak("Digit 1 is 1"))
+    await asyncio.sleep(0)  # First frame goes straight to the pipeline
+    await speech.queue_frames(speak("Digit 2 is 2", "Digit 3 is 3", "Digit 4 is 4"))
+    assert speech.depth == 2, "Queue should stay at its high-water mark"
+    speech.mark_spoken()
+    await asyncio.sleep(0.01)
+    speech.mark_spoken()
+    await asyncio.sleep(0.01)
+    texts = [f.text for f in task.frames_queued]
+    assert texts == ["Digit 1 is 1", "Digit 3 is 3", "Digit 4 is 4"], f"Stale partial should be dropped: {texts}"
+    print(f"✓ drop: {texts}")
+
+    # Coalesce: overflow text is merged into the newest pending frame
+    task = MockTask("coalesce")
+    speech = SpeechQueue(task, high_water_mark=1, policy="coalesce", max_in_flight=1, batch_window=0)
+    await speech.queue_frames(speak("Digit 1 is 1"))
+    await asyncio.sleep(0)
+    await speech.queue_frames(speak("Digit 2 is 2", "Digit 3 is 3"))
+    assert speech.depth == 1, "Overflow should be merged, not queued"
+    speech.mark_spoken()
+    await asyncio.sleep(0.01)
+    texts = [f.text for f in task.frames_queued]
+    assert texts == ["Digit 1 is 1", "Digit 2 is 2. Digit 3 is 3"], f"Should coalesce: {texts}"
+    print(f"✓ coalesce: {texts}")
+
+    # Block: the producer waits until the pipeline catches up
+    task = MockTask("block")
+    speech = SpeechQueue(task, high_water_mark=1, policy="block", max_in_flight=1, batch_window=0)
+    await speech.queue_frames(speak("Digit 1 is 1"))
+    await asyncio.sleep(0)
+    producer = asyncio.create_task(speech.queue_frames(speak("Digit 2 is 2", "Digit 3 is 3")))
+    await asyncio.sleep(0.01)
+    assert not producer.done(), "Producer should block at the high-water mark"
+    speech.mark_spoken()
+    await asyncio.wait_for(producer, timeout=1)
+    assert speech.depth == 1, "Last frame should wait for the previous one to be spoken"
+    print(f"✓ block: producer resumed once speech drained\n")
+
+
+async def test_speech_queue_registry():
+    """Test that a task's speech queue is shared and found through the registry."""
+    print("Test 8: Speech Queue Registry")
+
+    task = MockTask("registry")
+    id_a = register_task(task)
+    id_b = register_task(task)
+
+    assert get_speech_queue(id_a) is get_speech_queue(id_b), "One queue per pipeline task"
+    assert get_speech_queue("missing-task-id") is None, "Unknown task has no queue"
+    print(f"✓ Tool invocations on one pipeline share its speech queue")
+
+    unregister_task(id_a)
+    unregister_task(id_b)
+    print(f"✓ Cleaned up\n")
+
+
+async def test_speech_batching():
+    """Test that fragments arriving close together become one utterance."""
+    print("Test 9: Speech Batching")
+
+    task = MockTask("batch")
+    speech = SpeechQueue(task, high_water_mark=10, batch_window=0.05, batch_max_delay=1.0)
+    for i in range(3):
+        await speech.queue_frames([TTSSpeakFrame(text=f"Digit {i+1} is {i+1}")])
+        await asyncio.sleep(0.01)
+    await asyncio.sleep(0.1)
+    texts = [f.text for f in task.frames_queued]
+    assert texts == ["Digit 1 is 1. Digit 2 is 2. Digit 3 is 3"], f"Should batch: {texts}"
+    print(f"✓ Fragments within the window merged: {texts}")
+
+    # A steady trickle is still flushed after batch_max_delay
+    task = MockTask("max_delay")
+    speech = SpeechQueue(task, high_water_mark=10, max_in_flight=10, batch_window=0.05, batch_max_delay=0.1)
+    for i in range(8):
+        await speech.queue_frames([TTSSpeakFrame(text=f"Part {i+1}.")])
+        await asyncio.sleep(0.03)
+    assert len(task.frames_queued) >= 1, "Max delay should flush before the trickle ends"
+    await asyncio.sleep(0.1)
+    spoken = " ".join(f.text for f in task.frames_queued)
+    assert spoken == " ".join(f"Part {i+1}." for i in range(8)), f"Nothing lost: {spoken}"
+    print(f"✓ Max delay flushed {len(task.frames_queued)} utterance(s) for 8 fragments\n")
+
+
+async def test_clear_speech_queue():
+    """Test that a cancelled tool's queued speech is dropped."""
+    print("Test 10: Clear Speech Queue")
+
+    task = MockTask("cancelled")
+    task_id = register_task(task)
+    speech = get_speech_queue(task_id)
+    speech.max_in_flight = 1
+    speech.batch_window = 0
+
+    await speech.queue_frames([TTSSpeakFrame(text=f"Digit {i+1}") for i in range(3)])
+    await asyncio.sleep(0)
+    assert clear_speech_queue(task_id) == 2, "Two frames were still waiting"
+    speech.mark_spoken()
+    await asyncio.sleep(0.01)
+    assert len(task.frames_queued) == 1, "Dropped frames must not reach the pipeline"
+    print(f"✓ Queued frames dropped, only the in-flight frame was spoken")
+
+    unregister_task(task_id)
+    print(f"✓ Cleaned up\n")
+
+
+async def test_latency_metrics():
+    """Test that bridge spans and registry counters are recorded and rendered."""
+    print("Test 11: Latency Metrics")
+
+    forwarded = SPEECH_FORWARD_DELAY.get_count(source="speech_queue")
+    task = MockTask("metrics")
+    speech = SpeechQueue(task, high_water_mark=10, batch_window=0.05)
+    await speech.queue_frames([TTSSpeakFrame(text="Digit 1 is 1"), TTSSpeakFrame(text="Digit 2 is 2")])
+    await asyncio.sleep(0.1)
+    assert SPEECH_FORWARD_DELAY.get_count(source="speech_queue") == forwarded + 1, "Batch timed once"
+    print(f"✓ Forward delay recorded for the merged utterance")
+
+    started = SPEECH_TTS_START.get_count()
+    observer = SpeechLatencyObserver()
+    frame = task.frames_queued[0]
+    tts_started = TTSStartedFrame()
+    for pushed in (frame, frame, tts_started, tts_started):  # Each frame crosses two hops
+        await observer.on_push_frame(
+            FramePushed(source=None, destination=None, frame=pushed, direction=None, timestamp=0)
+        )
+    assert SPEECH_TTS_START.get_count() == started + 1, "TTS start timed once per utterance"
+    print(f"✓ TTS start recorded once across hops")
+
+    register_task(task, ttl=0)
+    reap_expired()
+    text = render_metrics()
+    assert "task_registry_reaped_total" in text and "task_registry_size 0" in text
+    assert 'speech_forward_delay_seconds_bucket{source="speech_queue",le="+Inf"}' in text
+    print(f"✓ Rendered in the Prometheus text format\n")
+
+
+async def test_timed_observer():
+    """Test that an observer's frame callbacks are timed and forwarded."""
+    print("Test 12: Timed Observer")
+
+    class SlowObserver(SpeechLatencyObserver):
+        def __init__(self):
+            super().__init__()
+            self.frames = []
+
+        async def on_push_frame(self, data):
+            self.frames.append(data.frame)
+            await asyncio.sleep(0.01)
+
+    inner = SlowObserver()
+    observer = TimedObserver(inner)
+    before = OBSERVER_FRAMES.get(observer="SlowObserver")
+    for i in range(3):
+        data = FramePushed(source=None, destination=None, frame=TTSSpeakFrame(text=str(i)), direction=None, timestamp=0)
+        await observer.on_push_frame(data)
+
+    assert len(inner.frames) == 3, "Frames should reach the wrapped observer"
+    assert OBSERVER_FRAMES.get(observer="SlowObserver") == before + 3
+    assert 'observer_seconds_total{observer="SlowObserver"}' in render_metrics()
+    print(f"✓ 3 callbacks forwarded and timed per observer class\n")
+
+
+def _run_remote_tool(task_id: str, missing_id: str):
+    """Speak from another process, the way an out-of-process tool would."""
+    async def speak():
+        set_registry_backend(UnixSocketBackend(tempfile.mkdtemp()))
+        task = get_task(task_id)
+        assert isinstance(task, RemoteTask), "Task should be reached remotely"
+        await task.queue_frames([TTSSpeakFrame(text="direct")])
+        await get_speech_queue(task_id).queue_frames([TTSSpeakFrame(text="paced")])
+        try:
+            await get_task(missing_id).queue_frames([TTSSpeakFrame(text="lost")])
+        except LookupError:
+            return
+        raise AssertionError("Unknown task should raise LookupError")
+
+    asyncio.run(speak())
+
+
+async def test_cross_process_registry():
+    """Test that a tool in another process reaches its pipeline over IPC."""
+    print("Test 13: Cross-Process Registry")
+    backend = UnixSocketBackend(tempfile.mkdtemp())
+    previous = set_registry_backend(backend)
+    try:
+        await backend.start()
+        mock_task = MockTask("pipeline")
+        task_id = register_task(mock_task)
+        assert task_id.endswith("@" + backend.path), "ID should name the owner's socket"
+        assert get_task(task_id) is mock_task, "Owner resolves its own tasks locally"
+        missing_id = task_id.replace(task_id[:8], "00000000")
+        get_speech_queue(task_id).batch_window = 0
+
+        context = multiprocessing.get_context("spawn")
+        process = context.Process(target=_run_remote_tool, args=(task_id, missing_id))
+        process.start()
+        await asyncio.to_thread(process.join, 30)
+        assert process.exitcode == 0, f"Remote tool failed (exit code {process.exitcode})"
+        await asyncio.sleep(0.05)
+
+        texts = [frame.text for frame in mock_task.frames_queued]
+        assert texts == ["direct", "paced"], f"Frames should reach the owner: {texts}"
+        print(f"✓ Frames forwarded from another process: {texts}")
+        print(f"✓ Unknown task raised LookupError in the tool process\n")
+        unregister_task(task_id)
+    finally:
+        await backend.close()
+        set_registry_backend(previous)
+
+
+async def test_registry_socket_hardening():
+    """Test that the IPC socket refuses shared dirs, foreign paths and pickles."""
+    print("Test 14: Registry Socket Hardening")
+    shared = tempfile.mkdtemp()
+    os.chmod(shared, 0o777)
+    try:
+        await UnixSocketBackend(shared).start()
+    except PermissionError:
+        print("✓ World-writable socket dir rejected")
+    else:
+        raise AssertionError("Shared socket dir should be rejected")
+
+    private = tempfile.mkdtemp()
+    squatted = os.path.join(private, f"pipecat-tasks-{os.getpid()}.sock")
+    open(squatted, "w").close()
+    try:
+        await UnixSocketBackend(private).start()
+    except FileExistsError:
+        print("✓ Pre-existing non-socket path rejected, left in place")
+    else:
+        raise AssertionError("Squatted socket path should be rejected")
+    os.unlink(squatted)
+
+    owner = UnixSocketBackend(private)
+    await owner.start()
+    try:
+        try:
+            await UnixSocketBackend(private).start()
+        except FileExistsError:
+            print("✓ Socket another process listens on is not replaced")
+        else:
+            raise AssertionError("Live socket should not be replaced")
+        assert stat.S_IMODE(os.stat(owner.path).st_mode) & 0o077 == 0, "Socket closed to others"
+
+        class Boom:
+            def __reduce__(self):
+                return (os.system, ("touch " + os.path.join(private, "pwned"),))
+        payload = pickle.dumps({"op": "queue_frames", "task_id": "x", "frames": [Boom()]})
+        reader, writer = await asyncio.open_unix_connection(owner.path)
+        writer.write(struct.pack("!I", len(payload)) + payload)
+        await writer.drain()
+        response = json.loads((await reader.read())[4:])
+        writer.close()
+        assert not response["ok"] and not os.path.exists(os.path.join(private, "pwned"))
+        print(f"✓ Pickled message refused: {response['error'][:40]}...\n")
+    finally:
+        await owner.close()
+
+
 async def main():
     """Run all tests."""
     print("=" * 60)
@@ -146,6 +496,17 @@ async def main():
         await test_basic_task_operations()
         await test_task_isolation()
         await test_concurrent_task_usage()
+        await test_ttl_expiry()
+        await test_owner_cleanup()
+        await test_weak_reference()
+        await test_speech_queue_policies()
+        await test_speech_queue_registry()
+        await test_speech_batching()
+        await test_clear_speech_queue()
+        await test_latency_metrics()
+        await test_timed_observer()
+        await test_cross_process_registry()
+        await test_registry_socket_hardening()
 
         print("=" * 60)
         print("✅ ALL TESTS PASSED!")
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Simple test to verify offloading tool work to a worker pool.
+"""
+import asyncio
+import tempfile
+import time
+from types import SimpleNamespace
+from streaming_bridge import (
+    UnixSocketBackend,
+    get_speech_queue,
+    register_task,
+    set_registry_backend,
+    unregister_task,
+)
+from tool_offload import REJECTED, ToolPool, offload_tool
+
+
+class MockTask:
+    """Mock PipelineTask for testing."""
+    def __init__(self):
+        self.texts = []
+
+    async def queue_frames(self, frames):
+        self.texts.extend(frame.text for frame in frames)
+
+
+def count_up(n: int, emit) -> str:
+    """Busy work that reports progress as it goes."""
+    for i in range(n):
+        time.sleep(0.05)  # Stands in for CPU-bound work
+        emit(f"Step {i + 1}")
+    return f"Counted to {n}"
+
+
+def register_mock_task():
+    """Register a mock pipeline whose speech queue forwards without pacing."""
+    task = MockTask()
+    task_id = register_task(task)
+    speech = get_speech_queue(task_id)
+    speech.batch_window = 0
+    speech.max_in_flight = 100  # The mock never stops speaking
+    return task, task_id
+
+
+def tool_context(task_id: str):
+    return SimpleNamespace(state={"task_id": task_id})
+
+
+async def test_thread_pool_streams():
+    """Test that a tool runs off the loop and still speaks interim results."""
+    print("Test 1: Thread Pool Streaming")
+    pool = ToolPool(kind="thread", size=2, queue_depth=2)
+    tool = offload_tool(count_up, pool=pool)
+    task, task_id = register_mock_task()
+
+    ticks = 0
+
+    async def ticker():
+        nonlocal ticks
+        while True:
+            await asyncio.sleep(0.01)
+            ticks += 1
+
+    ticking = asyncio.create_task(ticker())
+    result = await tool(n=3, tool_context=tool_context(task_id))
+    ticking.cancel()
+    await asyncio.sleep(0.05)  # Last fragment drains
+
+    assert result == "Counted to 3", f"Unexpected result: {result}"
+    assert task.texts == ["Step 1", "Step 2", "Step 3"], f"Interim results: {task.texts}"
+    assert ticks >= 10, f"Event loop should keep running during the job: {ticks} ticks"
+    print(f"✓ {len(task.texts)} interim results spoken, loop ticked {ticks} times meanwhile")
+
+    unregister_task(task_id)
+    try:
+        await pool.run(count_up, task_id, (1,))
+        assert False, "emit() should fail once the task is gone"
+    except LookupError:
+        pass
+    pool.shutdown()
+    print(f"✓ Job ended by emit() after the task was unregistered\n")
+
+
+async def test_queue_depth():
+    """Test that calls past the pool size and queue depth are turned away."""
+    print("Test 2: Queue Depth")
+    pool = ToolPool(kind="thread", size=1, queue_depth=1)
+    tool = offload_tool(count_up, pool=pool)
+    task, task_id = register_mock_task()
+    before = REJECTED.get()
+
+    results = await asyncio.gather(*(tool(n=2, tool_context=tool_context(task_id)) for _ in range(3)))
+    assert results.count("Counted to 2") == 2, f"Two calls fit: {results}"
+    assert results[2].startswith("Error:"), "Third call should be turned away"
+    assert REJECTED.get() == before + 1 and pool.active == 0
+    print(f"✓ 1 running + 1 queued admitted, 1 turned away\n")
+    unregister_task(task_id)
+    pool.shutdown()
+
+
+async def test_process_pool():
+    """Test that a process worker speaks back through the IPC registry."""
+    print("Test 3: Process Pool Over IPC")
+    backend = UnixSocketBackend(tempfile.mkdtemp())
+    previous = set_registry_backend(backend)
+    pool = ToolPool(kind="process", size=1, queue_depth=0)
+    try:
+        await backend.start()
+        task, task_id = register_mock_task()
+        result = await asyncio.wait_for(pool.run(count_up, task_id, (2,)), timeout=60)
+        await asyncio.sleep(0.05)
+        assert result == "Counted to 2", f"Unexpected result: {result}"
+        assert task.texts == ["Step 1", "Step 2"], f"Interim results: {task.texts}"
+        print(f"✓ Worker process spoke {task.texts} through task {task_id[:8]}...\n")
+        unregister_task(task_id)
+    finally:
+        pool.shutdown()
+        await backend.close()
+        set_registry_backend(previous)
+
+
+def documented_tool(text: str, emit) -> str:
+    """
+    Echoes text.
+
+    Args:
+        text: Text to echo
+        emit: Speaks interim text,
+            supplied by offload_tool
+
+    Returns:
+        str: The text
+    """
+    return text
+
+
+async def test_demo_tools():
+    """Test that the demo's async tool stays on the loop and emit is hidden from ADK."""
+    print("Test 4: Demo Tools and ADK Declarations")
+    from google.adk.tools import FunctionTool
+    from demo.agent import fingerprint_tool, streaming_tool
+
+    assert not hasattr(streaming_tool, "__wrapped__"), "Sleeping tool should not hold a pool thread"
+    declaration = FunctionTool(offload_tool(documented_tool))._get_declaration()
+    assert "emit" not in declaration.description, f"Description: {declaration.description}"
+    assert "text: Text to echo" in declaration.description and "Returns:" in declaration.description
+    assert list(declaration.parameters.properties) == ["text"], "Only the model's parameters"
+    print(f"✓ streaming_tool is a plain async tool; emit left out of offloaded tool declarations")
+
+    task, task_id = register_mock_task()
+    result = await fingerprint_tool(code="1234", tool_context=tool_context(task_id))
+    await asyncio.sleep(0.05)
+    assert result.startswith("Fingerprint: ") and len(result) == len("Fingerprint: ") + 8, result
+    assert task.texts == ["Computing the fingerprint"], f"Interim results: {task.texts}"
+    unregister_task(task_id)
+    print(f"✓ CPU-bound fingerprint_tool ran on the pool: {result}\n")
+
+
+async def main():
+    """Run all tests."""
+    print("=" * 60)
+    print("TOOL OFFLOAD TESTS")
+    print("=" * 60 + "\n")
+
+    try:
+        await test_thread_pool_streams()
+        await test_queue_depth()
+        await test_process_pool()
+        await test_demo_tools()
+
+        print("=" * 60)
+        print("✅ ALL TESTS PASSED!")
+        print("=" * 60)
+
+    except AssertionError as e:
+        print(f"\n❌ TEST FAILED: {e}")
+        return 1
+    except Exception as e:
+        print(f"\n❌ ERROR: {e}")
+        import traceback
+        traceback.print_exc()
+        return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    exit_code = asyncio.run(main())
+    exit(exit_code)
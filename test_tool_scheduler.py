@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Simple test to verify concurrent scheduling of one turn's tool calls.
+"""
+import asyncio
+import time
+from pipecat.services.llm_service import FunctionCallParams
+from tool_scheduler import ToolScheduler
+
+
+def make_params(tool_call_id, delivered):
+    """Build FunctionCallParams whose result_callback records into `delivered`."""
+    async def result_callback(result, **kwargs):
+        delivered.append((tool_call_id, result, kwargs))
+
+    return FunctionCallParams(
+        function_name="tool",
+        tool_call_id=tool_call_id,
+        arguments={},
+        llm=None,
+        context=None,
+        result_callback=result_callback,
+    )
+
+
+def make_handler(delays, running, peak):
+    """Handler sleeping per call ID and tracking how many run at once."""
+    async def handler(params):
+        running.append(params.tool_call_id)
+        peak.append(len(running))
+        try:
+            await asyncio.sleep(delays[params.tool_call_id])
+            await params.result_callback(f"result {params.tool_call_id}", properties="props")
+        finally:
+            running.remove(params.tool_call_id)
+    return handler
+
+
+async def test_ordered_delivery():
+    """Test that a turn's calls run concurrently and report in request order."""
+    print("Test 1: Concurrent Calls, Ordered Delivery")
+    scheduler = ToolScheduler(max_concurrency=4)
+    delays = {"a": 0.15, "b": 0.05, "c": 0.1}
+    delivered, running, peak = [], [], []
+    handler = make_handler(delays, running, peak)
+
+    scheduler.start_turn(["a", "b", "c"])
+    start = time.perf_counter()
+    await asyncio.gather(*(scheduler.run(make_params(i, delivered), handler) for i in "abc"))
+    elapsed = time.perf_counter() - start
+
+    assert [i for i, _, _ in delivered] == ["a", "b", "c"], f"Out of order: {delivered}"
+    assert delivered[0][2] == {"properties": "props"}, "result_callback kwargs kept"
+    assert max(peak) == 3 and elapsed < 0.25, f"Calls should overlap ({elapsed:.2f}s)"
+    assert scheduler.pending_turns == 0
+    print(f"✓ 3 calls in {elapsed:.2f}s, delivered as a, b, c\n")
+
+
+async def test_concurrency_caps():
+    """Test the per-session and the shared process-wide caps."""
+    print("Test 2: Concurrency Caps")
+    delivered, running, peak = [], [], []
+    ids = [str(i) for i in range(6)]
+    handler = make_handler({i: 0.05 for i in ids}, running, peak)
+
+    scheduler = ToolScheduler(max_concurrency=2)
+    scheduler.start_turn(ids)
+    await asyncio.gather(*(scheduler.run(make_params(i, delivered), handler) for i in ids))
+    assert max(peak) == 2, f"Session cap exceeded: {max(peak)}"
+    assert [i for i, _, _ in delivered] == ids
+    print(f"✓ Session cap: at most {max(peak)} of 6 calls at once")
+
+    peak.clear()
+    process_slots = asyncio.Semaphore(3)
+    sessions = [ToolScheduler(max_concurrency=4, process_slots=process_slots) for _ in range(2)]
+    await asyncio.gather(*(
+        session.run(make_params(f"{n}-{i}", delivered), make_handler({f"{n}-{i}": 0.05}, running, peak))
+        for n, session in enumerate(sessions) for i in range(4)
+    ))
+    assert max(peak) == 3, f"Process cap exceeded: {max(peak)}"
+    assert ToolScheduler()._process_slots is ToolScheduler()._process_slots, "One cap per loop"
+    print(f"✓ Process cap: at most {max(peak)} of 8 calls across 2 sessions\n")
+
+
+async def test_missing_sibling():
+    """Test that a call that never arrives does not hang or leak its turn."""
+    print("Test 3: Missing Sibling")
+    scheduler = ToolScheduler(arrival_timeout=0.1)
+    delivered, running, peak = [], [], []
+    handler = make_handler({"a": 0.01, "c": 0.02}, running, peak)
+
+    scheduler.start_turn(["a", "b", "c"])  # "b" is dropped before reaching us
+    await asyncio.wait_for(
+        asyncio.gather(*(scheduler.run(make_params(i, delivered), handler) for i in "ac")),
+        timeout=2,
+    )
+    assert [i for i, _, _ in delivered] == ["a", "c"], f"Unexpected delivery: {delivered}"
+    assert scheduler.pending_turns == 0, "Missing call's entry released"
+    print(f"✓ Siblings delivered without the missing call, no entries left")
+
+    scheduler.start_turn(["x", "y"])  # Neither call ever arrives
+    await asyncio.sleep(0.2)
+    assert scheduler.pending_turns == 0, "Turn with no arrivals released"
+
+    scheduler.start_turn(["p", "q"])
+    task = asyncio.create_task(scheduler.run(make_params("p", delivered), make_handler({"p": 10}, running, peak)))
+    await asyncio.sleep(0.01)
+    task.cancel()  # Interrupted mid-call
+    await asyncio.sleep(0.2)
+    assert task.cancelled() and scheduler.pending_turns == 0, "Cancelled turn released"
+    print(f"✓ Turns with no arrivals or a cancelled call released\n")
+
+
+async def main():
+    """Run all tests."""
+    print("=" * 60)
+    print("TOOL SCHEDULER TESTS")
+    print("=" * 60 + "\n")
+
+    try:
+        await test_ordered_delivery()
+        await test_concurrency_caps()
+        await test_missing_sibling()
+
+        print("=" * 60)
+        print("✅ ALL TESTS PASSED!")
+        print("=" * 60)
+
+    except AssertionError as e:
+        print(f"\n❌ TEST FAILED: {e}")
+        return 1
+    except Exception as e:
+        print(f"\n❌ ERROR: {e}")
+        import traceback
+        traceback.print_exc()
+        return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    exit_code = asyncio.run(main())
+    exit(exit_code)
@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Simple test to verify the phrase-level TTS audio cache.
+"""
+import asyncio
+import os
+import stat
+import tempfile
+from pipecat.frames.frames import TTSAudioRawFrame, TTSStartedFrame, TTSStoppedFrame
+import fake_services
+from fake_services import CachedFakeTTSService
+from tts_cache import SEGMENT_SUFFIX, TTS_CACHE_REQUESTS, TTSAudioCache, phrase_key, prewarm_blocking
+
+
+async def speak(tts, text: str):
+    """Frames and joined audio of one phrase."""
+    frames = [frame async for frame in tts.run_tts(text)]
+    audio = b"".join(bytes(frame.audio) for frame in frames if isinstance(frame, TTSAudioRawFrame))
+    return frames, audio
+
+
+def make_tts(cache: TTSAudioCache) -> CachedFakeTTSService:
+    tts = CachedFakeTTSService()
+    tts.tts_cache = cache
+    tts._sample_rate = 24000  # Normally set by the StartFrame
+    return tts
+
+
+async def test_hit_skips_synthesis():
+    """Test that a repeated phrase is answered with the same audio."""
+    print("Test 1: Repeated Phrase Served From Cache")
+    with tempfile.TemporaryDirectory() as directory:
+        tts = make_tts(TTSAudioCache(directory))
+        misses = TTS_CACHE_REQUESTS.get(tier="miss")
+        hits = TTS_CACHE_REQUESTS.get(tier="memory")
+
+        _, first = await speak(tts, "Digit 1 is 4")
+        frames, second = await speak(tts, "Digit 1  is 4 ")
+
+        assert first and second == first, "Same audio from the cache"
+        assert isinstance(frames[0], TTSStartedFrame) and isinstance(frames[-1], TTSStoppedFrame)
+        assert TTS_CACHE_REQUESTS.get(tier="miss") == misses + 1
+        assert TTS_CACHE_REQUESTS.get(tier="memory") == hits + 1
+        print(f"✓ {len(second)} bytes served from memory in {len(frames) - 2} chunk(s)\n")
+
+
+async def test_disk_tier_survives_restart():
+    """Test that phrases are found on disk by a new cache, skipping cut-short records."""
+    print("Test 2: On-Disk Tier Survives Restart")
+    with tempfile.TemporaryDirectory() as directory:
+        _, audio = await speak(make_tts(TTSAudioCache(directory)), "Hello there")
+        await speak(make_tts(TTSAudioCache(directory)), "Half written")
+        segments = sorted(os.listdir(directory))
+        with open(os.path.join(directory, segments[-1]), "r+b") as f:
+            f.truncate(os.path.getsize(f.name) - 10)  # As if the process died mid-write
+
+        cache = TTSAudioCache(directory)
+        disk_hits = TTS_CACHE_REQUESTS.get(tier="disk")
+        _, again = await speak(make_tts(cache), "Hello there")
+        assert again == audio, "Audio read back from disk"
+        assert TTS_CACHE_REQUESTS.get(tier="disk") == disk_hits + 1
+        assert phrase_key("", 24000, "Half written") not in cache.store, "Cut-short record skipped"
+        print(f"✓ {len(again)} bytes read back through mmap, cut-short record skipped\n")
+
+
+async def test_bounded_tiers():
+    """Test that both tiers stay within their budgets."""
+    print("Test 3: Bounded Memory and Disk")
+    with tempfile.TemporaryDirectory() as directory:
+        cache = TTSAudioCache(directory, memory_bytes=50_000, disk_bytes=150_000, segment_bytes=40_000)
+        tts = make_tts(cache)
+        for i in range(20):
+            await speak(tts, f"Phrase number {i}")
+
+        segments = [name for name in os.listdir(directory) if name.endswith(SEGMENT_SUFFIX)]
+        disk_size = sum(os.path.getsize(os.path.join(directory, name)) for name in segments)
+        assert cache._memory_size <= 50_000, f"Memory tier over budget: {cache._memory_size}"
+        assert disk_size <= 150_000 + 40_000, f"Disk tier over budget: {disk_size}"
+        assert phrase_key("", 24000, "Phrase number 0") not in cache, "Oldest phrases evicted"
+        assert phrase_key("", 24000, "Phrase number 19") in cache, "Newest phrase kept"
+        print(f"✓ {len(cache._memory)} phrase(s) in memory, {len(segments)} segment(s) on disk\n")
+
+
+def test_prewarm():
+    """Test that prewarming from synchronous code fills the cache once."""
+    print("Test 4: Prewarming")
+    with tempfile.TemporaryDirectory() as directory:
+        cache = TTSAudioCache(directory)
+        tts = CachedFakeTTSService()
+        tts.tts_cache = cache
+        phrases = ["Digit 1 is 1", "Digit 2 is 2"]
+
+        assert prewarm_blocking(tts, phrases, 24000) == 2
+        assert all(phrase_key("", 24000, phrase) in cache for phrase in phrases)
+        assert prewarm_blocking(tts, phrases, 24000) == 0, "Cached phrases skipped"
+        assert phrase_key("", 16000, phrases[0]) not in cache, "Sample rate is part of the key"
+        print(f"✓ {len(phrases)} phrases prewarmed, skipped on the second run\n")
+
+
+def test_private_directory():
+    """Test that the disk tier is only used in a directory private to this user."""
+    print("Test 5: Private Cache Directory")
+    with tempfile.TemporaryDirectory() as parent:
+        os.chmod(parent, 0o755)
+        directory = os.path.join(parent, "cache")
+        cache = TTSAudioCache(directory)
+        cache.put(phrase_key("", 24000, "Hi"), b"\0" * 100)
+        assert stat.S_IMODE(os.stat(directory).st_mode) == 0o700, "Created with mode 0700"
+        segment = next(name for name in os.listdir(directory) if name.endswith(SEGMENT_SUFFIX))
+        assert stat.S_IMODE(os.stat(os.path.join(directory, segment)).st_mode) == 0o600
+        print(f"✓ New cache dir is 0700, segments 0600")
+
+        os.chmod(parent, 0o777)  # Shared, like /tmp without the sticky bit
+        shared = TTSAudioCache(parent)
+        assert shared.store is None and shared.disk_bytes == 0, "Disk tier off in a shared dir"
+        shared.put(phrase_key("", 24000, "Hi"), b"\0" * 100)
+        assert phrase_key("", 24000, "Hi") in shared, "Memory tier still works"
+        assert not any(name.endswith(SEGMENT_SUFFIX) for name in os.listdir(parent)), "Nothing written"
+        print(f"✓ World-writable dir refused, cache stays in memory\n")
+
+
+async def test_budget_shared_by_processes():
+    """Test that stores of several processes keep the directory within one budget."""
+    print("Test 6: One Disk Budget per Directory")
+    with tempfile.TemporaryDirectory() as directory:
+        # Two stores on one directory stand in for two worker processes
+        caches = [TTSAudioCache(directory, disk_bytes=100_000, segment_bytes=20_000) for _ in range(2)]
+        for i in range(40):
+            caches[i % 2].put(phrase_key("", 24000, f"Phrase {i}"), bytes(10_000))
+
+        segments = [name for name in os.listdir(directory) if name.endswith(SEGMENT_SUFFIX)]
+        disk_size = sum(os.path.getsize(os.path.join(directory, name)) for name in segments)
+        assert disk_size <= 100_000 + 2 * 20_000, f"Directory over budget: {disk_size}"
+        audio = caches[0].store.get(phrase_key("", 24000, "Phrase 0"))
+        assert audio is None, "Segments evicted by the other process are forgotten"
+        for cache in caches:
+            cache.put(phrase_key("", 24000, "After"), bytes(10))  # Writer may have been evicted
+            cache.close()
+        print(f"✓ 400 KB written by 2 stores, {disk_size // 1000} KB on disk for a 100 KB budget\n")
+
+
+async def main():
+    """Run all tests."""
+    print("=" * 60)
+    print("TTS CACHE TESTS")
+    print("=" * 60 + "\n")
+
+    fake_services.TTS_LATENCY = 0.0
+    try:
+        await test_hit_skips_synthesis()
+        await test_disk_tier_survives_restart()
+        await test_bounded_tiers()
+        test_prewarm()
+        test_private_directory()
+        await test_budget_shared_by_processes()
+
+        print("=" * 60)
+        print("✅ ALL TESTS PASSED!")
+        print("=" * 60)
+
+    except AssertionError as e:
+        print(f"\n❌ TEST FAILED: {e}")
+        return 1
+    except Exception as e:
+        print(f"\n❌ ERROR: {e}")
+        import traceback
+        traceback.print_exc()
+        return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    exit_code = asyncio.run(main())
+    exit(exit_code)
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Simple test to verify cross-session batched VAD inference.
+"""
+import threading
+import numpy as np
+from shared_vad import SharedSileroVADAnalyzer, VADBatcher, preload_vad_model
+
+
+def make_audio(seed: int, seconds: float = 2.0, sample_rate: int = 16000) -> bytes:
+    """Noisy tone bursts, different for every stream."""
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(seconds * sample_rate)) / sample_rate
+    voiced = ((t + seed * 0.1) % 0.8) < 0.5
+    signal = np.sin(2 * np.pi * (150 + 20 * seed) * t) * 0.4 + rng.normal(0, 0.05, t.size)
+    return (signal * voiced * 32767).astype(np.int16).tobytes()
+
+
+def run_streams(analyzers, audios):
+    """Feed every stream 20 ms chunks from its own thread, as transports do."""
+    confidences = [[] for _ in analyzers]
+    states = [[] for _ in analyzers]
+
+    def feed(i):
+        analyzer = analyzers[i]
+        voice_confidence = analyzer.voice_confidence
+
+        def recording(buffer):
+            confidence = voice_confidence(buffer)
+            confidences[i].append(float(np.ravel(confidence)[0]))
+            return confidence
+        analyzer.voice_confidence = recording
+        for start in range(0, len(audios[i]), 640):
+            states[i].append(analyzer.analyze_audio(audios[i][start:start + 640]))
+
+    threads = [threading.Thread(target=feed, args=(i,)) for i in range(len(analyzers))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return confidences, states
+
+
+def make_analyzers(count: int, batched: bool):
+    analyzers = [SharedSileroVADAnalyzer(batched=batched) for _ in range(count)]
+    for analyzer in analyzers:
+        analyzer.set_sample_rate(16000)
+        analyzer._last_reset_time = float("inf")  # No mid-test resets
+    return analyzers
+
+
+def test_batched_matches_unbatched():
+    """Test that batching changes nothing for any stream."""
+    print("Test 1: Batched Results Match Per-Stream Results")
+    audios = [make_audio(seed) for seed in range(8)]
+    expected, expected_states = run_streams(make_analyzers(8, batched=False), audios)
+    actual, actual_states = run_streams(make_analyzers(8, batched=True), audios)
+
+    for i in range(8):
+        assert np.allclose(actual[i], expected[i], atol=1e-5), f"Stream {i} confidence differs"
+        assert actual_states[i] == expected_states[i], f"Stream {i} VAD states differ"
+    assert len({tuple(np.round(c, 3)) for c in actual}) == 8, "Streams kept their own state"
+    print(f"✓ 8 concurrent streams, {len(actual[0])} windows each, same confidences and states")
+    print(f"✓ Peak confidences {[round(max(c), 2) for c in actual]}\n")
+
+
+def test_batches_and_errors():
+    """Test that concurrent windows share an inference and errors reach callers."""
+    print("Test 2: Shared Inferences and Errors")
+    batcher = VADBatcher(preload_vad_model(), max_wait=0.05)
+    runs = []
+    session_run = batcher.session.run
+
+    class CountingSession:
+        def run(self, outputs, inputs):
+            runs.append(inputs["input"].shape[0])
+            return session_run(outputs, inputs)
+    batcher.session = CountingSession()
+
+    state = np.zeros((2, 1, 128), dtype=np.float32)
+    window = np.zeros((1, 576), dtype=np.float32)
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(batcher.run(window, state, 16000)))
+        for _ in range(6)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(results) == 6 and sum(runs) == 6, f"Every window run once: {runs}"
+    assert len(runs) < 6, f"Windows should share inferences: {runs}"
+    assert results[0][1].shape == (2, 1, 128), "Each caller gets its own state back"
+    print(f"✓ 6 windows run in {len(runs)} inference(s) of sizes {runs}")
+
+    try:
+        batcher.run(np.zeros((1, 3), dtype=np.float32), state, 16000)
+    except Exception as e:
+        print(f"✓ Inference errors reach the caller: {type(e).__name__}\n")
+    else:
+        raise AssertionError("Bad input should raise")
+    finally:
+        batcher.close()
+
+
+def main():
+    """Run all tests."""
+    print("=" * 60)
+    print("VAD BATCHING TESTS")
+    print("=" * 60 + "\n")
+
+    try:
+        test_batched_matches_unbatched()
+        test_batches_and_errors()
+
+        print("=" * 60)
+        print("✅ ALL TESTS PASSED!")
+        print("=" * 60)
+
+    except AssertionError as e:
+        print(f"\n❌ TEST FAILED: {e}")
+        return 1
+    except Exception as e:
+        print(f"\n❌ ERROR: {e}")
+        import traceback
+        traceback.print_exc()
+        return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Simple test to verify that the websocket_server mode runs concurrent sessions.
+"""
+import asyncio
+import json
+import socket
+import uuid
+from pipecat.frames.frames import Frame, TransportMessageUrgentFrame, TextFrame
+from pipecat.frames.protobufs import frames_pb2
+from pipecat.pipeline.pipeline import Pipeline
+from pipecat.pipeline.runner import PipelineRunner
+from pipecat.pipeline.task import PipelineTask
+from pipecat.processors.frame_processor import FrameDirection, FrameProcessor
+from pipecat.serializers.protobuf import ProtobufFrameSerializer
+from pipecat.transports.websocket.server import WebsocketServerParams
+from websockets.asyncio.client import connect
+from websockets.exceptions import ConnectionClosed
+import bot_websocket_server
+from admission import admission
+from bot_websocket_server import SessionWebsocketServerTransport, run_bot_websocket_server
+
+
+class Echo(FrameProcessor):
+    """Answers each text frame with a message naming this session."""
+
+    def __init__(self, session_id: str, **kwargs):
+        super().__init__(**kwargs)
+        self.session_id = session_id
+
+    async def process_frame(self, frame: Frame, direction: FrameDirection):
+        await super().process_frame(frame, direction)
+        if isinstance(frame, TextFrame):
+            message = {"session": self.session_id, "echo": frame.text}
+            await self.push_frame(TransportMessageUrgentFrame(message=message))
+        else:
+            await self.push_frame(frame, direction)
+
+
+ended = []
+
+
+async def echo_session(websocket, session_timeout: float = 1.0):
+    """run_session with the Gemini service swapped for Echo; same handlers."""
+    ws_transport = SessionWebsocketServerTransport(
+        websocket,
+        params=WebsocketServerParams(serializer=ProtobufFrameSerializer(), session_timeout=session_timeout),
+    )
+    session_id = uuid.uuid4().hex[:8]
+    task = PipelineTask(Pipeline([ws_transport.input(), Echo(session_id), ws_transport.output()]))
+
+    @ws_transport.event_handler("on_client_disconnected")
+    async def on_client_disconnected(transport, client):
+        await task.cancel()
+
+    @ws_transport.event_handler("on_session_timeout")
+    async def on_session_timeout(transport, client):
+        await task.cancel()
+
+    await PipelineRunner(handle_sigint=False).run(task)
+    ended.append(session_id)
+
+
+async def ask(ws, text: str) -> dict:
+    await ws.send(frames_pb2.Frame(text=frames_pb2.TextFrame(text=text)).SerializeToString())
+    while True:
+        frame = frames_pb2.Frame.FromString(await asyncio.wait_for(ws.recv(), timeout=5))
+        if frame.WhichOneof("frame") == "message":
+            return json.loads(frame.message.data)
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("localhost", 0))
+        return s.getsockname()[1]
+
+
+async def test_concurrent_sessions():
+    """Test that callers on one socket get isolated sessions that end on their own."""
+    print("Test 1: Concurrent Sessions on One Socket")
+    port = free_port()
+    run_session, bot_websocket_server.run_session = bot_websocket_server.run_session, echo_session
+    server = asyncio.create_task(run_bot_websocket_server("localhost", port))
+    await asyncio.sleep(0.2)
+    try:
+        async with connect(f"ws://localhost:{port}") as first, connect(f"ws://localhost:{port}") as second:
+            replies = await asyncio.gather(*(ask(ws, f"hello {i}") for i, ws in enumerate((first, second))))
+            assert [reply["echo"] for reply in replies] == ["hello 0", "hello 1"]
+            assert replies[0]["session"] != replies[1]["session"], "Each caller has its own pipeline"
+            assert admission.live_sessions == 2
+            print(f"✓ Two callers served by sessions {replies[0]['session']} and {replies[1]['session']}")
+
+            await first.close()
+            await asyncio.sleep(0.3)
+            assert replies[0]["session"] in ended, "Disconnected session cleaned up"
+            assert (await ask(second, "still there?"))["session"] == replies[1]["session"]
+            print(f"✓ Disconnect ended one session, the other kept going")
+
+            try:
+                await asyncio.wait_for(second.recv(), timeout=3)
+                await asyncio.wait_for(second.recv(), timeout=3)
+            except ConnectionClosed:
+                pass
+            await asyncio.sleep(0.3)
+            assert replies[1]["session"] in ended, "Session timeout ended the session"
+            assert admission.live_sessions == 0, "Admission slots released"
+            print(f"✓ Session timeout applied per caller, admission slots released\n")
+    finally:
+        server.cancel()
+        bot_websocket_server.run_session = run_session
+
+
+async def main():
+    """Run all tests."""
+    print("=" * 60)
+    print("WEBSOCKET SERVER TESTS")
+    print("=" * 60 + "\n")
+
+    try:
+        await test_concurrent_sessions()
+
+        print("=" * 60)
+        print("✅ ALL TESTS PASSED!")
+        print("=" * 60)
+
+    except AssertionError as e:
+        print(f"\n❌ TEST FAILED: {e}")
+        return 1
+    except Exception as e:
+        print(f"\n❌ ERROR: {e}")
+        import traceback
+        traceback.print_exc()
+        return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    exit_code = asyncio.run(main())
+    exit(exit_code)
@@ -0,0 +1,268 @@
+"""
+Worker pool for the synchronous part of ADK tools.
+
+ADK tools run on the event loop that moves every session's audio, so CPU-heavy
+steps (parsing, scoring, embedding) glitch unrelated calls. Decorating a plain
+function with @offload_tool turns it into an async ADK tool whose body runs in
+a managed thread or process pool:
+
+    @offload_tool
+    def score_tool(text: str, emit) -> str:
+        emit("Scoring now")   # Spoken through the task's speech queue
+        return heavy_scoring(text)
+
+`emit(text)` speaks an interim result through the streaming_bridge task ID of
+the call, and blocks the worker while the speech queue applies backpressure.
+Once the task is unregistered (the call finished, timed out or was cancelled)
+emit() raises LookupError, which ends the job.
+
+Process workers reach the pipeline over the "ipc" registry backend, so the
+process pool needs TASK_REGISTRY_BACKEND=ipc. Functions must be module-level
+so workers can import them.
+"""
+import asyncio
+import concurrent.futures
+import functools
+import importlib
+import inspect
+import multiprocessing
+import os
+import threading
+from typing import Any, Callable, Optional
+
+from loguru import logger
+from pipecat.frames.frames import TTSSpeakFrame
+
+from metrics import Counter, Gauge
+from streaming_bridge import (
+    InProcessBackend,
+    UnixSocketBackend,
+    get_registry_backend,
+    get_speech_queue,
+    set_registry_backend,
+)
+
+# "thread", or "process" (needs TASK_REGISTRY_BACKEND=ipc)
+TOOL_POOL_KIND = os.getenv("TOOL_POOL_KIND", "thread")
+
+# Workers running tool jobs at once
+TOOL_POOL_SIZE = int(os.getenv("TOOL_POOL_SIZE", str(os.cpu_count() or 4)))
+
+# Jobs allowed to wait for a worker before new calls are turned away
+TOOL_POOL_QUEUE_DEPTH = int(os.getenv("TOOL_POOL_QUEUE_DEPTH", "32"))
+
+KINDS = ("thread", "process")
+
+
+class ToolPoolBusy(Exception):
+    """Every worker is busy and the queue is full."""
+
+
+async def _speak(task_id: str, text: str):
+    speech = get_speech_queue(task_id)
+    if speech is None:
+        raise LookupError(f"Task {task_id} not found")
+    await speech.queue_frames([TTSSpeakFrame(text=text)])
+
+
+class _ThreadEmit:
+    """emit() for thread workers: speaks on the pipeline's own loop."""
+
+    def __init__(self, task_id: str, loop: asyncio.AbstractEventLoop):
+        self.task_id = task_id
+        self.loop = loop
+
+    def __call__(self, text: str):
+        asyncio.run_coroutine_threadsafe(_speak(self.task_id, text), self.loop).result()
+
+
+# Event loop of a process worker, used for its emit() calls
+_worker_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+class _ProcessEmit:
+    """emit() for process workers: speaks over the owner's registry socket."""
+
+    def __init__(self, task_id: str):
+        self.task_id = task_id
+
+    def __call__(self, text: str):
+        global _worker_loop
+        if _worker_loop is None:
+            _worker_loop = asyncio.new_event_loop()
+        _worker_loop.run_until_complete(_speak(self.task_id, text))
+
+
+def _init_worker():
+    # Task IDs name their owner's socket, whatever this process's env says
+    set_registry_backend(UnixSocketBackend())
+
+
+def _run_in_worker(module: str, qualname: str, task_id: str, args: tuple, kwargs: dict) -> Any:
+    """Import an offloaded tool in a process worker and run its sync body."""
+    tool = importlib.import_module(module)
+    for name in qualname.split("."):
+        tool = getattr(tool, name)
+    func = getattr(tool, "__wrapped__", tool)  # Module attribute is the async wrapper
+    return func(*args, emit=_ProcessEmit(task_id), **kwargs)
+
+
+class ToolPool:
+    """Bounded thread or process pool for offloaded tool jobs."""
+
+    def __init__(
+        self,
+        kind: str = TOOL_POOL_KIND,
+        size: int = TOOL_POOL_SIZE,
+        queue_depth: int = TOOL_POOL_QUEUE_DEPTH,
+    ):
+        """
+        Args:
+            kind: One of KINDS
+            size: Workers running jobs at once
+            queue_depth: Jobs allowed to wait for a worker
+        """
+        if kind not in KINDS:
+            raise ValueError(f"Unknown tool pool kind: {kind}")
+        self.kind = kind
+        self.size = size
+        self.queue_depth = queue_depth
+        self.active = 0  # Jobs submitted and not finished, running or queued
+        self._executor: Optional[concurrent.futures.Executor] = None
+        self._lock = threading.Lock()
+
+    @property
+    def waiting(self) -> int:
+        """Jobs waiting for a worker."""
+        return max(0, self.active - self.size)
+
+    async def run(self, func: Callable, task_id: str, args: tuple = (), kwargs: Optional[dict] = None) -> Any:
+        """
+        Run `func(*args, emit=..., **kwargs)` on a worker.
+
+        Args:
+            func: Module-level sync function taking an `emit` keyword
+            task_id: streaming_bridge task ID that emit() speaks through
+            args: Positional arguments for func
+            kwargs: Keyword arguments for func
+
+        Returns:
+            Whatever func returns
+
+        Raises:
+            ToolPoolBusy: The queue is full
+        """
+        kwargs = kwargs or {}
+        with self._lock:
+            if self.active >= self.size + self.queue_depth:
+                REJECTED.inc()
+                raise ToolPoolBusy(f"{self.active} tool jobs already in progress")
+            self.active += 1
+
+        try:
+            if self.kind == "thread":
+                emit = _ThreadEmit(task_id, asyncio.get_running_loop())
+                call = functools.partial(func, *args, emit=emit, **kwargs)
+            else:
+                if isinstance(get_registry_backend(), InProcessBackend):
+                    raise RuntimeError("The process tool pool needs TASK_REGISTRY_BACKEND=ipc")
+                call = functools.partial(_run_in_worker, func.__module__, func.__qualname__, task_id, args, kwargs)
+            future = self._ensure_executor().submit(call)
+        except BaseException:
+            self._finished(None)
+            raise
+        future.add_done_callback(self._finished)
+        # Cancelling the caller drops a queued job; a running one ends at its next emit()
+        return await asyncio.wrap_future(future)
+
+    def _finished(self, _future):
+        with self._lock:
+            self.active -= 1
+
+    def _ensure_executor(self) -> concurrent.futures.Executor:
+        if self._executor is None:
+            if self.kind == "thread":
+                self._executor = concurrent.futures.ThreadPoolExecutor(
+                    max_workers=self.size, thread_name_prefix="tool"
+                )
+            else:
+                # Spawned, not forked: the server process runs threads and an event loop
+                self._executor = concurrent.futures.ProcessPoolExecutor(
+                    max_workers=self.size,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_worker,
+                )
+            logger.info(f"Started {self.kind} tool pool with {self.size} worker(s)")
+        return self._executor
+
+    def shutdown(self):
+        """Stop the workers, dropping queued jobs (on server shutdown)."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+# Process-wide pool used by @offload_tool
+tool_pool = ToolPool()
+
+Gauge("tool_pool_active", "Offloaded tool jobs running or queued.", lambda: tool_pool.active)
+REJECTED = Counter("tool_pool_rejected_total", "Offloaded tool calls turned away by a full queue.")
+
+
+def _without_emit_doc(doc: Optional[str]) -> Optional[str]:
+    """Drop an `emit:` argument entry (and its continuation lines) from a docstring."""
+    if not doc:
+        return doc
+    lines, entry_indent = [], None
+    for line in doc.splitlines():
+        indent = len(line) - len(line.lstrip())
+        if entry_indent is not None and line.strip() and indent > entry_indent:
+            continue  # Continuation of the emit entry
+        entry_indent = None
+        if line.lstrip().startswith("emit:"):
+            entry_indent = indent
+            continue
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def offload_tool(func: Optional[Callable] = None, *, pool: Optional[ToolPool] = None):
+    """
+    Make a sync function an async ADK tool that runs on a worker pool.
+
+    The function takes an `emit` keyword for interim speech; the tool the
+    model sees has the same parameters and docstring without it.
+
+    Args:
+        func: Function to wrap (when used as a bare decorator)
+        pool: Pool to run on (defaults to tool_pool)
+
+    Returns:
+        The async tool function, or a decorator if func is not given
+    """
+    if func is None:
+        return functools.partial(offload_tool, pool=pool)
+
+    signature = inspect.signature(func)
+    parameters = [param for name, param in signature.parameters.items() if name != "emit"]
+    parameters.append(inspect.Parameter("tool_context", inspect.Parameter.KEYWORD_ONLY))
+
+    @functools.wraps(func)
+    async def tool(*args, tool_context, **kwargs):
+        task_id = tool_context.state.get("task_id")
+        if not task_id:
+            error_msg = "Error: No task ID configured"
+            logger.error(error_msg)
+            return error_msg
+        try:
+            return await (pool or tool_pool).run(func, task_id, args, kwargs)
+        except ToolPoolBusy as e:
+            logger.warning(f"Tool {func.__name__} turned away: {e}")
+            return "Error: Too many tool calls in progress, try again shortly"
+
+    # ADK builds the declaration from the signature and docstring; tool_context
+    # is hidden from the model, and emit is neither a parameter nor described
+    tool.__signature__ = signature.replace(parameters=parameters)
+    tool.__doc__ = _without_emit_doc(func.__doc__)
+    tool.__annotations__ = {k: v for k, v in func.__annotations__.items() if k != "emit"}
+    return tool
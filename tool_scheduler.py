@@ -0,0 +1,183 @@
+"""
+Concurrent tool scheduling for one LLM turn.
+
+When the LLM requests several tools in one response, each call runs
+concurrently (bounded by a per-session and a process-wide cap), and the
+results are handed back in the order the LLM asked for them once every call
+of the turn has finished. A multi-tool turn then takes as long as its slowest
+tool and triggers a single follow-up LLM run.
+
+A call that never reaches its handler (e.g. dropped on interruption) does not
+hold up the rest of its turn: once every call that did start has finished,
+the others get `arrival_timeout` seconds to show up before the turn is
+delivered without them.
+"""
+import asyncio
+import dataclasses
+import os
+import weakref
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from loguru import logger
+from pipecat.services.llm_service import FunctionCallParams
+
+# Tool calls running at once across all sessions of this process
+PROCESS_MAX_CONCURRENCY = int(os.getenv("TOOL_MAX_CONCURRENCY", "64"))
+
+# Tool calls running at once within one session
+SESSION_MAX_CONCURRENCY = int(os.getenv("TOOL_SESSION_MAX_CONCURRENCY", "4"))
+
+# Seconds a turn waits for calls that have not reached the scheduler yet, once
+# every call that did has finished
+ARRIVAL_TIMEOUT = float(os.getenv("TOOL_TURN_ARRIVAL_TIMEOUT", "1.0"))
+
+# The process-wide cap, one semaphore per event loop
+_process_slots: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def get_process_slots() -> asyncio.Semaphore:
+    """Get the process-wide tool call semaphore of the running event loop."""
+    loop = asyncio.get_running_loop()
+    slots = _process_slots.get(loop)
+    if slots is None:
+        slots = _process_slots[loop] = asyncio.Semaphore(PROCESS_MAX_CONCURRENCY)
+    return slots
+
+
+class ToolTurn:
+    """The tool calls requested by one LLM response."""
+
+    def __init__(self, tool_call_ids: Iterable[str]):
+        self.order: List[str] = list(tool_call_ids)
+        self.started: Set[str] = set()
+        self.finished: Dict[str, Optional[Tuple[FunctionCallParams, Any, dict]]] = {}
+        self.delivered = asyncio.Event()
+        self.delivering = False
+        self.expiry: Optional[asyncio.TimerHandle] = None
+
+    def finish(self, tool_call_id: str, outcome: Optional[Tuple[FunctionCallParams, Any, dict]]) -> bool:
+        """Record one call's outcome; returns True if it completed the turn."""
+        self.finished[tool_call_id] = outcome
+        return len(self.finished) == len(self.order)
+
+    @property
+    def idle(self) -> bool:
+        """Whether every call that reached the scheduler has finished."""
+        return self.started.issubset(self.finished)
+
+    async def deliver(self):
+        """Report every result in request order."""
+        try:
+            for tool_call_id in self.order:
+                outcome = self.finished.get(tool_call_id)
+                if outcome is None:
+                    continue  # Cancelled, or the tool never reported
+                params, result, kwargs = outcome
+                await params.result_callback(result, **kwargs)
+        finally:
+            self.delivered.set()
+
+
+class ToolScheduler:
+    """Schedules the tool calls of one session."""
+
+    def __init__(
+        self,
+        max_concurrency: int = SESSION_MAX_CONCURRENCY,
+        process_slots: Optional[asyncio.Semaphore] = None,
+        arrival_timeout: float = ARRIVAL_TIMEOUT,
+    ):
+        """
+        Args:
+            max_concurrency: Tool calls running at once in this session
+            process_slots: Cap shared with other sessions (default: the
+                running loop's, see get_process_slots)
+            arrival_timeout: Seconds to wait for calls that never arrive
+        """
+        self._slots = asyncio.Semaphore(max_concurrency)
+        self._process_slots = process_slots or get_process_slots()
+        self.arrival_timeout = arrival_timeout
+        self._turns: Dict[str, ToolTurn] = {}
+
+    @property
+    def pending_turns(self) -> int:
+        """Turns still waiting for calls to arrive (for monitoring)."""
+        return len({id(turn) for turn in self._turns.values()})
+
+    def start_turn(self, tool_call_ids: Iterable[str]):
+        """
+        Group the calls of one LLM response. Call from on_function_calls_started
+        with the IDs of calls that have a registered handler.
+
+        Args:
+            tool_call_ids: Tool call IDs in the order the LLM requested them
+        """
+        turn = ToolTurn(tool_call_ids)
+        for tool_call_id in turn.order:
+            self._turns[tool_call_id] = turn
+        if len(turn.order) > 1:
+            logger.debug(f"Running {len(turn.order)} tool calls concurrently")
+        # Released even if none of its calls ever arrive
+        self._schedule_expiry(turn)
+
+    async def run(
+        self,
+        params: FunctionCallParams,
+        handler: Callable[[FunctionCallParams], Awaitable[None]],
+    ):
+        """
+        Run one tool call within the concurrency caps and report its result
+        together with the rest of its turn.
+
+        Args:
+            params: Pipecat function call parameters
+            handler: Runs the function and reports through params.result_callback
+        """
+        turn = self._turns.pop(params.tool_call_id, None) or ToolTurn([params.tool_call_id])
+        turn.started.add(params.tool_call_id)
+        captured = []
+
+        async def capture(result, **kwargs):
+            if not captured:
+                captured.append((params, result, kwargs))
+
+        try:
+            async with self._slots, self._process_slots:
+                await handler(dataclasses.replace(params, result_callback=capture))
+        finally:
+            if turn.finish(params.tool_call_id, captured[0] if captured else None):
+                self._deliver(turn)
+            elif turn.idle:
+                self._schedule_expiry(turn)
+        await turn.delivered.wait()
+
+    def _schedule_expiry(self, turn: ToolTurn):
+        if turn.expiry is not None:
+            turn.expiry.cancel()
+        loop = asyncio.get_running_loop()
+        turn.expiry = loop.call_later(self.arrival_timeout, self._expire, turn)
+
+    def _expire(self, turn: ToolTurn):
+        """Deliver a turn without the calls that never arrived."""
+        turn.expiry = None
+        if turn.delivering or not turn.idle:
+            return  # A late call is still running; it reschedules on finishing
+        missing = [tool_call_id for tool_call_id in turn.order if tool_call_id not in turn.started]
+        for tool_call_id in missing:
+            if self._turns.get(tool_call_id) is turn:
+                del self._turns[tool_call_id]
+        if missing:
+            logger.warning(f"Delivering tool turn without {len(missing)} call(s) that never arrived")
+        self._deliver(turn)
+
+    def _deliver(self, turn: ToolTurn):
+        if turn.delivering:
+            return
+        turn.delivering = True
+        if turn.expiry is not None:
+            turn.expiry.cancel()
+            turn.expiry = None
+        # Separate task so a cancelled last call still releases the others
+        asyncio.create_task(turn.deliver())
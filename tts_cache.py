@@ -0,0 +1,447 @@
+"""
+Phrase-level TTS audio cache.
+
+Many phrases are synthesized again and again across sessions: greetings,
+tool progress lines ("Digit 1 is 4") and fixed-template replies. CachedTTSMixin
+wraps a TTS service's run_tts: synthesized PCM is stored under the voice,
+sample rate and normalized text, and a later request for the same phrase is
+answered from the cache, skipping the network round trip.
+
+The cache has two tiers:
+
+- an in-memory LRU, bounded in bytes
+- append-only segment files on disk, read through mmap, so phrases survive
+  restarts and can be prewarmed
+
+The segments are audio played straight to callers, so the directory must be
+private to this user (mode 0700); the disk tier is turned off otherwise.
+
+Each process appends to its own segment file and indexes the segments that
+existed when it opened the store, so worker processes can share a directory.
+Eviction covers the whole directory under a lock file: when all segments
+together grow over the budget, the oldest is deleted, whichever process wrote
+it. Writes are small appends to the page cache and are not fsynced; a record
+cut short by a crash is skipped when the store is next opened.
+"""
+import asyncio
+import fcntl
+import hashlib
+import mmap
+import os
+import stat
+import struct
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import AsyncGenerator, Dict, Iterable, List, Optional, Tuple
+
+from loguru import logger
+from pipecat.frames.frames import ErrorFrame, Frame, TTSAudioRawFrame, TTSStartedFrame, TTSStoppedFrame
+
+from metrics import Counter
+
+# Cache synthesized phrases
+TTS_CACHE_ENABLED = os.getenv("TTS_CACHE_ENABLED", "true").lower() == "true"
+
+# Directory of the on-disk segments; must be private to this user (0700)
+TTS_CACHE_DIR = os.getenv("TTS_CACHE_DIR") or os.path.join(
+    os.getenv("XDG_CACHE_HOME") or os.path.expanduser("~/.cache"), "pipecat-tts"
+)
+
+# In-memory tier size, in megabytes
+TTS_CACHE_MEMORY_MB = float(os.getenv("TTS_CACHE_MEMORY_MB", "64"))
+
+# On-disk tier size, in megabytes (0 keeps the cache in memory only)
+TTS_CACHE_DISK_MB = float(os.getenv("TTS_CACHE_DISK_MB", "1024"))
+
+# Size at which a segment file is closed and a new one started, in megabytes
+TTS_CACHE_SEGMENT_MB = float(os.getenv("TTS_CACHE_SEGMENT_MB", "64"))
+
+# Longest phrase cached, in characters; longer text rarely repeats
+TTS_CACHE_MAX_CHARS = int(os.getenv("TTS_CACHE_MAX_CHARS", "200"))
+
+# Phrases to synthesize into the cache during warm-up, one per line ("" skips)
+TTS_CACHE_PREWARM_FILE = os.getenv("TTS_CACHE_PREWARM_FILE", "")
+
+# Output sample rate the prewarmed phrases are synthesized at (pipecat's default)
+TTS_CACHE_PREWARM_SAMPLE_RATE = int(os.getenv("TTS_CACHE_PREWARM_SAMPLE_RATE", "24000"))
+
+MB = 1024 * 1024
+
+SEGMENT_SUFFIX = ".seg"
+
+# Held (flock) while any process evicts segments from a cache directory
+LOCK_NAME = ".lock"
+
+# Record header: magic, SHA-1 of the key, audio length
+_RECORD = struct.Struct("!4s20sI")
+_MAGIC = b"TTS1"
+
+TTS_CACHE_REQUESTS = Counter(
+    "tts_cache_requests_total",
+    "TTS phrase lookups, by the tier that answered (memory, disk or miss).",
+    labelnames=("tier",),
+)
+
+
+def phrase_key(voice: str, sample_rate: int, text: str) -> bytes:
+    """
+    Cache key of a phrase: the same words in the same voice share audio.
+
+    Args:
+        voice: TTS voice (e.g. "aura-2-helena-en")
+        sample_rate: Output sample rate of the audio
+        text: Phrase to synthesize; Unicode form and spacing are normalized
+    """
+    normalized = " ".join(unicodedata.normalize("NFC", text).split())
+    return hashlib.sha1(f"{voice}\n{sample_rate}\n{normalized}".encode()).digest()
+
+
+class SegmentStore:
+    """Append-only audio records in segment files, read through mmap."""
+
+    def __init__(self, directory: str, max_bytes: int, segment_bytes: int):
+        """
+        Args:
+            directory: Where the segment files live (created if missing)
+            max_bytes: Size of all segments before the oldest is deleted
+            segment_bytes: Size at which a new segment is started
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.segment_bytes = segment_bytes
+        # key -> (segment path, audio offset, audio length)
+        self._index: Dict[bytes, Tuple[str, int, int]] = {}
+        self._maps: Dict[str, mmap.mmap] = {}
+        self._sizes: "OrderedDict[str, int]" = OrderedDict()  # Oldest first
+        self._writer = None
+        self._writer_path: Optional[str] = None
+        self._lock = threading.Lock()
+
+        os.makedirs(directory, mode=0o700, exist_ok=True)
+        _check_private_dir(directory)
+        for path, _, _ in _segments(directory):
+            self._load(path)
+        logger.debug(f"TTS cache opened with {len(self._index)} phrase(s) in {len(self._sizes)} segment(s)")
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def __contains__(self, key: bytes) -> bool:
+        return key in self._index
+
+    @property
+    def size(self) -> int:
+        return sum(self._sizes.values())
+
+    def get(self, key: bytes) -> Optional[bytes]:
+        with self._lock:
+            entry = self._index.get(key)
+            if entry is None:
+                return None
+            path, offset, length = entry
+            mapped = self._map(path, offset + length)
+            if mapped is None:
+                self._forget(path)  # Evicted by another process
+                return None
+            return mapped[offset:offset + length]
+
+    def put(self, key: bytes, audio: bytes):
+        with self._lock:
+            if key in self._index:
+                return
+            if (
+                self._writer is None
+                or self._sizes[self._writer_path] >= self.segment_bytes
+                or os.fstat(self._writer.fileno()).st_nlink == 0  # Evicted by another process
+            ):
+                self._start_segment()
+            path = self._writer_path
+            offset = self._sizes[path] + _RECORD.size
+            self._writer.write(_RECORD.pack(_MAGIC, key, len(audio)))
+            self._writer.write(audio)
+            self._writer.flush()
+            self._sizes[path] = offset + len(audio)
+            self._index[key] = (path, offset, len(audio))
+            self._evict()
+
+    def close(self):
+        with self._lock:
+            if self._writer is not None:
+                self._writer.close()
+                self._writer = None
+            self._maps.clear()  # Unmapped once no frame references them
+
+    def _load(self, path: str):
+        """Index the complete records of an existing segment."""
+        st = os.lstat(path)
+        if not stat.S_ISREG(st.st_mode) or st.st_uid != os.getuid():
+            logger.warning(f"TTS cache skipped {path}: not a regular file owned by uid {os.getuid()}")
+            return
+        size = st.st_size
+        self._sizes[path] = size
+        if size == 0:
+            return
+        with open(path, "rb") as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._maps[path] = mapped
+        pos = 0
+        while pos + _RECORD.size <= size:
+            magic, key, length = _RECORD.unpack_from(mapped, pos)
+            start = pos + _RECORD.size
+            if magic != _MAGIC or start + length > size:
+                logger.warning(f"TTS cache segment {path} is cut short at byte {pos}")
+                break
+            self._index[key] = (path, start, length)
+            pos = start + length
+
+    def _map(self, path: str, end: int) -> Optional[mmap.mmap]:
+        """A map of the segment covering `end`, remapped if it has grown."""
+        mapped = self._maps.get(path)
+        if mapped is None or len(mapped) < end:
+            try:
+                with open(path, "rb") as f:
+                    mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except (OSError, ValueError):
+                return None  # Deleted by another process's eviction
+            self._maps[path] = mapped
+        return mapped
+
+    def _start_segment(self):
+        if self._writer is not None:
+            self._writer.close()
+        name = f"{time.time_ns()}-{os.getpid()}{SEGMENT_SUFFIX}"
+        self._writer_path = os.path.join(self.directory, name)
+        fd = os.open(self._writer_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL | os.O_APPEND, 0o600)
+        self._writer = os.fdopen(fd, "ab")
+        self._sizes[self._writer_path] = 0
+
+    def _evict(self):
+        """Delete the oldest segments of the whole directory until it fits the budget."""
+        with open(os.path.join(self.directory, LOCK_NAME), "a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            segments = _segments(self.directory)
+            total = sum(size for _, size, _ in segments)
+            for path, size, _ in segments:
+                if total <= self.max_bytes:
+                    break
+                if path == self._writer_path:
+                    continue  # Never the one this process is writing
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+                total -= size
+                self._forget(path)
+                logger.debug(f"TTS cache evicted segment {path}")
+
+    def _forget(self, path: str):
+        """Drop a deleted segment from the index."""
+        self._sizes.pop(path, None)
+        self._maps.pop(path, None)
+        self._index = {key: entry for key, entry in self._index.items() if entry[0] != path}
+
+
+def _segments(directory: str) -> List[Tuple[str, int, float]]:
+    """(path, size, mtime) of every segment in a directory, oldest first."""
+    segments = []
+    for name in os.listdir(directory):
+        if not name.endswith(SEGMENT_SUFFIX):
+            continue
+        path = os.path.join(directory, name)
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            continue  # Evicted meanwhile
+        segments.append((path, st.st_size, st.st_mtime))
+    return sorted(segments, key=lambda segment: segment[2])
+
+
+def _check_private_dir(path: str):
+    """Raise PermissionError unless only this user can write into `path`."""
+    st = os.stat(path)
+    if st.st_uid != os.getuid() or st.st_mode & 0o077:
+        raise PermissionError(
+            f"TTS cache dir must be owned by uid {os.getuid()} with mode 0700: "
+            f"{path} (uid {st.st_uid}, mode {stat.S_IMODE(st.st_mode):o})"
+        )
+
+
+class TTSAudioCache:
+    """In-memory LRU of phrase audio in front of an optional SegmentStore."""
+
+    def __init__(
+        self,
+        directory: Optional[str] = TTS_CACHE_DIR,
+        memory_bytes: int = int(TTS_CACHE_MEMORY_MB * MB),
+        disk_bytes: int = int(TTS_CACHE_DISK_MB * MB),
+        segment_bytes: int = int(TTS_CACHE_SEGMENT_MB * MB),
+    ):
+        """
+        Args:
+            directory: Directory of the on-disk tier; None for memory only
+            memory_bytes: Size of the in-memory tier
+            disk_bytes: Size of the on-disk tier; 0 for memory only
+            segment_bytes: Size of each segment file
+        """
+        self.directory = directory
+        self.memory_bytes = memory_bytes
+        self.disk_bytes = disk_bytes
+        self.segment_bytes = segment_bytes
+        self._memory: "OrderedDict[bytes, bytes]" = OrderedDict()
+        self._memory_size = 0
+        self._store: Optional[SegmentStore] = None
+        # Prewarming may run on a helper thread while sessions use the cache
+        self._lock = threading.RLock()
+
+    @property
+    def store(self) -> Optional[SegmentStore]:
+        """The on-disk tier, opened on first use (None if it cannot be used safely)."""
+        with self._lock:
+            if self._store is None and self.directory and self.disk_bytes > 0:
+                try:
+                    self._store = SegmentStore(self.directory, self.disk_bytes, self.segment_bytes)
+                except OSError as e:
+                    logger.warning(f"TTS cache disk tier disabled: {e}")
+                    self.disk_bytes = 0
+            return self._store
+
+    def __contains__(self, key: bytes) -> bool:
+        with self._lock:
+            return key in self._memory or (self.store is not None and key in self.store)
+
+    def get(self, key: bytes) -> Optional[bytes]:
+        """Audio of a phrase, or None on a miss."""
+        with self._lock:
+            audio = self._memory.get(key)
+            if audio is not None:
+                self._memory.move_to_end(key)
+                TTS_CACHE_REQUESTS.inc(tier="memory")
+                return audio
+            audio = self.store.get(key) if self.store is not None else None
+            if audio is not None:
+                self._remember(key, audio)
+                TTS_CACHE_REQUESTS.inc(tier="disk")
+                return audio
+        TTS_CACHE_REQUESTS.inc(tier="miss")
+        return None
+
+    def put(self, key: bytes, audio: bytes):
+        """Store the audio of a phrase in both tiers."""
+        with self._lock:
+            self._remember(key, audio)
+            if self.store is not None:
+                try:
+                    self.store.put(key, audio)
+                except OSError as e:
+                    logger.warning(f"TTS cache write failed: {e}")
+
+    def close(self):
+        with self._lock:
+            if self._store is not None:
+                self._store.close()
+                self._store = None
+
+    def _remember(self, key: bytes, audio: bytes):
+        if len(audio) > self.memory_bytes:
+            return
+        previous = self._memory.pop(key, None)
+        if previous is not None:
+            self._memory_size -= len(previous)
+        self._memory[key] = audio
+        self._memory_size += len(audio)
+        while self._memory_size > self.memory_bytes:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_size -= len(evicted)
+
+
+# Shared by every session in this process
+tts_cache: Optional[TTSAudioCache] = TTSAudioCache() if TTS_CACHE_ENABLED else None
+
+
+class CachedTTSMixin:
+    """
+    Mixin for TTSService subclasses with a run_tts generator (e.g.
+    DeepgramTTSService): answers repeated phrases from `tts_cache`.
+    """
+
+    tts_cache: Optional[TTSAudioCache] = tts_cache
+
+    async def run_tts(self, text: str) -> AsyncGenerator[Frame, None]:
+        cache = self.tts_cache
+        if cache is None or len(text) > TTS_CACHE_MAX_CHARS:
+            async for frame in super().run_tts(text):
+                yield frame
+            return
+
+        key = phrase_key(self._voice_id, self.sample_rate, text)
+        audio = cache.get(key)
+        if audio is not None:
+            logger.debug(f"{self}: TTS cache hit [{text}]")
+            await self.start_ttfb_metrics()
+            yield TTSStartedFrame()
+            await self.stop_ttfb_metrics()
+            view = memoryview(audio)
+            for start in range(0, len(view), self.chunk_size):
+                yield TTSAudioRawFrame(
+                    audio=view[start:start + self.chunk_size], sample_rate=self.sample_rate, num_channels=1
+                )
+            yield TTSStoppedFrame()
+            return
+
+        # Only a complete, error-free synthesis is stored
+        parts: List[bytes] = []
+        failed = False
+        async for frame in super().run_tts(text):
+            if isinstance(frame, TTSAudioRawFrame):
+                parts.append(bytes(frame.audio))
+            elif isinstance(frame, ErrorFrame):
+                failed = True
+            elif isinstance(frame, TTSStoppedFrame) and parts and not failed:
+                cache.put(key, b"".join(parts))
+            yield frame
+
+    async def prewarm(self, phrases: Iterable[str], sample_rate: int) -> int:
+        """
+        Synthesize phrases into the cache outside of a pipeline.
+
+        Args:
+            phrases: Phrases to cache
+            sample_rate: Output sample rate of the pipelines that will use them
+
+        Returns:
+            int: Phrases synthesized (those already cached are skipped)
+        """
+        if not self.sample_rate:
+            self._sample_rate = sample_rate  # Normally set by the StartFrame
+        synthesized = 0
+        for phrase in phrases:
+            key = phrase_key(self._voice_id, self.sample_rate, phrase)
+            if self.tts_cache is None or key in self.tts_cache:
+                continue
+            async for _ in self.run_tts(phrase):
+                pass
+            synthesized += 1
+        return synthesized
+
+
+def read_phrases(path: str) -> List[str]:
+    """Phrases from a file, one per line; blank lines and # comments skipped."""
+    with open(path, encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip() and not line.lstrip().startswith("#")]
+
+
+def prewarm_blocking(tts: CachedTTSMixin, phrases: Iterable[str], sample_rate: int) -> int:
+    """
+    Run CachedTTSMixin.prewarm to completion from synchronous code (e.g.
+    warm-up), on its own event loop in a helper thread.
+    """
+    result = []
+    thread = threading.Thread(
+        target=lambda: result.append(asyncio.run(tts.prewarm(phrases, sample_rate))),
+        name="tts-cache-prewarm",
+    )
+    thread.start()
+    thread.join()
+    return result[0] if result else 0